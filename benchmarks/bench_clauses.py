@@ -0,0 +1,24 @@
+"""Statement building throughput of `qldb_orm.static.clauses` for wide `IN` predicates.
+
+```shell
+python benchmarks/bench_clauses.py
+```
+"""
+import sys
+import harness
+from qldb_orm.static import clauses
+
+
+def cases():
+    columns = ['column_{}'.format(i) for i in range(10)]
+    return [
+        harness.Case('where_in (1000 values)', lambda: clauses.where_in(id=1000), 2000),
+        harness.Case('where_in (5000 values)', lambda: clauses.where_in(id=5000), 500),
+        harness.Case('where_in (2 columns x 1000 values)',
+                     lambda: clauses.where_in(id=1000, number=1000), 1000),
+        harness.Case('where_equals (10 columns)', lambda: clauses.where_equals(*columns), 20000),
+    ]
+
+
+if __name__ == '__main__':
+    harness.main([sys.modules[__name__]])
@@ -0,0 +1,53 @@
+"""Throughput of `qldb_orm.static.driver.Driver.sanitize` and `qldb_orm.static.driver.Driver.down_convert` on statements, parameters, documents and Ion revision records.
+
+```shell
+python benchmarks/bench_convert.py
+```
+"""
+import sys
+from amazon.ion.simpleion import dumps, loads
+import harness
+from qldb_orm.static.driver import Driver
+
+
+def document(width=50, depth=3):
+    """Document with `width` top-level fields, a list and a struct nested `depth` levels deep.
+    """
+    snapshot = {'field_{}'.format(i): 'value "{}"\n'.format(i) for i in range(width)}
+    snapshot['numbers'] = list(range(width))
+    node = snapshot
+    for i in range(depth):
+        node['nest'] = {'level': i, 'ratio': i / 3, 'flag': i % 2 == 0, 'label': "it's level {}".format(i)}
+        node = node['nest']
+    return snapshot
+
+
+def revision():
+    """Ion revision record, as read from `history()` through a `pyqldb` cursor.
+    """
+    return loads(dumps({
+        'blockAddress': {'strandId': 'JdxjkR9bSYB5jMHWcI464T', 'sequenceNo': 1234},
+        'hash': b'\x00' * 32,
+        'data': document(),
+        'metadata': {'id': 'L7S9f3dR3HZ3l8oOJ1Zh2r', 'version': 3, 'txId': 'FnQeJBAicTX0Ah32ZnVtSX'}
+    }))
+
+
+def cases():
+    statement = 'SELECT * FROM benchmark BY meta_id WHERE id = ? AND number IN (?, ?, ?)'
+    params = ['value_{}'.format(i) for i in range(100)]
+    native = document()
+    ion = loads(dumps(native))
+    record = revision()
+    return [
+        harness.Case('sanitize statement', lambda: Driver.sanitize(statement), 20000),
+        harness.Case('sanitize list (100 values)', lambda: Driver.sanitize(params), 5000),
+        harness.Case('sanitize document', lambda: Driver.sanitize(native), 2000),
+        harness.Case('sanitize ion document', lambda: Driver.sanitize(ion), 1000),
+        harness.Case('down_convert ion document', lambda: Driver.down_convert(ion), 2000),
+        harness.Case('down_convert ion revision', lambda: Driver.down_convert(record), 2000),
+    ]
+
+
+if __name__ == '__main__':
+    harness.main([sys.modules[__name__]])
@@ -0,0 +1,51 @@
+"""Throughput of the structural diff in `qldb_orm.static.delta`, and of reading revisions back from a `qldb_orm.static.delta.DeltaChain`.
+
+```shell
+python benchmarks/bench_delta.py
+```
+"""
+import copy
+import sys
+import harness
+from bench_hydration import wide_snapshot, deep_snapshot
+from qldb_orm.static.delta import diff, patch, DeltaChain
+
+
+def revisions(snapshot, count):
+    """`count` revisions of `snapshot`, each changing one nested field of the previous one.
+    """
+    revisions = [snapshot]
+    for i in range(1, count):
+        revision = copy.deepcopy(revisions[-1])
+        revision['nested_{}'.format(i * 10 % 1000)]['b']['c'] = 'revision_{}'.format(i)
+        revisions.append(revision)
+    return revisions
+
+
+def chain(snapshots, interval=25):
+    chain = DeltaChain(interval=interval, cache_size=0)
+    for version, snapshot in enumerate(snapshots):
+        chain.put(version, snapshot)
+    return chain
+
+
+def cases():
+    wide = revisions(wide_snapshot(1000), 2)
+    deep = deep_snapshot(500)
+    changed = deep_snapshot(500)
+    node = changed
+    while node['nest']:
+        node = node['nest']
+    node['label'] = 'changed'
+    changes = diff(*wide)
+    return [
+        harness.Case('diff wide (1000 fields)', lambda: diff(*wide), 500),
+        harness.Case('diff deep (500 levels)', lambda: diff(deep, changed), 500),
+        harness.Case('patch wide (1000 fields)', lambda: patch(wide[0], changes), 2000),
+        harness.Case('delta chain get (100 revisions)', lambda fixture: [fixture.get(i) for i in range(100)], 20,
+                     slow=True, setup=lambda: chain(revisions(wide_snapshot(1000), 100))),
+    ]
+
+
+if __name__ == '__main__':
+    harness.main([sys.modules[__name__]])
@@ -0,0 +1,48 @@
+"""Hydration throughput of `qldb_orm.qldb.Document._load` on wide and deep snapshots.
+
+```shell
+python benchmarks/bench_hydration.py --scale 2
+```
+"""
+import sys
+import harness
+from qldb_orm.qldb import Document
+
+
+def wide_snapshot(width):
+    """Snapshot with `width` top-level fields, a tenth of which are nested one level deep.
+    """
+    snapshot = {'field_{}'.format(i): 'value_{}'.format(i) for i in range(width)}
+    for i in range(0, width, 10):
+        snapshot['nested_{}'.format(i)] = {'a': i, 'b': {'c': str(i)}}
+    return snapshot
+
+
+def deep_snapshot(depth):
+    """Snapshot nested `depth` levels deep, with a few scalar fields on every level.
+    """
+    snapshot = node = {}
+    for i in range(depth):
+        node['level'] = i
+        node['label'] = 'level_{}'.format(i)
+        node['nest'] = {}
+        node = node['nest']
+    return snapshot
+
+
+def hydrate(snapshot):
+    return lambda: Document(table='benchmark', snapshot=snapshot, fixtures=False)
+
+
+def cases():
+    return [
+        harness.Case('hydration wide (100 fields)', hydrate(wide_snapshot(100)), 2000),
+        harness.Case('hydration wide (1000 fields)', hydrate(wide_snapshot(1000)), 200),
+        harness.Case('hydration deep (10 levels)', hydrate(deep_snapshot(10)), 5000),
+        harness.Case('hydration deep (100 levels)', hydrate(deep_snapshot(100)), 1000),
+        harness.Case('hydration deep (500 levels)', hydrate(deep_snapshot(500)), 200),
+    ]
+
+
+if __name__ == '__main__':
+    harness.main([sys.modules[__name__]])
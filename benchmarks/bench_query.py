@@ -0,0 +1,51 @@
+"""Throughput of `qldb_orm.qldb.Query` result conversion, on rows replayed from a recorded cursor and end to end against the driver backend.
+
+```shell
+python benchmarks/bench_query.py --quick # skips the 100k row case
+```
+"""
+import sys
+from amazon.ion.simpleion import dumps, loads
+import harness
+from qldb_orm import settings
+from qldb_orm.qldb import Document, Query
+from qldb_orm.static.memory import MemoryDriver
+
+LEDGER = settings.LEDGER or 'benchmark'
+
+
+def recorded_cursor(rows):
+    """Ion rows, as a `pyqldb` cursor yields them for `SELECT * FROM table BY meta_id`.
+    """
+    return loads(dumps([{'id': 'id_{}'.format(i), 'meta_id': 'meta_{}'.format(i), 'number': i,
+                         'name': 'name_{}'.format(i), 'nested': {'a': i, 'b': ['x', 'y']}}
+                        for i in range(rows)]))
+
+
+def populated(table, rows):
+    """Table in the configured backend holding `rows` documents.
+    """
+    MemoryDriver.reset(LEDGER)
+    query = Query(table, ledger=LEDGER)
+    query.bulk_save([Document(table, id='id_{}'.format(i), snapshot={'number': i, 'nested': {'a': i}},
+                              ledger=LEDGER) for i in range(rows)], exists=False)
+    return query
+
+
+def cases():
+    query = Query('benchmark', ledger=LEDGER)
+    ids = ['id_{}'.format(i) for i in range(100)]
+    return [
+        harness.Case('_to_documents (1k rows)', query._to_documents, 20,
+                     setup=lambda: recorded_cursor(1000)),
+        harness.Case('_to_documents (100k rows)', query._to_documents, 3, slow=True,
+                     setup=lambda: recorded_cursor(100000)),
+        harness.Case('get_all (1k rows)', lambda table: table.get_all(), 10,
+                     setup=lambda: populated('benchmark_query', 1000)),
+        harness.Case('find_in (100 ids)', lambda table: table.find_in(id=ids), 50,
+                     setup=lambda: populated('benchmark_query', 1000)),
+    ]
+
+
+if __name__ == '__main__':
+    harness.main([sys.modules[__name__]])
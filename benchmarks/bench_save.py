@@ -0,0 +1,61 @@
+"""End-to-end throughput of `qldb_orm.qldb.Document.save` and `qldb_orm.qldb.Query.bulk_save` against the driver backend.
+
+```shell
+python benchmarks/bench_save.py
+```
+"""
+import itertools
+import sys
+import harness
+from qldb_orm import settings
+from qldb_orm.qldb import Document, Query
+from qldb_orm.static.memory import MemoryDriver
+
+LEDGER = settings.LEDGER or 'benchmark'
+TABLE = 'benchmark_save'
+
+
+def snapshot(i):
+    return {'name': 'name_{}'.format(i), 'number': i, 'nested': {'a': i, 'b': ['x', 'y']}}
+
+
+def existing():
+    """Table holding a single saved document. With the `memory` backend the ledger is dropped first, so every case starts from that one document rather than from the rows written by the cases before it.
+    """
+    MemoryDriver.reset(LEDGER)
+    document = Document(TABLE, id='existing', snapshot=snapshot(0), ledger=LEDGER)
+    document.save()
+    return document
+
+
+def cases():
+    counter = itertools.count()
+
+    def insert(_):
+        i = next(counter)
+        Document(TABLE, id='insert_{}'.format(i), snapshot=snapshot(i), ledger=LEDGER).save(exists=False)
+
+    def upsert(document):
+        document.number = next(counter)
+        document.save()
+
+    def update(document):
+        document.number = next(counter)
+        document.save(exists=True)
+
+    def bulk(_):
+        start = next(counter) * 100
+        Query(TABLE, ledger=LEDGER).bulk_save([
+            Document(TABLE, id='bulk_{}'.format(i), snapshot=snapshot(i), ledger=LEDGER, fixtures=False)
+            for i in range(start, start + 100)], exists=False)
+
+    return [
+        harness.Case('save (insert)', insert, 500, setup=existing),
+        harness.Case('save (upsert)', upsert, 500, setup=existing),
+        harness.Case('save (update)', update, 500, setup=existing),
+        harness.Case('bulk_save (100 documents)', bulk, 20, setup=existing),
+    ]
+
+
+if __name__ == '__main__':
+    harness.main([sys.modules[__name__]])
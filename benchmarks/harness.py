@@ -0,0 +1,239 @@
+"""Benchmark harness shared by the `benchmarks/bench_*.py` modules.
+
+Every benchmark module exposes a `cases()` function returning a list of `Case`. Each case is timed call by call to report throughput and latency percentiles, then run once more under `tracemalloc` to record its peak memory. Results can be saved as a JSON baseline and later runs compared against it, flagging any case whose throughput dropped, or whose peak memory grew, by more than a threshold.
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(BENCHMARK_DIR)
+sys.path.insert(0, os.path.join(PROJECT_DIR, 'src'))
+
+BASELINE = os.path.join(BENCHMARK_DIR, 'baselines.json')
+THRESHOLD = 0.2
+# NOTE: peak memory of small cases fluctuates by a few kilobytes between runs; growth below this floor is ignored
+MEMORY_FLOOR = 64 * 1024
+
+
+class Case():
+    """Single benchmark.
+
+    :param name: Unique name of the case, used as its key in the baseline
+    :type name: str
+    :param fn: Function performing one operation. Receives the result of `setup` if one is given, otherwise no arguments.
+    :type fn: function
+    :param repeat: Number of timed operations
+    :type repeat: int
+    :param slow: Flag to skip the case when running with `--quick`, defaults to `False`
+    :type slow: bool, optional
+    :param setup: Function of no arguments preparing the fixture passed to `fn`, defaults to `None`. It is only called if the case is selected, and is not timed.
+    :type setup: function, optional
+    """
+
+    def __init__(self, name, fn, repeat, slow=False, setup=None):
+        self.name = name
+        self.fn = fn
+        self.repeat = repeat
+        self.slow = slow
+        self.setup = setup
+
+    def prepare(self):
+        """Run `setup` and return a function of no arguments performing one operation.
+        """
+        if self.setup is None:
+            return self.fn
+        fixture = self.setup()
+        return lambda: self.fn(fixture)
+
+
+def percentile(samples, fraction):
+    """Nearest-rank percentile of sorted `samples`.
+    """
+    index = max(int(math.ceil(fraction * len(samples))) - 1, 0)
+    return samples[index]
+
+
+def measure(case, scale=1.0, memory=True):
+    """Run a case and collect its statistics.
+
+    :param case: Benchmark case
+    :type case: :class:`Case`
+    :param scale: Multiplier applied to `case.repeat`, defaults to `1.0`
+    :type scale: float, optional
+    :param memory: Flag to record peak memory, defaults to `True`
+    :type memory: bool, optional
+    :return: `{ ops_per_sec, p50, p99, peak_bytes, repeat }`, with latencies in seconds
+    :rtype: dict
+    """
+    repeat = max(int(case.repeat * scale), 1)
+    fn = case.prepare()
+    fn()
+
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+
+    peak = None
+    if memory:
+        tracemalloc.start()
+        try:
+            tracemalloc.reset_peak()
+            fn()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    return {
+        'ops_per_sec': repeat / sum(samples) if sum(samples) > 0 else float('inf'),
+        'p50': statistics.median(samples),
+        'p99': percentile(samples, 0.99),
+        'peak_bytes': peak,
+        'repeat': repeat
+    }
+
+
+def load_baseline(path=BASELINE):
+    """Load a baseline saved by `save_baseline`.
+
+    :return: Results keyed by case name, or an empty `dict` if there is no baseline
+    :rtype: dict
+    """
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r') as infile:
+        return json.load(infile).get('results', {})
+
+
+def save_baseline(results, path=BASELINE):
+    """Merge `results` into the baseline at `path`, so running a subset of cases only updates those cases.
+    """
+    merged = load_baseline(path)
+    merged.update(results)
+    with open(path, 'w') as outfile:
+        json.dump({
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'results': merged
+        }, outfile, indent=2, sort_keys=True)
+
+
+def regressions(results, baseline, threshold=THRESHOLD):
+    """Compare results against a baseline.
+
+    :param results: Results keyed by case name
+    :type results: dict
+    :param baseline: Baseline results keyed by case name
+    :type baseline: dict
+    :param threshold: Tolerated fractional change, defaults to `0.2`, i.e. 20%
+    :type threshold: float, optional
+    :return: Human readable description of every regression
+    :rtype: list
+    """
+    found = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if result['ops_per_sec'] < base['ops_per_sec'] * (1 - threshold):
+            found.append('{}: {:,.1f} ops/sec, baseline {:,.1f} ({:+.0%})'.format(
+                name, result['ops_per_sec'], base['ops_per_sec'], result['ops_per_sec'] / base['ops_per_sec'] - 1))
+        if result.get('peak_bytes') is not None and base.get('peak_bytes') is not None \
+                and result['peak_bytes'] > base['peak_bytes'] * (1 + threshold) \
+                and result['peak_bytes'] - base['peak_bytes'] > MEMORY_FLOOR:
+            found.append('{}: {} peak memory, baseline {}'.format(
+                name, format_bytes(result['peak_bytes']), format_bytes(base['peak_bytes'])))
+    return found
+
+
+def format_seconds(seconds):
+    if seconds < 1e-3:
+        return '{:.1f}us'.format(seconds * 1e6)
+    if seconds < 1:
+        return '{:.2f}ms'.format(seconds * 1e3)
+    return '{:.2f}s'.format(seconds)
+
+
+def format_bytes(size):
+    if size is None:
+        return '-'
+    for unit in ['B', 'KB', 'MB']:
+        if size < 1024:
+            return '{:.0f}{}'.format(size, unit)
+        size /= 1024
+    return '{:.1f}GB'.format(size)
+
+
+def report(name, result, base=None):
+    change = ''
+    if base is not None:
+        change = '{:+.0%}'.format(result['ops_per_sec'] / base['ops_per_sec'] - 1)
+    print('{:<40} {:>14,.1f} {:>10} {:>10} {:>10} {:>8}'.format(
+        name, result['ops_per_sec'], format_seconds(result['p50']), format_seconds(result['p99']),
+        format_bytes(result['peak_bytes']), change))
+
+
+def arguments():
+    parser = argparse.ArgumentParser(description='qldb-orm benchmarks')
+    parser.add_argument('-k', '--filter', default=None,
+                        help='Only run cases whose name contains this string')
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help='Multiplier applied to the number of timed operations of every case')
+    parser.add_argument('--quick', action='store_true',
+                        help='Skip slow cases, e.g. 100k row conversions')
+    parser.add_argument('--no-memory', action='store_true',
+                        help='Skip peak memory measurement')
+    parser.add_argument('--backend', default='memory',
+                        help='Driver backend for cases that hit the ledger, defaults to the in-memory stand-in')
+    parser.add_argument('--baseline', default=BASELINE,
+                        help='Path of the JSON baseline')
+    parser.add_argument('--save', action='store_true',
+                        help='Save the results into the baseline')
+    parser.add_argument('--threshold', type=float, default=THRESHOLD,
+                        help='Fractional slowdown or memory growth flagged as a regression')
+    return parser.parse_args()
+
+
+def main(modules):
+    """Run the cases of the given benchmark modules, print a report and optionally save or compare a baseline. Exits with status `1` if a regression against the baseline is found.
+
+    :param modules: Benchmark modules, each exposing `cases()`
+    :type modules: list
+    """
+    args = arguments()
+    from qldb_orm import settings
+    settings.BACKEND = args.backend
+
+    baseline = load_baseline(args.baseline)
+    results = {}
+    print('{:<40} {:>14} {:>10} {:>10} {:>10} {:>8}'.format(
+        'case', 'ops/sec', 'p50', 'p99', 'peak mem', 'change'))
+    for module in modules:
+        for case in module.cases():
+            if args.filter and args.filter not in case.name:
+                continue
+            if args.quick and case.slow:
+                continue
+            results[case.name] = measure(case, args.scale, not args.no_memory)
+            report(case.name, results[case.name], baseline.get(case.name))
+
+    if args.save:
+        save_baseline(results, args.baseline)
+        print('\nSaved baseline to {}'.format(args.baseline))
+        return
+
+    found = regressions(results, baseline, args.threshold)
+    if found:
+        print('\nRegressions beyond {:.0%}:'.format(args.threshold))
+        for regression in found:
+            print('  ' + regression)
+        sys.exit(1)
@@ -0,0 +1,19 @@
+"""Run every benchmark, print ops/sec, p50/p99 latency and peak memory per case, and compare against the saved JSON baseline.
+
+```shell
+python benchmarks/run.py --save          # record a baseline
+python benchmarks/run.py --threshold 0.1 # exits 1 on regressions beyond 10%
+python benchmarks/run.py -k sanitize     # only run matching cases
+```
+"""
+import harness
+import bench_hydration
+import bench_convert
+import bench_clauses
+import bench_query
+import bench_save
+import bench_delta
+
+
+if __name__ == '__main__':
+    harness.main([bench_hydration, bench_convert, bench_clauses, bench_query, bench_save, bench_delta])
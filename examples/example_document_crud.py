@@ -7,7 +7,7 @@ if __name__=="__main__":
     # os.environ['LEDGER'] = 'innolab'
 
     # NOTE: Import needs to come after environment variable has been set!
-    from qldb-orm.qldb import Document
+    from qldb_orm.qldb import Document
 
     doc = Document('test_table')
 
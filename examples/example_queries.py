@@ -8,7 +8,7 @@ if __name__=="__main__":
 
     # NOTE: Import needs to come after environment variable has been set! The library will scan the environment
     #       on import and set the ledger. 
-    from qldb-orm.qldb import Query
+    from qldb_orm.qldb import Query
 
     ### EXAMPLE QUERIES
     # NOTE: `qldb-orm.qldb.Document` has extra attributes for meta data: `(index, table, ledger)`. To hide them, call `fields()`
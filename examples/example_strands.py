@@ -8,7 +8,7 @@ if __name__=="__main__":
 
     # NOTE: Import needs to come after environment variable has been set! The library will scan the environment
     #       on import and set the ledger. 
-    from qldb-orm.qldb import Query, Document
+    from qldb_orm.qldb import Query, Document
 
     print('--------------------------------------------------------------------------------------------')
     print('DOCUMENT STRANDS')
@@ -2,8 +2,9 @@ import argparse
 import pprint
 import random
 import sys
-from qldb-orm.qldb import Document, Query
-from qldb-orm.static.logger import getLogger
+from qldb_orm import settings
+from qldb_orm.qldb import Document, Query
+from qldb_orm.static.logger import getLogger
 
 log = getLogger('qldb-orm.main')
 printer = pprint.PrettyPrinter(indent=4)
@@ -39,8 +40,8 @@ def print_line(n):
     print('-'*n)
 
 
-def mock(table):
-    """Insert a mock document into a table
+def mock_document(table):
+    """Generate an unsaved mock document for a table
 
     :param table: Name of table to be queried.
     :type table: str
@@ -54,10 +55,37 @@ def mock(table):
     document.team = teams[random.randint(0, len(teams) - 1)]
     document.specialty = specialities[random.randint(0, len(specialities) - 1)]
     document.members = members[:random.randint(0, len(members) - 1)]
-    document.save()
     return document
 
 
+def mock(table):
+    """Insert a mock document into a table
+
+    :param table: Name of table to be queried.
+    :type table: str
+    :return: Document that was mocked
+    :rtype: :class:`qldb-orm.qldb.Document`
+    """
+    document = mock_document(table)
+    document.save(exists=False)
+    return document
+
+
+def mock_many(table, number):
+    """Insert a collection of mock documents into a table, batching many documents into each transaction.
+
+    :param table: Name of table to be queried.
+    :type table: str
+    :param number: Number of documents to mock
+    :type number: int
+    :return: collection of `qldb-orm.qldb.Document`
+    :rtype: list
+    """
+    documents = [mock_document(table) for _ in range(number)]
+    Query(table).bulk_save(documents, exists=False)
+    return documents
+
+
 def load(id, table):
     """Load a document from a table.
 
@@ -123,6 +151,27 @@ def history(table, id):
     return Query(table).history(id)
 
 
+def export(table, path, history=False, **options):
+    """Stream a table, or its revision history, to a file, reporting progress on `stderr`
+
+    :param table: Table to be exported
+    :type table: str
+    :param path: Path of the export file
+    :type path: str
+    :param history: Flag to export the revision history of the table, defaults to `False`
+    :type history: bool, optional
+    :param options: Keyword arguments passed through to `qldb-orm.static.export.Exporter`
+    :return: Progress of the export
+    :rtype: :class:`qldb-orm.static.export.Progress`
+    """
+    def report(progress):
+        print(progress, file=sys.stderr)
+
+    if history:
+        return Query(table).export_history(path, progress=report, **options)
+    return Query(table).export(path, progress=report, **options)
+
+
 def update_prop(document, **props):
     """Update properties on document and persist to **QLDB**
 
@@ -139,8 +188,9 @@ def update_prop(document, **props):
 
 def view_doc(document, unhide):
     if unhide:
-        return vars(document)
-    return document.fields()
+        hidden = {key: value for key, value in vars(document).items() if not key.startswith('_')}
+        return {**hidden, **document.fields()}
+    return dict(document.fields())
 
 
 def do_program(cli_args):
@@ -168,8 +218,20 @@ def do_program(cli_args):
                         help="Requires --id.\n Load a document by index.",)
     parser.add_argument('-mo', '--mock', action='store_true',
                         help="Create a new mock document")
+    parser.add_argument('-n', '--number', type=int, default=1,
+                        help="Used with --mock. Number of mock documents to create.")
     parser.add_argument('-uh', '--unhide', action='store_true',
                         help="Show hidden document fields")
+    parser.add_argument('-ex', '--export',
+                        help="Stream the table, or its revision history with --history, to a file.")
+    parser.add_argument('-fmt', '--format', choices=['jsonl', 'ion'], default=settings.EXPORT_FORMAT,
+                        help="Used with --export. Format of the export file.")
+    parser.add_argument('-gz', '--gzip', action='store_true', default=None,
+                        help="Used with --export. Compress the export file; implied by a `.gz` file name.")
+    parser.add_argument('-w', '--writers', type=int, default=settings.EXPORT_WRITERS,
+                        help="Used with --export. Number of threads serializing the export.")
+    parser.add_argument('-re', '--resume', action='store_true',
+                        help="Used with --export. Resume from the checkpoint of a previous export.")
 
     args = parser.parse_args(cli_args)
 
@@ -180,9 +242,18 @@ def do_program(cli_args):
         else:
             log.warning("No Document Index specified.")
 
+    elif args.export:
+        export(args.table, args.export, history=args.history, format=args.format, compress=args.gzip,
+               writers=args.writers, resume=args.resume)
+
     elif args.mock:
-        document = mock(args.table)
-        printer.pprint(view_doc(document, args.unhide))
+        if args.number > 1:
+            for document in mock_many(args.table, args.number):
+                print_line(30)
+                printer.pprint(view_doc(document, args.unhide))
+        else:
+            document = mock(args.table)
+            printer.pprint(view_doc(document, args.unhide))
 
     elif args.all:
         results = get_all(args.table)
@@ -217,7 +288,7 @@ def do_program(cli_args):
     elif args.find:
         results = find(args.table, args.find)
         for result in results:
-            printer.pprint(view_doc(result.fields(), args.unhide))
+            printer.pprint(view_doc(result, args.unhide))
 
 
 def entrypoint():
@@ -1,10 +1,28 @@
+import base64
+import copy
+import functools
+import heapq
 import uuid
+from types import MappingProxyType
+from collections import OrderedDict
+from collections.abc import Sequence
+from amazon.ion import simpleion
+from amazon.ion.simple_types import IonPyDict
 from botocore.exceptions import ClientError
 from itertools import tee
-from qldb-orm import settings
-from qldb-orm.static.logger import getLogger
-from qldb-orm.static.driver import Driver
-from qldb-orm.static.objects import Strut
+from qldb_orm import settings
+from qldb_orm.static.logger import getLogger
+from qldb_orm.static.driver import Driver
+from qldb_orm.static.objects import Strut, resolve
+from qldb_orm.static.schema import schema
+from qldb_orm.static.executor import executor, AsyncResults
+from qldb_orm.static.cache import cache
+from qldb_orm.static import statements
+from qldb_orm.static import delta
+from qldb_orm.static.filters import Where
+from qldb_orm.static.checkpoint import Checkpoint, txtime
+from qldb_orm.static.revisions import revisions
+from qldb_orm.static.export import Exporter
 
 log = getLogger('qldb-orm.qldb')
 
@@ -33,7 +51,7 @@ class Document(QLDB):
     2. **Constructor Arguments**: `table, id`
     3. **Constructor Arguments**: `table, snapshot`
 
-    In each case, an optional argument for `ledger` and `stranded` can be passed in. 
+    In each case, an optional argument for `ledger`, `stranded` and `fixtures` can be passed in. 
 
     :param table: Name of the **QLDB**table
     :type table: str
@@ -44,15 +62,31 @@ class Document(QLDB):
     :param ledger: Name of the **QLDB** ledger, defaults to `qldb-orm.settings.LEDGER`
     :type ledger: str, optional
     :param stranded: Flag to signal the document should initialized its history from the **QLDB** ledger
+    :param fixtures: Flag to signal the document should verify its table and index exist on the **QLDB** ledger, defaults to `True`. Documents hydrated from query results are known to exist and skip the check.
+    :type fixtures: bool, optional
+    :param partial: Flag to signal the `snapshot` only contains some of the document fields, defaults to `False`. Partial documents are returned by projected queries, see `qldb-orm.qldb.Query.only`, and cannot be saved until they are reloaded.
+    :type partial: bool, optional
 
     .. note::
       If `stranded==True`, then the document history can be accessed through `self.strands`
+
+    .. note::
+      Subclasses can declare secondary indexes through the `indexes` class attribute, e.g. `indexes = ('team',)`. Declared indexes that are missing from the ledger are created along with the table.
     """
+    indexes = ()
+    _attributes = frozenset(['_data', '_dirty', '_watched', 'table', 'driver', 'index', 'ledger', 'meta_id',
+                             'strands', 'partial'])
 
-    def __init__(self, table, id=None, snapshot=None, ledger=settings.LEDGER, stranded=False):
+    def __init__(self, table, id=None, snapshot=None, ledger=settings.LEDGER, stranded=False, fixtures=True,
+                 partial=False):
+        self._data = {}
+        self._dirty = set()
+        self._watched = {}
         super().__init__(table=table, ledger=ledger)
 
         self.meta_id = None
+        self.partial = partial
+        self.strands = None
 
         if id is None:
             # PartiQL doesn't like dashes.
@@ -63,90 +97,177 @@ class Document(QLDB):
         elif id is not None:
             self.id = id
             if snapshot is None:
-                self._exists(self.id, snapshot=True)
+                if cache.enabled:
+                    self._read_through(self.id)
+                else:
+                    self._exists(self.id, snapshot=True)
             else:
                 self._load(snapshot)
 
-        self._init_fixtures()
+        self._clean()
+
+        if fixtures:
+            self._init_fixtures()
 
         if stranded and self.meta_id is not None:
             self._init_history()
 
     def __getattr__(self, attr):
-        """Return values from un-hidden fields. Hidden fields include: `index`, `table`, `ledger`.
+        """Return values from un-hidden fields. Hidden fields include: `index`, `table`, `ledger`. Fields that are not set return `None`.
+
+        :param attr: attribute key
+        :type attr: str
+        """
+        # NOTE: private attributes are only missing while an instance is being constructed, e.g. by `copy` or `pickle`.
+        if attr[0] == '_' and attr in self._attributes:
+            raise AttributeError(attr)
+        value = self._data.get(attr)
+        if type(value) is Strut:
+            return Strut.wrap(value._data, self, (attr,))
+        if isinstance(value, list):
+            self._watch((attr,), value)
+        return value
+
+    def __setattr__(self, attr, value):
+        """Assign `value` to a document field, unless `attr` is one of the hidden attributes of the `qldb-orm.qldb.Document`, i.e. `table`, `driver`, `index`, `ledger`, `meta_id`, `strands` and `partial`, which are kept apart from its fields.
 
         :param attr: attribute key
         :type attr: str
         """
-        return self.fields().get(attr, None)
+        if attr in self._attributes:
+            object.__setattr__(self, attr, value)
+        else:
+            self._data[attr] = value
+            self._dirty.add((attr,))
+
+    def __delattr__(self, attr):
+        if attr in self._attributes:
+            object.__delattr__(self, attr)
+            return
+        try:
+            del self._data[attr]
+        except KeyError:
+            raise AttributeError(attr) from None
+        # NOTE: PartiQL `REMOVE` is not generated, so removing a field rewrites the whole document.
+        self._dirty.add(())
+
+    def __copy__(self):
+        """Shallow copy of the `qldb-orm.qldb.Document`. The copy has its own fields and change tracking, so setting a field on the copy does not set it on the original; nested values are shared.
+        """
+        duplicate = self.__class__.__new__(self.__class__)
+        state = vars(duplicate)
+        state.update(vars(self))
+        state['_data'] = dict(self._data)
+        state['_dirty'] = set(self._dirty)
+        state['_watched'] = dict(self._watched)
+        return duplicate
+
+    def __deepcopy__(self, memo):
+        duplicate = self.__class__.__new__(self.__class__)
+        memo[id(self)] = duplicate
+        state = vars(duplicate)
+        for key, value in vars(self).items():
+            state[key] = copy.deepcopy(value, memo)
+        return duplicate
+
+    def _changed(self, path):
+        """Mark the field at `path`, a tuple of keys, as modified. The empty path marks the whole document.
+        """
+        self._dirty.add(path)
+
+    def _watch(self, path, value):
+        """Keep a copy of a mutable field, e.g. a `list`, when it is first handed out, so in-place changes to it are found when the document is saved.
+        """
+        if path not in self._watched:
+            self._watched[path] = copy.deepcopy(value)
+
+    def _clean(self):
+        """Forget the changes made to the document, e.g. once it has been loaded or saved.
+        """
+        self._dirty.clear()
+        self._watched.clear()
+
+    def changes(self):
+        """Dotted paths of the fields modified since the `qldb-orm.qldb.Document` was loaded or last saved. Paths nested within another modified path are omitted. Lists read from the document are compared against their value when they were first read, so changes made to them in place are included.
+
+        :return: Modified paths, or `None` if the whole document was modified, e.g. because a field was deleted or the document was never loaded from the ledger.
+        :rtype: tuple
+        """
+        if self.meta_id is None:
+            return None
+        dirty = set(self._dirty)
+        for path, value in self._watched.items():
+            try:
+                if resolve(self._data, '.'.join(path)) != value:
+                    dirty.add(path)
+            except (KeyError, TypeError):
+                dirty.add(path)
+        if () in dirty or (self.index,) in dirty:
+            return None
+        changed = []
+        for path in sorted(dirty, key=len):
+            if not any(path[:len(parent)] == parent for parent in changed):
+                changed.append(path)
+        if not all(isinstance(key, str) and statements.IDENTIFIER.match(key) for path in changed for key in path):
+            return None
+        return tuple('.'.join(path) for path in changed)
+
+    def diff(self, other):
+        """Structural diff between the fields of this `qldb-orm.qldb.Document` and another, e.g. `document.strands[0].diff(document)`. See `qldb-orm.static.delta.diff`.
+
+        :param other: Document, or `dict` of fields, to compare against
+        :type other: :class:`qldb-orm.qldb.Document`
+        :return: `qldb-orm.static.delta.Change` of each field that differs, from this document to `other`
+        :rtype: list
+        """
+        return delta.diff(self._data, other._data if isinstance(other, Document) else other)
 
     def _init_fixtures(self):
-        """Create the table and index on the **QLDB** ledger, if they do not already exist.
+        """Create the table and index on the **QLDB** ledger, if they do not already exist. Table existence is read through `qldb-orm.static.schema.SchemaCache`, so the ledger is only queried when the cached schema has expired. If the class declares secondary `indexes`, the missing ones are created as well.
         """
-        if self.table not in Driver.tables(self.ledger):
+        indexes = type(self).indexes
+        if indexes:
+            schema.declare(self.ledger, self.table, self.index, *indexes)
+        if not schema.has_table(self.ledger, self.table):
             try:
                 Driver.create_table(Driver.driver(self.ledger), self.table)
+                schema.add_table(self.ledger, self.table)
                 Driver.create_index(Driver.driver(
                     self.ledger), self.table, self.index)
+                schema.add_index(self.ledger, self.table, self.index)
             except ClientError as e:
                 log.error(e)
+                schema.invalidate(self.ledger)
+        if indexes:
+            schema.create_missing(self.ledger, self.table)
 
     def _init_history(self):
-        """Initializes the `qldb-orm.qldb.Document` revision history. After this method is invoked, the `self.strands` attribute will be populated with an array of `qldb-orm.qldb.Document` ordered over the revision history from earliest to latest.
+        """Initializes the `qldb-orm.qldb.Document` revision history. After this method is invoked, the `self.strands` attribute holds a `qldb-orm.qldb.Strands` sequence of `qldb-orm.qldb.Document` ordered over the revision history from earliest to latest. Revisions are only read from the ledger when they are accessed.
         """
-        self.strands = []
-        history = Query(self.table).history(self.meta_id)
-        for doc in history:
-            self.strands.append(
-                Document(self.table, id=self.id, snapshot=doc.data))
+        self.strands = Strands(self.table, getattr(self, self.index), self.meta_id, ledger=self.ledger)
 
-    def _load(self, snapshot=None, nest=None, nester=None):
-        """Parse the `snapshot` into `qldb-orm.qldb.Document` attributes. If `nest` and `nester` are passed in, the function executes recursively, drilling down through the nodes in the `snapshot` and recursively generating the document structure.
+    def _load(self, snapshot=None):
+        """Parse the `snapshot` into `qldb-orm.qldb.Document` attributes. Nested `dict` and Ion struct values are wrapped into `qldb-orm.static.objects.Strut` proxies without being copied; their own nested values are only wrapped when they are accessed.
 
         :param snapshot: `dict` of attributes to append to self, defaults to `None`
         :type snapshot: dict, optional
-        :param nest: Key of the nested field in the document attribute path.
-        :type nest: str
-        :param nester: Nested field, defaults to `None`.
-        :type nester: :class:`Strut`, optional
-
-        .. note::
-          1. https://realpython.com/python-eval-function/
-          2. https://blog.sqreen.com/preventing-sql-injections-in-python/
-          3. https://nedbatchelder.com/blog/201206/eval_really_is_dangerous.html
-        """
-        if snapshot is not None:
-            if isinstance(snapshot, Strut):
-              snapshot = vars(snapshot)
-
-            for key, value in snapshot.items():
-
-                if isinstance(value, dict):
-                    nested_field = Strut()
-
-                    if nest is None:
-                        setattr(self, key, nested_field)
-                        nested_key = f'self.{key}'
-                        self._load(snapshot=value, nest=nested_key,
-                                   nester=nested_field)
-
-                    else:
-                        path = '.'.join(nest.split('.')[:-1])
-                        nest_endpoint = nest.split('.')[-1]
-                        # NOTE: see links in docstring for comments on the use of `eval()`
-                        nested_attribute = getattr(
-                            eval(path, {'__builtins__': {}, "self": self}), nest_endpoint)
-                        setattr(nested_attribute, key, nested_field)
-                        nested_key = f'{nest}.{key}'
-                        self._load(snapshot=value, nest=nested_key,
-                                   nester=nested_field)
+        """
+        if snapshot is None:
+            return
 
-                else:
-                    if nest is None:
-                        setattr(self, key, value)
+        if isinstance(snapshot, Strut):
+            snapshot = vars(snapshot)
 
-                    else:
-                        setattr(nester, key, value)
+        data = self._data
+        for key, value in snapshot.items():
+            # NOTE: `BY meta_id` queries return the document ID alongside the fields.
+            if key == 'meta_id':
+                self.meta_id = value
+                continue
+            # NOTE: `IonPyDict` is an abstract `Mapping`, so `isinstance` checks against it are slow; test the exact type first.
+            if type(value) is IonPyDict or isinstance(value, dict):
+                value = Strut.wrap(value)
+            data[key] = value
 
     def _insert(self, document):
         """Insert a new `innoldab.qldb.Document` into the **QLDB** ledger table.
@@ -160,17 +281,33 @@ class Document(QLDB):
                   self.index, document[self.index])
         return dict(next(Driver.insert(Driver.driver(self.ledger), document, self.table), None))
 
-    def _update(self, document):
+    def _update(self, document, columns=()):
         """Update an existing `innoldab.qldb.Document` on the **QLDB** ledger table.
 
         :param document: Dictionary containing the fields to be updated.
         :type document: dict
+        :param columns: Dotted paths of the fields to set, defaults to `()`, i.e. the whole document
+        :type columns: tuple, optional
         :return: Dictionary containg `UPDATE` response
         :rtype: dict
         """
         log.debug("Updating DOCUMENT(%s = %s)",
                   self.index, document[self.index])
-        return dict(next(Driver.update(Driver.driver(self.ledger), document, self.table, self.index), None))
+        return dict(next(Driver.update(Driver.driver(self.ledger), document, self.table, self.index, columns), None))
+
+    def _upsert(self, document, columns=()):
+        """Insert or update a `qldb-orm.qldb.Document` on the **QLDB** ledger table within a single transaction.
+
+        :param document: Dictionary containing the fields to be saved.
+        :type document: dict
+        :param columns: Dotted paths of the fields to set if the document exists, defaults to `()`, i.e. the whole document
+        :type columns: tuple, optional
+        :return: Dictionary containg `INSERT` or `UPDATE` response
+        :rtype: dict
+        """
+        log.debug("Upserting DOCUMENT(%s = %s)",
+                  self.index, document[self.index])
+        return dict(next(Driver.upsert(Driver.driver(self.ledger), document, self.table, self.index, columns), None))
 
     def _get(self, id):
         """Retrieve an existing `innoldab.qldb.Document` from the **QLDB** ledger table.
@@ -203,26 +340,272 @@ class Document(QLDB):
             return True
         return False
 
+    def _read_through(self, id):
+        """Load a `qldb-orm.qldb.Document` through the `qldb-orm.static.cache.DocumentCache`. On a cache miss, the document is read from the committed view of the table, along with its `metadata.version`, and cached. If the cache is in revision check mode, a cached document is only re-read when its `metadata.version` on the ledger has changed.
+
+        :param id: ID of the `qldb-orm.qldb.Document` to load.
+        :type id: str
+        :return: True if exists, False otherwise
+        :rtype: bool
+        """
+        entry = cache.get(self.ledger, self.table, id)
+        if entry is not None and cache.revision_check:
+            log.debug("Checking revision of DOCUMENT(%s = %s)", self.index, id)
+            current = next(iter(Driver.revision(Driver.driver(
+                self.ledger), self.table, **{self.index: id})), None)
+            if current is None or current['version'] != entry.version:
+                entry = None
+
+        if entry is None:
+            log.debug("Reading through DOCUMENT(%s = %s)", self.index, id)
+            record = next(iter(Driver.query_committed(Driver.driver(
+                self.ledger), self.table, **{self.index: id})), None)
+            if record is None:
+                cache.invalidate(self.ledger, self.table, id)
+                return False
+            record = Driver.down_convert(record)
+            entry = cache.put(self.ledger, self.table, id, record['data'],
+                              record['metadata']['id'], record['metadata']['version'])
+
+        self._load(copy.deepcopy(entry.snapshot))
+        self.meta_id = entry.meta_id
+        return True
+
     def fields(self):
-        """All of the `qldb-orm.qldb.Document` fields as a key-value `dict`. Hides the document attributes `table`, `driver`, `index` and `ledger`, if an object containing only the relevant fields.
+        """All of the `qldb-orm.qldb.Document` fields as a key-value mapping. Hides the document attributes `table`, `driver`, `index`, `ledger`, `meta_id`, `strands` and `partial`, which are stored apart from the fields.
+
+        .. note::
+          The returned mapping is a read-only view of the document's own storage rather than a copy, so it costs nothing to call repeatedly and reading it does not mark any field as modified. Fields are modified through attribute access, e.g. `document.nested.title = 'x'`, so that `save()` knows which fields to set.
 
         :return: `qldb-orm.qldb.Document` fields
-        :rtype: dict
+        :rtype: types.MappingProxyType
+        """
+        return MappingProxyType(self._data)
+
+    def as_of(self, timestamp):
+        """Rebuild the `qldb-orm.qldb.Document` as it was at `timestamp`, from the `qldb-orm.static.revisions.RevisionStore` alone, without reading the ledger. The history of the document is stored by `stranded` loads and by `qldb-orm.qldb.Query.history`.
+
+        :param timestamp: Point in time
+        :type timestamp: datetime.datetime
+        :raises ValueError: If the revision store is disabled
+        :return: the document, or `None` if it did not exist at `timestamp` or its history is not stored. Saving it writes the whole document, e.g. to restore its earlier state.
+        :rtype: :class:`qldb-orm.qldb.Document`
+        """
+        if not revisions.enabled:
+            raise ValueError('The revision store is disabled; set REVISION_STORE')
+        if self.meta_id is None:
+            return None
+        record = revisions.as_of(self.ledger, self.table, self.meta_id, timestamp)
+        if record is None or record.get('data') is None:
+            return None
+        return Document(self.table, snapshot=record['data'], ledger=self.ledger, fixtures=False)
+
+    def reload(self):
+        """Read every field of the `qldb-orm.qldb.Document` from the **QLDB** ledger table. A partial document is fully loaded afterwards, and can be saved.
+
+        :return: True if the document exists, False otherwise
+        :rtype: bool
         """
-        return {key: value for key, value in vars(self).items() if key not in ['table', 'driver', 'index', 'ledger', 'meta_id', 'strands']}
+        exists = self._exists(getattr(self, self.index), snapshot=True)
+        if exists:
+            self.partial = False
+            self._clean()
+        return exists
+
+    def save(self, exists=None):
+        """Save the current value of the `qldb-orm.qldb.Document` fields to the **QLDB** ledger table. By default, the existence check and the write are executed in a single transaction. A document loaded from the ledger only sets the fields returned by `changes()`, through `UPDATE ... SET p.a = ?, p.b.c = ?`, and is not written at all if none of its fields changed.
 
-    def save(self):
-        """Save the current value of the `qldb-orm.qldb.Document` fields to the **QLDB** ledger table.
+        :param exists: Hint for whether the document already exists on the ledger, defaults to `None`. If `True`, the document is updated; if `False`, the document is inserted. In either case, the existence check is skipped entirely.
+        :type exists: bool, optional
+        :raises ValueError: If the document is partial, since saving it would drop the fields that were not loaded.
         """
-        fields = self.fields()
+        if self.partial:
+            raise ValueError('Cannot save partial DOCUMENT({} = {}); reload() it first'.format(
+                self.index, getattr(self, self.index)))
+        fields = self._data
+        columns = self.changes() if exists is not False else None
+        if columns == ():
+            log.debug("Skipping unchanged DOCUMENT(%s = %s)", self.index, fields[self.index])
+            return
+        columns = columns or ()
         log.debug("Saving DOCUMENT(%s = %s)", self.index, fields[self.index])
-        if self._exists(fields[self.index]):
-            result = self._update(fields)
+        if exists is None:
+            result = self._upsert(fields, columns)
+        elif exists:
+            result = self._update(fields, columns)
         else:
             result = self._insert(fields)
-        self.meta_id = result['documentId']
-        if self.stranded:
-            self._init_history()
+        self._saved(result['documentId'])
+
+    def _saved(self, meta_id):
+        """Account for the document having been written to the ledger, by `save()` or `qldb-orm.qldb.Query.bulk_save`.
+        """
+        self.meta_id = meta_id
+        self._clean()
+        cache.invalidate(self.ledger, self.table, self._data[self.index])
+        if self.strands is not None:
+            self.strands.saved(meta_id)
+
+
+    @classmethod
+    async def aload(cls, table, id=None, snapshot=None, ledger=settings.LEDGER, stranded=False, fixtures=True):
+        """Asynchronously construct a `qldb-orm.qldb.Document`. Accepts the same arguments as the constructor; any **QLDB** calls made while constructing the document run on the `qldb-orm.static.executor.LedgerExecutor` thread pool.
+
+        :return: the constructed document
+        :rtype: :class:`qldb-orm.qldb.Document`
+        """
+        return await executor.run(ledger, functools.partial(cls, table, id=id, snapshot=snapshot, ledger=ledger,
+                                                            stranded=stranded, fixtures=fixtures))
+
+    async def asave(self, exists=None):
+        """Asynchronous version of `qldb-orm.qldb.Document.save`.
+
+        :param exists: Hint for whether the document already exists on the ledger, defaults to `None`.
+        :type exists: bool, optional
+        """
+        await executor.run(self.ledger, self.save, exists)
+
+
+class Strands(Sequence):
+    """Lazy, indexable sequence of the revisions of a `qldb-orm.qldb.Document`, ordered from earliest to latest, see `qldb-orm.qldb.Document._init_history`. Revisions are read from the ledger in pages of `page_size` versions when they are first accessed, and each revision is only hydrated into a `qldb-orm.qldb.Document` when it is indexed, so e.g. `strands[-1]` or `reversed(strands)` only read the newest revisions. The length of the sequence is read from the current `metadata.version` of the document.
+
+    Revisions that were read are kept in a `qldb-orm.static.delta.DeltaChain`, i.e. the first revision of each page is kept in full and every other revision as its changes from the previous one, so memory grows with the size of the changes rather than the size of the document. The last `page_size` hydrated revisions are cached.
+
+    :param table: Name of the **QLDB** table
+    :type table: str
+    :param id: Index id of the document
+    :type id: str
+    :param meta_id: `metadata.id` of the document
+    :type meta_id: str
+    :param ledger: Name of the **QLDB** ledger, defaults to `qldb-orm.settings.LEDGER`
+    :type ledger: str, optional
+    :param page_size: Number of revisions read at a time, defaults to `qldb-orm.settings.STRAND_PAGE_SIZE`
+    :type page_size: int, optional
+    """
+
+    def __init__(self, table, id, meta_id, ledger=settings.LEDGER, page_size=settings.STRAND_PAGE_SIZE):
+        self.table = table
+        self.id = id
+        self.meta_id = meta_id
+        self.ledger = ledger
+        self.page_size = page_size
+        self._length = None
+        self._snapshots = delta.DeltaChain(interval=page_size)
+        self._documents = OrderedDict()
+
+    def __len__(self):
+        if self._length is None:
+            query = Query(self.table, ledger=self.ledger)
+            current = next(iter(Driver.revision(Driver.driver(self.ledger), self.table, **{query.index: self.id})),
+                           None)
+            if current is not None and current['meta_id'] == self.meta_id:
+                self._length = current['version'] + 1
+            else:
+                # NOTE: the document was deleted or its index changed, so its history is read in full.
+                self._store(query.history(self.meta_id))
+                self._length = len(self._snapshots)
+        return self._length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        index = self._index(index)
+        document = self._documents.get(index)
+        if document is None:
+            # NOTE: snapshots share their unchanged subtrees with other revisions, so each hydrated revision gets its own copy.
+            document = Document(self.table, id=self.id, snapshot=copy.deepcopy(self._snapshot(index)),
+                                ledger=self.ledger, fixtures=False)
+            self._documents[index] = document
+            while len(self._documents) > self.page_size:
+                self._documents.popitem(last=False)
+        else:
+            self._documents.move_to_end(index)
+        return document
+
+    def _index(self, index):
+        if index < 0:
+            index += len(self)
+        if index < 0 or (self._length is not None and index >= self._length):
+            raise IndexError('strand index out of range')
+        return index
+
+    def _snapshot(self, index):
+        """Fields of the revision at `index`, read from the ledger if it was not read yet. The snapshot must not be modified.
+        """
+        if index not in self._snapshots:
+            self._fetch(index)
+        if index not in self._snapshots:
+            raise IndexError('strand index out of range')
+        return self._snapshots.get(index)
+
+    def diff(self, start, end):
+        """Structural diff between two revisions of the document, see `qldb-orm.static.delta.diff`.
+
+        :param start: Index of the earlier revision
+        :type start: int
+        :param end: Index of the later revision
+        :type end: int
+        :raises IndexError: If either index is out of range
+        :return: `qldb-orm.static.delta.Change` of each field that changed between the revisions
+        :rtype: list
+        """
+        return delta.diff(self._snapshot(self._index(start)), self._snapshot(self._index(end)))
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def __reversed__(self):
+        for index in range(len(self) - 1, -1, -1):
+            yield self[index]
+
+    def _fetch(self, index):
+        """Read the page of revisions holding version `index`, starting from its first revision that was not read yet.
+        """
+        page = index - index % self.page_size
+        first, last = page, min(page + self.page_size, len(self)) - 1
+        while first in self._snapshots:
+            first += 1
+        self._store(Query(self.table, ledger=self.ledger).history(self.meta_id, version=first - 1, until=last))
+
+    def _store(self, revisions):
+        for revision in sorted(revisions, key=lambda revision: revision.metadata.version):
+            data = revision.fields().get('data')
+            self._snapshots.put(revision.metadata.version, {} if data is None else vars(data))
+
+    def saved(self, meta_id):
+        """Account for a new revision of the document, once it has been saved. The existing revisions are kept, and the new revision is read when it is first accessed. If the document was inserted anew, the sequence is reset.
+
+        :param meta_id: `metadata.id` of the saved document
+        :type meta_id: str
+        """
+        if meta_id != self.meta_id:
+            self.meta_id = meta_id
+            self._length = None
+            self._snapshots.clear()
+            self._documents.clear()
+        elif self._length is not None:
+            self._length += 1
+
+    def refresh(self):
+        """Read the length of the sequence again, e.g. after the document was saved elsewhere.
+        """
+        self._length = None
+
+
+class _Descending():
+    """Sort key wrapper that reverses the order of the wrapped key.
+    """
+    __slots__ = ('key',)
+
+    def __init__(self, key):
+        self.key = key
+
+    def __eq__(self, other):
+        return self.key == other.key
+
+    def __lt__(self, other):
+        return other.key < self.key
 
 
 class Query(QLDB):
@@ -233,15 +616,284 @@ class Query(QLDB):
 
     def __init__(self, table, ledger=settings.LEDGER):
         super().__init__(table=table, ledger=ledger)
+        self.projection = None
+        self.excluded = None
+        self.condition = None
+        self.ordering = ()
+
+    def where(self, *conditions, **lookups):
+        """Filter the documents returned by this query on the ledger, e.g. `Query('table').where(number__gt=50, title__like='wise%')`. Lookups are combined with `AND`; `qldb-orm.static.filters.Where` conditions can be passed in to combine predicates with `OR` or negate them. Chained calls are combined with `AND`.
+
+        :param conditions: Conditions to filter by
+        :type conditions: :class:`qldb-orm.static.filters.Where`
+        :param lookups: Keyword lookups to filter by. See `qldb-orm.static.filters.lookup` for the supported operators, e.g. `number__gte=10`, `panopticon__nest__title__like='%owl%'` or `team__in=['a', 'b']`.
+        :raises ValueError: If a lookup is invalid
+        :return: A copy of this query
+        :rtype: :class:`qldb-orm.qldb.Query`
+
+        .. note:: Example
+            ```python
+            from qldb_orm.qldb import Query, Where
+
+            query = Query('table').where(Where(number__lt=10) | Where(number__gt=90), team='a')
+            documents = query.order_by('-number').get_all()
+            ```
+        """
+        condition = Where(*conditions, **lookups)
+        query = copy.copy(self)
+        query.condition = condition if self.condition is None else self.condition & condition
+        return query
+
+    def order_by(self, *paths):
+        """Order the documents returned by this query by `paths`. Paths prefixed with `-` are sorted in descending order; missing values sort first.
+
+        :param paths: Fields to order by. Nested fields are ordered through dotted paths.
+        :type paths: str
+        :raises ValueError: If a path is invalid
+        :return: A copy of this query
+        :rtype: :class:`qldb-orm.qldb.Query`
+
+        .. note::
+          **QLDB** does not support `ORDER BY`, so documents are sorted after they are read, and the streaming methods read every document before yielding the first one. Use `qldb-orm.qldb.Query.page` to read ordered results in pages.
+        """
+        for path in paths:
+            statements.identifier(path.lstrip('-'), True)
+        query = copy.copy(self)
+        query.ordering = tuple(paths)
+        return query
+
+    @staticmethod
+    def _values(document, ordering):
+        """Values of the `ordering` paths of a document.
+        """
+        values = []
+        for path in ordering:
+            node = document
+            for key in path.lstrip('-').split('.'):
+                node = getattr(node, key, None)
+                if node is None:
+                    break
+            values.append(node)
+        return values
+
+    @staticmethod
+    def _sort_key(ordering, values):
+        """Sort key of the `values` of the `ordering` paths of a document.
+        """
+        # NOTE: missing values sort first in either direction, so a range predicate on the ledger never skips them.
+        return tuple((value is not None, _Descending(value) if path.startswith('-') else value)
+                     for path, value in zip(ordering, values))
+
+    def _order(self, documents):
+        """Sort `documents` in place by the ordering of the query.
+
+        :param documents: Documents to sort
+        :type documents: list
+        :return: `documents`
+        :rtype: list
+        """
+        if self.ordering:
+            documents.sort(key=lambda document: self._sort_key(
+                self.ordering, self._values(document, self.ordering)))
+        return documents
+
+    def _ordered(self, documents):
+        """Apply the ordering of the query to a generator of documents, which has to be read entirely first.
+        """
+        if not self.ordering:
+            return documents
+        return iter(self._order(list(documents)))
+
+    def _select(self, driver, **kwargs):
+        """Query the table for documents matching the condition of the query and `kwargs`, where lists of values are matched through `IN` and other values by equality.
+
+        :param driver: QLDB Driver
+        :type driver: :class:`pyqldb.driver.qldb_driver.QldbDriver`
+        :return: iterable containing result
+        """
+        lookups = {'{}__in'.format(column) if isinstance(value, list) else column: value
+                   for column, value in kwargs.items()}
+        condition = Where(**lookups) if self.condition is None else self.condition & Where(**lookups)
+        if not condition:
+            return Driver.query_all(driver, self.table, projection=self._fields())
+        return Driver.query_where(driver, self.table, condition, projection=self._fields())
+
+    def ensure_index(self, *fields):
+        """Declare indexed fields of the table and create the ones missing from the ledger, along with the table itself if it does not exist. Declarations of every table can be created at once, e.g. at startup, through `qldb-orm.static.schema.SchemaCache.create_missing`.
+
+        :param fields: Names of the fields to index
+        :type fields: str
+        :return: Names of the fields whose index was created
+        :rtype: list
+        """
+        for field in fields:
+            statements.identifier(field)
+        schema.declare(self.ledger, self.table, self.index, *fields)
+        return [field for _, _, field in schema.create_missing(self.ledger, self.table)]
+
+    def _plan(self, columns=()):
+        """Check the query can use an index of the table, through `qldb-orm.static.schema.SchemaCache.check`.
+
+        :param columns: Columns constrained by equality, besides those of the query's condition
+        :type columns: list
+        """
+        if schema.policy not in ['warn', 'raise']:
+            return
+        schema.check(self.ledger, self.table, set(columns), self.condition)
+
+    def only(self, *paths):
+        """Restrict the fields selected by this query to `paths`, e.g. `Query('table').only('id', 'team', 'panopticon.nest.title').find_by(team='a')`. The projection is generated in the **PartiQL** statement, so fields that are not selected are never read from the ledger. The index of the table is always selected.
+
+        :param paths: Fields to select. Nested fields are selected through dotted paths.
+        :type paths: str
+        :raises ValueError: If a path is invalid
+        :return: A copy of this query, returning partial `qldb-orm.qldb.Document`
+        :rtype: :class:`qldb-orm.qldb.Query`
+        """
+        query = copy.copy(self)
+        query.projection = tuple(dict.fromkeys(statements.identifier(path, True)
+                                               for path in (self.index,) + paths))
+        query.excluded = None
+        return query
+
+    def exclude(self, *paths):
+        """Drop `paths` from the documents returned by this query, e.g. `Query('table').exclude('members').get_all()`. The index of the table cannot be excluded.
+
+        :param paths: Fields to drop. Nested fields are dropped through dotted paths.
+        :type paths: str
+        :raises ValueError: If a path is invalid or is the index of the table
+        :return: A copy of this query, returning partial `qldb-orm.qldb.Document`
+        :rtype: :class:`qldb-orm.qldb.Query`
 
-    def _to_documents(self, results):
+        .. note::
+          **PartiQL** cannot select every field *but* some, so excluded fields are still read from the ledger. They are dropped before hydration, which saves the cost of converting them. Use `qldb-orm.qldb.Query.only` to reduce read IOs.
+        """
+        if self.index in paths:
+            raise ValueError('Cannot exclude the index of TABLE({})'.format(self.table))
+        query = copy.copy(self)
+        query.excluded = tuple(dict.fromkeys(statements.identifier(path, True) for path in paths))
+        query.projection = None
+        return query
+
+    def _fields(self):
+        """Projection of the query, as passed to `qldb-orm.static.statements.select`. Nested paths are aliased, with dots replaced by `__`, so their values can be nested again by `qldb-orm.qldb.Query._shape`.
+
+        :return: Projected paths, or `None` if every field is selected
+        :rtype: tuple
+        """
+        if self.projection is None:
+            return None
+        return (('meta_id', None),) + tuple((path, path.replace('.', '__') if '.' in path else None)
+                                            for path in self.projection)
+
+    def _shape(self, result):
+        """Convert a query result into a document snapshot, applying the projection or exclusions of the query.
+
+        :param result: Query result
+        :return: Document snapshot
+        :rtype: dict
+        """
+        result = dict(result)
+        if self.projection is not None:
+            snapshot = {'meta_id': result['meta_id']} if 'meta_id' in result else {}
+            for path in self.projection:
+                key = path.replace('.', '__')
+                if key not in result:
+                    continue
+                node, keys = snapshot, path.split('.')
+                for parent in keys[:-1]:
+                    node = node.setdefault(parent, {})
+                node[keys[-1]] = result[key]
+            return snapshot
+        for path in self.excluded:
+            node, keys = result, path.split('.')
+            for parent in keys[:-1]:
+                node = node.get(parent)
+                if not isinstance(node, (dict, IonPyDict)):
+                    break
+            else:
+                node.pop(keys[-1], None)
+        return result
+
+    def _document(self, result, projected=True):
+        """Convert a query result into a `qldb-orm.qldb.Document`.
+
+        :param result: Query result
+        :param projected: Flag to apply the projection or exclusions of the query, defaults to `True`
+        :type projected: bool, optional
+        :rtype: :class:`qldb-orm.qldb.Document`
+        """
+        if projected and (self.projection is not None or self.excluded is not None):
+            return Document(table=self.table, snapshot=self._shape(result), ledger=self.ledger, fixtures=False,
+                            partial=True)
+        return Document(table=self.table, snapshot=dict(result), ledger=self.ledger, fixtures=False)
+
+    def _to_documents(self, results, projected=True):
         """Convert query results to a `list` of `qldb-orm.qldb.Document`
 
         :param results: Result of `pyqldb` cursor execution
+        :param projected: Flag to apply the projection or exclusions of the query, defaults to `True`
+        :type projected: bool, optional
         :return: collection of documents
         :rtype: list
         """
-        return [Document(table=self.table, snapshot=dict(result)) for result in results]
+        return [self._document(result, projected) for result in results]
+
+    def _iter_documents(self, results, history=False, projected=True):
+        """Lazily convert streamed query results to `qldb-orm.qldb.Document`. The underlying stream is closed when the generator is exhausted, closed or garbage collected, so breaking out of a loop ends the transaction early.
+
+        :param results: Streamed result of `pyqldb` cursor execution
+        :type results: :class:`qldb-orm.static.cursor.ResultStream`
+        :param history: Flag to down convert revision history records, defaults to `False`
+        :type history: bool, optional
+        :param projected: Flag to apply the projection or exclusions of the query, defaults to `True`
+        :type projected: bool, optional
+        :return: generator of documents
+        :rtype: generator
+        """
+        try:
+            for result in results:
+                if history:
+                    result = Driver.down_convert(result)
+                yield self._document(result, projected and not history)
+        finally:
+            results.close()
+
+    def bulk_save(self, documents, batch_size=settings.BATCH_SIZE, exists=None):
+        """Save a collection of `qldb-orm.qldb.Document` to the **QLDB** ledger table, batching many documents into each transaction. Each batch runs a single existence check, a single multi-document `INSERT` for the new documents and an `UPDATE` for each existing document. The `meta_id` of each document is updated in place.
+
+        :param documents: Documents to save. `dict` elements are converted into `qldb-orm.qldb.Document` on this query's table.
+        :type documents: list
+        :param batch_size: Maximum number of documents per transaction, defaults to `qldb-orm.settings.BATCH_SIZE`. **QLDB** rejects transactions that modify more than 40 documents.
+        :type batch_size: int, optional
+        :param exists: Hint for whether the documents already exist, defaults to `None`. See `qldb-orm.qldb.Document.save`.
+        :type exists: bool, optional
+        :raises ValueError: If a document is partial, or belongs to another table
+        :return: `documentId` of each document, in the same order as `documents`. Documents sharing an index value are written once, with the last of their snapshots.
+        :rtype: list
+        """
+        documents = [document if isinstance(document, Document)
+                     else Document(table=self.table, snapshot=document, ledger=self.ledger)
+                     for document in documents]
+        partial = next((document for document in documents if document.partial), None)
+        if partial is not None:
+            raise ValueError('Cannot save partial DOCUMENT({} = {}); reload() it first'.format(
+                self.index, getattr(partial, self.index)))
+        foreign = next((document for document in documents if document.table != self.table), None)
+        if foreign is not None:
+            raise ValueError('Cannot save DOCUMENT({} = {}) of TABLE({}) to TABLE({})'.format(
+                foreign.index, getattr(foreign, foreign.index), foreign.table, self.table))
+        ids = []
+        for start in range(0, len(documents), batch_size):
+            batch = documents[start:start + batch_size]
+            log.debug("Saving BATCH(%s documents) to TABLE(%s)",
+                      len(batch), self.table)
+            batch_ids = Driver.bulk_upsert(Driver.driver(self.ledger), [document._data for document in batch],
+                                           self.table, self.index, exists)
+            for document, meta_id in zip(batch, batch_ids):
+                document._saved(meta_id)
+            ids.extend(batch_ids)
+        return ids
 
     def raw(self, query):
         """Execute a raw query against the **QLDB** ledger.
@@ -254,26 +906,144 @@ class Query(QLDB):
         .. warning::
           Query will not be sanitized for injections.
         """
-        return self._to_documents(Driver.query(Driver.driver(self.ledger), query, unsafe=True))
+        return self._to_documents(Driver.query(Driver.driver(self.ledger), query, unsafe=True), projected=False)
+
+    def iter_raw(self, query):
+        """Streaming version of `qldb-orm.qldb.Query.raw`.
+
+        :param query: Query to be executed
+        :type query: str
+        :return: generator of `qldb-orm.qldb.Document`
+        :rtype: generator
+
+        .. warning::
+          Query will not be sanitized for injections.
+        """
+        return self._iter_documents(Driver.query(Driver.stream(self.ledger), query, unsafe=True), projected=False)
+
+    def _history(self, driver, id, start, end, version, until):
+        if id is None:
+            if version is not None or until is not None:
+                raise ValueError('A version watermark requires the metadata.id of a document')
+            return Driver.history_full(driver, self.table, start=start, end=end)
+        return Driver.history(driver, self.table, id, start=start, end=end, version=version, until=until)
+
+    def _stored_history(self, driver, id, start, end, version, until):
+        """Read the revision history through the `qldb-orm.static.revisions.RevisionStore`. Only the revisions that are not stored yet are read from the ledger: the revisions of the table committed within `start` and `end` since its watermark, or the revisions of document `id` after its latest stored `metadata.version`. If versions are missing from the requested range of versions of the document, e.g. because only some pages of its `qldb-orm.qldb.Strands` were read, the whole range is read again.
+
+        .. note::
+          The watermark of the table only moves if the revisions read from the ledger continue from it, i.e. if `start` is not after the watermark. A window starting after the watermark, e.g. a first call with `start`, is read from the ledger as is and its revisions are stored, but the same window is read from the ledger again by the next call; reading the gap up to `start` instead would let the store skip it, at the cost of reading revisions that were not asked for.
+        """
+        if id is None:
+            if version is not None or until is not None:
+                raise ValueError('A version watermark requires the metadata.id of a document')
+            watermark = revisions.watermark(self.ledger, self.table)
+            if end is None or watermark is None or txtime(end) >= watermark:
+                contiguous = start is None or (watermark is not None and txtime(start) <= watermark)
+                latest = revisions.append(self.ledger, self.table, Driver.history_full(
+                    driver, self.table, start=watermark if contiguous else start, end=end))
+                if latest is not None and contiguous:
+                    revisions.advance(self.ledger, self.table, latest)
+            return revisions.table(self.ledger, self.table, start, end)
+        lowest = -1 if version is None else version
+        known = revisions.version(self.ledger, self.table, id, until)
+        if known is None or known <= lowest or \
+                revisions.count(self.ledger, self.table, id, version, known) < known - lowest:
+            known = version
+        if until is None or known is None or known < until:
+            revisions.append(self.ledger, self.table, Driver.history(driver, self.table, id, version=known,
+                                                                     until=until))
+        return revisions.document(self.ledger, self.table, id, start, end, version, until)
 
-    def history(self, id=None):
-        """Returns the revision history.
+    def history(self, id=None, start=None, end=None, version=None, until=None):
+        """Returns the revision history. The history can be bounded by commit time, in which case only the revisions committed within the bounds are read, through `history(table, start, end)`.
 
         :param id: meta id, defaults to None
         :type id: id of the document revision history , optional
+        :param start: Earliest commit time of the revisions, inclusive, defaults to `None`
+        :type start: datetime.datetime, optional
+        :param end: Latest commit time of the revisions, inclusive, defaults to `None`
+        :type end: datetime.datetime, optional
+        :param version: Only return the revisions of document `id` whose `metadata.version` is greater than `version`, defaults to `None`
+        :type version: int, optional
+        :param until: Only return the revisions of document `id` whose `metadata.version` is at most `until`, defaults to `None`
+        :type until: int, optional
         :return: a collection of `qldb-orm.qldb.Document`
         :rtype: list
         .. note::
           `id` is *not* the index of the document. It is the `metadata.id` associated with the document across revisions. Query entire history to find a particular `metadata.id`
+
+        .. note::
+          If the `qldb-orm.static.revisions.RevisionStore` is enabled, revisions are read from the store and only the revisions it is missing are read from the ledger.
         """
-        if id is None:
-            records = [Driver.down_convert(record)
-                       for record in Driver.history_full(Driver.driver(self.ledger), self.table)]
-        else:
-            records = [Driver.down_convert(record)
-                       for record in Driver.history(Driver.driver(self.ledger), self.table, id)]
+        if revisions.enabled:
+            return self._to_documents(self._stored_history(Driver.driver(self.ledger), id, start, end, version,
+                                                           until), projected=False)
+        records = self._history(Driver.driver(self.ledger), id, start, end, version, until)
+        return self._to_documents((Driver.down_convert(record) for record in records), projected=False)
+
+    def iter_history(self, id=None, start=None, end=None, version=None, until=None):
+        """Streaming version of `qldb-orm.qldb.Query.history`. Revisions are read from the ledger and hydrated one at a time.
+
+        :param id: meta id, defaults to None
+        :type id: id of the document revision history , optional
+        :return: generator of `qldb-orm.qldb.Document`
+        :rtype: generator
+        """
+        records = self._history(Driver.stream(self.ledger), id, start, end, version, until)
+        return self._iter_documents(records, history=True)
 
-        return self._to_documents(records)
+    def history_since(self, checkpoint=None, end=None):
+        """Stream the revisions committed since a `qldb-orm.static.checkpoint.Checkpoint`, e.g. to tail the history of a table. Only the revisions committed at or after the checkpoint's watermark are read from the ledger, and the revisions read by the previous call are skipped. Each revision is recorded on the checkpoint once the next one is requested, and the checkpoint is saved when the generator is exhausted or closed, so every revision is delivered at least once.
+
+        :param checkpoint: Checkpoint to resume from, or the path of its JSON file, defaults to `None`, i.e. the start of the history
+        :type checkpoint: :class:`qldb-orm.static.checkpoint.Checkpoint`, optional
+        :param end: Latest commit time of the revisions, inclusive, defaults to `None`
+        :type end: datetime.datetime, optional
+        :return: generator of `qldb-orm.qldb.Document`
+        :rtype: generator
+
+        .. note::
+          **QLDB** does not return revisions in commit order, so the watermark of the checkpoint only moves once the generator is exhausted; revisions are compared against the watermark the tail started from. A tail that is closed early records the revisions it delivered and skips them on the next call.
+        """
+        if not isinstance(checkpoint, Checkpoint):
+            checkpoint = Checkpoint(checkpoint)
+        records = Driver.history_full(Driver.stream(self.ledger), self.table, start=checkpoint.time, end=end)
+        return self._tail(records, checkpoint, end)
+
+    def _tail(self, records, checkpoint, end=None):
+        """Lazily convert streamed revisions to `qldb-orm.qldb.Document`, skipping the revisions the `checkpoint` has seen and recording the others. The watermark of the checkpoint is only moved once every revision was read.
+        """
+        exhausted = False
+        try:
+            for record in records:
+                record = Driver.down_convert(record)
+                metadata = record['metadata']
+                time = txtime(metadata['txTime'])
+                if checkpoint.seen(metadata['id'], metadata['version'], time):
+                    continue
+                yield self._document(record, False)
+                checkpoint.advance(metadata['id'], metadata['version'], time)
+            exhausted = True
+        finally:
+            records.close()
+            if exhausted:
+                checkpoint.complete(end)
+            checkpoint.save()
+
+    def as_of(self, timestamp):
+        """Rebuild the documents of the table as they were at `timestamp`, from the `qldb-orm.static.revisions.RevisionStore` alone, without reading the ledger. Only the documents whose history is stored are returned; call `history()` first to store the history of the whole table.
+
+        :param timestamp: Point in time
+        :type timestamp: datetime.datetime
+        :raises ValueError: If the revision store is disabled
+        :return: the documents that existed at `timestamp`
+        :rtype: list
+        """
+        if not revisions.enabled:
+            raise ValueError('The revision store is disabled; set REVISION_STORE')
+        return [Document(table=self.table, snapshot=record['data'], ledger=self.ledger, fixtures=False)
+                for record in revisions.snapshot(self.ledger, self.table, timestamp) if record.get('data') is not None]
 
     def get_all(self):
         """Return all `qldb-orm.qldb.Document` objects in the **QLDB** ledger table
@@ -281,7 +1051,30 @@ class Query(QLDB):
         :return: List of `qldb-orm.qldb.Document`
         :rtype: list
         """
-        return self._to_documents(Driver.query_all(Driver.driver(self.ledger), self.table))
+        if self.condition is not None:
+            self._plan()
+            return self._order(self._to_documents(self._select(Driver.driver(self.ledger))))
+        return self._order(self._to_documents(Driver.query_all(Driver.driver(self.ledger), self.table,
+                                                               projection=self._fields())))
+
+    def iter_all(self):
+        """Streaming version of `qldb-orm.qldb.Query.get_all`. Documents are read from the ledger page by page and yielded one at a time, so memory stays bounded regardless of the size of the table.
+
+        :return: generator of `qldb-orm.qldb.Document`
+        :rtype: generator
+
+        .. note:: Example
+            ```python
+            for document in Query('table').iter_all():
+                if document.id == 'needle':
+                    break # the transaction ends here
+            ```
+        """
+        if self.condition is not None:
+            self._plan()
+            return self._ordered(self._iter_documents(self._select(Driver.stream(self.ledger))))
+        return self._ordered(self._iter_documents(Driver.query_all(Driver.stream(self.ledger), self.table,
+                                                                   projection=self._fields())))
 
     def find_by(self, **kwargs):
         """Filter `qldb-orm.qldb.Document` objects by the provided fields. This method accepts `**kwargs` arguments for the field name and values. The document fields must exactly match the fields provided in the query.
@@ -290,12 +1083,77 @@ class Query(QLDB):
         :return: List of `qldb-orm.qldb.Document`
         :rtype: list
         """
-        return self._to_documents(Driver.query_by_fields(Driver.driver(self.ledger), self.table, **kwargs))
+        self._plan(kwargs)
+        if self.condition is not None:
+            return self._order(self._to_documents(self._select(Driver.driver(self.ledger), **kwargs)))
+        return self._order(self._to_documents(Driver.query_by_fields(Driver.driver(self.ledger), self.table,
+                                                                     projection=self._fields(), **kwargs)))
+
+    def iter_by(self, **kwargs):
+        """Streaming version of `qldb-orm.qldb.Query.find_by`.
+
+        :param kwargs: Fields by which to filter the query.
+        :return: generator of `qldb-orm.qldb.Document`
+        :rtype: generator
+        """
+        self._plan(kwargs)
+        if self.condition is not None:
+            return self._ordered(self._iter_documents(self._select(Driver.stream(self.ledger), **kwargs)))
+        return self._ordered(self._iter_documents(Driver.query_by_fields(Driver.stream(self.ledger), self.table,
+                                                                         projection=self._fields(), **kwargs)))
+
+    def _fan_out(self, column, values, fields=None, parallelism=None):
+        """Split an `IN` query on `column` into chunks of at most `qldb-orm.settings.IN_CHUNK_SIZE` values and execute the chunks concurrently, each in its own transaction on a pooled session.
+
+        :param column: Field whose values are split into chunks
+        :type column: str
+        :param values: Values of the `column` to search for
+        :type values: list
+        :param fields: Other fields by which to filter the query, with arrays of values, defaults to `None`
+        :type fields: dict, optional
+        :param parallelism: Maximum number of concurrent transactions, defaults to `qldb-orm.settings.LEDGER_CONCURRENCY`
+        :type parallelism: int, optional
+        :return: List of `qldb-orm.qldb.Document`, merged in chunk order
+        :rtype: list
+        """
+        values = list(dict.fromkeys(values))
+        chunks = [values[start:start + settings.IN_CHUNK_SIZE]
+                  for start in range(0, len(values), settings.IN_CHUNK_SIZE)]
+        log.debug("Fanning out %s values of FIELD(%s) over %s queries",
+                  len(values), column, len(chunks))
+
+        def fetch(chunk):
+            if self.condition is not None:
+                return self._to_documents(self._select(Driver.driver(self.ledger), **{**(fields or {}), column: chunk}))
+            return self._to_documents(Driver.query_in_fields(Driver.driver(self.ledger), self.table,
+                                                             projection=self._fields(),
+                                                             **{**(fields or {}), column: chunk}))
+
+        return [document for documents in executor.map(fetch, chunks, parallelism) for document in documents]
+
+    def get_many(self, ids, parallelism=None, ordered=True):
+        """Load many `qldb-orm.qldb.Document` by their index at once. The ids are split into chunks that are queried concurrently.
+
+        :param ids: Index ids of the documents to load
+        :type ids: list
+        :param parallelism: Maximum number of concurrent transactions, defaults to `qldb-orm.settings.LEDGER_CONCURRENCY`
+        :type parallelism: int, optional
+        :param ordered: Flag to return documents in the order of `ids`, defaults to `True`. Ids that do not exist are omitted.
+        :type ordered: bool, optional
+        :return: List of `qldb-orm.qldb.Document`
+        :rtype: list
+        """
+        self._plan([self.index])
+        documents = self._fan_out(self.index, ids, parallelism=parallelism)
+        if not ordered:
+            return documents
+        by_id = {getattr(document, self.index): document for document in documents}
+        return [by_id[id] for id in dict.fromkeys(ids) if id in by_id]
 
     def find_in(self, **kwargs):
         """Filter `qldb-orm.qldb.Document` objects by the provided fields. This method accepts `**kwargs` arguments for the field name and values, but the values must be an array. 
 
-        The document fields must belong to the array associated with the field in the `**kwargs`. See below for example.
+        The document fields must belong to the array associated with the field in the `**kwargs`. See below for example. If a field has more than `qldb-orm.settings.IN_CHUNK_SIZE` values, its values are split into chunks that are queried concurrently and the results merged.
 
         :param kwargs: Fields by which to filter the query.
         :return: List of `qldb-orm.qldb.Document`
@@ -307,4 +1165,213 @@ class Query(QLDB):
             ```
             will find all documents with a `field` whose value is in the set `(12, 13, 14)` *and* a `field2` whose value is in the set `('cat', 'dog')`
         """
-        return self._to_documents(Driver.query_in_fields(Driver.driver(self.ledger), self.table, **kwargs))
+        self._plan(kwargs)
+        lists = {column: values for column, values in kwargs.items()
+                 if isinstance(values, list)}
+        if lists:
+            column = max(lists, key=lambda key: len(lists[key]))
+            if len(lists[column]) > settings.IN_CHUNK_SIZE:
+                return self._order(self._fan_out(column, lists[column], kwargs))
+        if self.condition is not None:
+            return self._order(self._to_documents(self._select(Driver.driver(self.ledger), **kwargs)))
+        return self._order(self._to_documents(Driver.query_in_fields(Driver.driver(self.ledger), self.table,
+                                                                     projection=self._fields(), **kwargs)))
+
+    def iter_in(self, **kwargs):
+        """Streaming version of `qldb-orm.qldb.Query.find_in`.
+
+        :param kwargs: Fields by which to filter the query.
+        :return: generator of `qldb-orm.qldb.Document`
+        :rtype: generator
+        """
+        self._plan(kwargs)
+        if self.condition is not None:
+            return self._ordered(self._iter_documents(self._select(Driver.stream(self.ledger), **kwargs)))
+        return self._ordered(self._iter_documents(Driver.query_in_fields(Driver.stream(self.ledger), self.table,
+                                                                         projection=self._fields(), **kwargs)))
+
+    def page(self, size, after=None):
+        """Read one page of `size` documents matching the query, in the order of the query. Pages are addressed by a cursor, i.e. an opaque token encoding the sort key of the last document of the previous page, rather than by an offset, so pages stay consistent while documents are inserted. Documents are ordered by the index of the table if the query is not ordered, and ties are broken by the index.
+
+        :param size: Number of documents per page
+        :type size: int
+        :param after: Cursor returned with the previous page, defaults to `None`, i.e. the first page
+        :type after: str, optional
+        :return: The documents of the page and the cursor of the next page, or `None` if this is the last page
+        :rtype: tuple
+
+        .. note:: Example
+            ```python
+            query = Query('table').where(number__gt=50).order_by('-number')
+            documents, cursor = query.page(20)
+            while cursor is not None:
+                documents, cursor = query.page(20, after=cursor)
+            ```
+
+        .. note::
+          **QLDB** supports neither `ORDER BY` nor `LIMIT`. Documents on earlier pages are filtered out on the ledger through a range predicate on the first ordering path; the remaining documents are streamed and only the `size` lowest sort keys are kept in memory.
+        """
+        ordering = self.ordering or (self.index,)
+        if self.index not in [path.lstrip('-') for path in ordering]:
+            ordering += (self.index,)
+
+        if self.condition is not None:
+            self._plan()
+        query, bound = self, None
+        if after is not None:
+            values = Driver.down_convert(simpleion.loads(base64.urlsafe_b64decode(after.encode())))
+            bound = self._sort_key(ordering, values)
+            if values[0] is not None:
+                first = ordering[0]
+                query = self.where(**{'{}__{}'.format(first.lstrip('-').replace('.', '__'),
+                                                      'lte' if first.startswith('-') else 'gte'): values[0]})
+
+        documents = (document for document in query._iter_documents(query._select(Driver.stream(self.ledger)))
+                     if bound is None or self._sort_key(ordering, self._values(document, ordering)) > bound)
+        documents = heapq.nsmallest(size, documents, key=lambda document: self._sort_key(
+            ordering, self._values(document, ordering)))
+
+        cursor = None
+        if documents and len(documents) == size:
+            values = Driver.down_convert(self._values(documents[-1], ordering))
+            cursor = base64.urlsafe_b64encode(simpleion.dumps(values, binary=True)).decode()
+        return documents, cursor
+
+    def _shaped(self, results):
+        """Lazily apply the projection or exclusions of the query to streamed query results.
+        """
+        try:
+            for result in results:
+                yield self._shape(result)
+        finally:
+            results.close()
+
+    def export(self, path, **options):
+        """Stream the documents matching the query to a **JSON Lines** or **Ion** binary file, e.g. for a nightly export of a table. Documents are written as they are read from the ledger, without being hydrated into `qldb-orm.qldb.Document`, so memory use stays flat however large the table is.
+
+        :param path: Path of the export file
+        :type path: str
+        :param options: Keyword arguments passed through to `qldb-orm.static.export.Exporter`, e.g. `format='ion'`, `compress=True`, `writers=8`, `resume=True` or `progress=print`.
+        :raises ValueError: If the query is ordered, since ordering reads every document before the first one is written
+        :return: Progress of the export
+        :rtype: :class:`qldb-orm.static.export.Progress`
+
+        .. note:: Example
+            ```python
+            Query('table').where(team='a').export('team-a.jsonl.gz', writers=4, resume=True, progress=print)
+            ```
+        """
+        if self.ordering:
+            raise ValueError('Cannot export an ordered query; documents would have to be read into memory')
+        exporter = Exporter(path, **options)
+        if self.condition is not None:
+            self._plan()
+        records = self._select(Driver.stream(self.ledger))
+        if self.projection is not None or self.excluded is not None:
+            records = self._shaped(records)
+        return exporter.write(records)
+
+    def export_history(self, path, end=None, **options):
+        """Stream the revision history of the table to a **JSON Lines** or **Ion** binary file, as revision records, i.e. `{ blockAddress, hash, data, metadata }`. A resumed export only reads the revisions committed since the last run it finished, so the same file can be appended to by every nightly run.
+
+        :param path: Path of the export file
+        :type path: str
+        :param end: Latest commit time of the revisions, inclusive, defaults to `None`, i.e. the time the run starts; a resumed run keeps the end it started with
+        :type end: datetime.datetime, optional
+        :param options: Keyword arguments passed through to `qldb-orm.static.export.Exporter`
+        :return: Progress of the export
+        :rtype: :class:`qldb-orm.static.export.Progress`
+        """
+        exporter = Exporter(path, **options)
+        start, end = exporter.window(end)
+        records = Driver.history_full(Driver.stream(self.ledger), self.table, start=start, end=end)
+        return exporter.write(records, history=True)
+
+    async def abulk_save(self, documents, batch_size=settings.BATCH_SIZE, exists=None):
+        """Asynchronous version of `qldb-orm.qldb.Query.bulk_save`.
+        """
+        return await executor.run(self.ledger, self.bulk_save, documents, batch_size, exists)
+
+    async def araw(self, query):
+        """Asynchronous version of `qldb-orm.qldb.Query.raw`.
+        """
+        return await executor.run(self.ledger, self.raw, query)
+
+    async def ahistory(self, id=None, start=None, end=None, version=None, until=None):
+        """Asynchronous version of `qldb-orm.qldb.Query.history`.
+        """
+        return await executor.run(self.ledger, self.history, id, start, end, version, until)
+
+    async def aget_all(self):
+        """Asynchronous version of `qldb-orm.qldb.Query.get_all`.
+        """
+        return await executor.run(self.ledger, self.get_all)
+
+    async def afind_by(self, **kwargs):
+        """Asynchronous version of `qldb-orm.qldb.Query.find_by`.
+        """
+        return await executor.run(self.ledger, self.find_by, **kwargs)
+
+    async def apage(self, size, after=None):
+        """Asynchronous version of `qldb-orm.qldb.Query.page`.
+        """
+        return await executor.run(self.ledger, self.page, size, after)
+
+    async def aget_many(self, ids, parallelism=None, ordered=True):
+        """Asynchronous version of `qldb-orm.qldb.Query.get_many`.
+        """
+        return await executor.run(self.ledger, self.get_many, ids, parallelism, ordered)
+
+    async def afind_in(self, **kwargs):
+        """Asynchronous version of `qldb-orm.qldb.Query.find_in`.
+        """
+        return await executor.run(self.ledger, self.find_in, **kwargs)
+
+    def aiter_raw(self, query):
+        """Asynchronous iterator version of `qldb-orm.qldb.Query.iter_raw`.
+
+        :rtype: :class:`qldb-orm.static.executor.AsyncResults`
+        """
+        return AsyncResults(self.ledger, self.iter_raw(query))
+
+    def aiter_history(self, id=None, start=None, end=None, version=None, until=None):
+        """Asynchronous iterator version of `qldb-orm.qldb.Query.iter_history`.
+
+        :rtype: :class:`qldb-orm.static.executor.AsyncResults`
+        """
+        return AsyncResults(self.ledger, self.iter_history(id, start, end, version, until))
+
+    def aiter_history_since(self, checkpoint=None, end=None):
+        """Asynchronous iterator version of `qldb-orm.qldb.Query.history_since`.
+
+        :rtype: :class:`qldb-orm.static.executor.AsyncResults`
+        """
+        # NOTE: the checkpoint advances as revisions are pulled, so they are pulled one at a time rather than prefetched.
+        return AsyncResults(self.ledger, self.history_since(checkpoint, end), chunk_size=1)
+
+    def aiter_all(self):
+        """Asynchronous iterator version of `qldb-orm.qldb.Query.iter_all`.
+
+        :rtype: :class:`qldb-orm.static.executor.AsyncResults`
+
+        .. note:: Example
+            ```python
+            async for document in Query('table').aiter_all():
+                print(document.fields())
+            ```
+        """
+        return AsyncResults(self.ledger, self.iter_all())
+
+    def aiter_by(self, **kwargs):
+        """Asynchronous iterator version of `qldb-orm.qldb.Query.iter_by`.
+
+        :rtype: :class:`qldb-orm.static.executor.AsyncResults`
+        """
+        return AsyncResults(self.ledger, self.iter_by(**kwargs))
+
+    def aiter_in(self, **kwargs):
+        """Asynchronous iterator version of `qldb-orm.qldb.Query.iter_in`.
+
+        :rtype: :class:`qldb-orm.static.executor.AsyncResults`
+        """
+        return AsyncResults(self.ledger, self.iter_in(**kwargs))
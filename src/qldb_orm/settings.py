@@ -17,6 +17,39 @@ except NameError as e:
 
 LOG_LEVEL = os.environ.setdefault('LOG_LEVEL', 'NOTSET')
 
+BACKEND = os.environ.setdefault('BACKEND', 'qldb')
+POOL_DRIVERS = os.environ.setdefault(
+    'POOL_DRIVERS', 'true').lower() in ['true', '1', 'yes']
+MAX_CONCURRENT_TRANSACTIONS = int(
+    os.environ.setdefault('MAX_CONCURRENT_TRANSACTIONS', '0'))
+SCHEMA_TTL = float(os.environ.setdefault('SCHEMA_TTL', '300'))
+STREAM_BUFFER = int(os.environ.setdefault('STREAM_BUFFER', '200'))
+BATCH_SIZE = int(os.environ.setdefault('BATCH_SIZE', '40'))
+MAX_WORKERS = int(os.environ.setdefault('MAX_WORKERS', '32'))
+LEDGER_CONCURRENCY = int(os.environ.setdefault('LEDGER_CONCURRENCY', '10'))
+IN_CHUNK_SIZE = int(os.environ.setdefault('IN_CHUNK_SIZE', '50'))
+STATEMENT_CACHE_SIZE = int(os.environ.setdefault('STATEMENT_CACHE_SIZE', '512'))
+INDEX_POLICY = os.environ.setdefault('INDEX_POLICY', 'ignore').lower()
+
+DOCUMENT_CACHE = os.environ.setdefault(
+    'DOCUMENT_CACHE', 'false').lower() in ['true', '1', 'yes']
+CACHE_TTL = float(os.environ.setdefault('CACHE_TTL', '60'))
+CACHE_MAX_ENTRIES = int(os.environ.setdefault('CACHE_MAX_ENTRIES', '10000'))
+CACHE_MAX_BYTES = int(os.environ.setdefault('CACHE_MAX_BYTES', str(64 * 1024 * 1024)))
+CACHE_REVISION_CHECK = os.environ.setdefault(
+    'CACHE_REVISION_CHECK', 'false').lower() in ['true', '1', 'yes']
+REVISION_STORE = os.environ.setdefault('REVISION_STORE', '')
+STRAND_PAGE_SIZE = int(os.environ.setdefault('STRAND_PAGE_SIZE', '25'))
+EXPORT_FORMAT = os.environ.setdefault('EXPORT_FORMAT', 'jsonl').lower()
+EXPORT_WRITERS = int(os.environ.setdefault('EXPORT_WRITERS', '4'))
+EXPORT_CHUNK_SIZE = int(os.environ.setdefault('EXPORT_CHUNK_SIZE', '1000'))
+
+METRICS = os.environ.setdefault(
+    'METRICS', 'false').lower() in ['true', '1', 'yes']
+METRICS_EXPORT = os.environ.setdefault('METRICS_EXPORT', '')
+METRICS_FORMAT = os.environ.setdefault('METRICS_FORMAT', 'prometheus')
+METRICS_INTERVAL = float(os.environ.setdefault('METRICS_INTERVAL', '60'))
+
 
 def get_log_level():
     """Return the current **LOG_LEVEL** in the settings as a string.
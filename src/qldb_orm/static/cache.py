@@ -0,0 +1,169 @@
+import copy
+import sys
+import threading
+import time
+from collections import OrderedDict
+from qldb_orm import settings
+from qldb_orm.static.logger import getLogger
+
+log = getLogger('qldb-orm.cache')
+
+
+def sizeof(obj):
+    """Estimate the memory footprint of a native Python value, including nested `dict` and `list` values.
+
+    :param obj: Value to measure
+    :return: Approximate size in bytes
+    :rtype: int
+    """
+    size, stack = 0, [obj]
+    while stack:
+        value = stack.pop()
+        size += sys.getsizeof(value)
+        if isinstance(value, dict):
+            stack.extend(value.keys())
+            stack.extend(value.values())
+        elif isinstance(value, (list, tuple)):
+            stack.extend(value)
+    return size
+
+
+class CacheEntry():
+    """Cached snapshot of the latest revision of a document.
+
+    :param snapshot: Native `dict` of document fields
+    :type snapshot: dict
+    :param meta_id: `metadata.id` of the document
+    :type meta_id: str
+    :param version: `metadata.version` of the cached revision
+    :type version: int
+    :param expires: `time.monotonic()` after which the entry is stale
+    :type expires: float
+    """
+    __slots__ = ('snapshot', 'meta_id', 'version', 'expires', 'size')
+
+    def __init__(self, snapshot, meta_id, version, expires):
+        self.snapshot = snapshot
+        self.meta_id = meta_id
+        self.version = version
+        self.expires = expires
+        self.size = sizeof(snapshot)
+
+
+class DocumentCache():
+    """Process-wide, read-through cache of document snapshots keyed by `(ledger, table, id)`. Entries are evicted in least-recently-used order once the cache holds more than `max_entries` entries or `max_bytes` bytes, and are considered stale `ttl` seconds after they were cached.
+
+    The cache is opt-in; it is disabled unless `enabled` is set, or the **DOCUMENT_CACHE** environment variable is `true`.
+
+    :param enabled: Flag to enable the cache, defaults to `qldb_orm.settings.DOCUMENT_CACHE`
+    :type enabled: bool, optional
+    :param ttl: Seconds until an entry is stale, defaults to `qldb_orm.settings.CACHE_TTL`
+    :type ttl: float, optional
+    :param max_entries: Maximum number of cached documents, defaults to `qldb_orm.settings.CACHE_MAX_ENTRIES`
+    :type max_entries: int, optional
+    :param max_bytes: Approximate memory cap in bytes, defaults to `qldb_orm.settings.CACHE_MAX_BYTES`
+    :type max_bytes: int, optional
+    :param revision_check: Flag to revalidate entries on every read by comparing the cached `metadata.version` against the ledger, defaults to `qldb_orm.settings.CACHE_REVISION_CHECK`. The full document is only re-read if the version changed.
+    :type revision_check: bool, optional
+    """
+
+    def __init__(self, enabled=settings.DOCUMENT_CACHE, ttl=settings.CACHE_TTL, max_entries=settings.CACHE_MAX_ENTRIES,
+                 max_bytes=settings.CACHE_MAX_BYTES, revision_check=settings.CACHE_REVISION_CHECK):
+        self.enabled = enabled
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.revision_check = revision_check
+        self.bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def _evict(self):
+        while self._entries and (len(self._entries) > self.max_entries or self.bytes > self.max_bytes):
+            _, entry = self._entries.popitem(last=False)
+            self.bytes -= entry.size
+
+    def get(self, ledger, table, id):
+        """Retrieve a cached entry. Stale entries are dropped and not returned.
+
+        :param ledger: Name of the ledger
+        :type ledger: str
+        :param table: Name of the table
+        :type table: str
+        :param id: Index id of the document
+        :type id: str
+        :return: Cached entry, or `None` if the document is not cached
+        :rtype: :class:`qldb_orm.static.cache.CacheEntry`
+        """
+        key = (ledger, table, id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.expires <= time.monotonic():
+                del self._entries[key]
+                self.bytes -= entry.size
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(self, ledger, table, id, snapshot, meta_id, version):
+        """Cache the latest revision of a document. A deep copy of the `snapshot` is stored, so later changes to the caller's value do not leak into the cache.
+
+        :param ledger: Name of the ledger
+        :type ledger: str
+        :param table: Name of the table
+        :type table: str
+        :param id: Index id of the document
+        :type id: str
+        :param snapshot: Native `dict` of document fields
+        :type snapshot: dict
+        :param meta_id: `metadata.id` of the document
+        :type meta_id: str
+        :param version: `metadata.version` of the revision
+        :type version: int
+        :return: Cached entry
+        :rtype: :class:`qldb_orm.static.cache.CacheEntry`
+        """
+        entry = CacheEntry(copy.deepcopy(snapshot), meta_id,
+                           version, time.monotonic() + self.ttl)
+        key = (ledger, table, id)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.bytes -= previous.size
+            self._entries[key] = entry
+            self.bytes += entry.size
+            self._evict()
+        return entry
+
+    def invalidate(self, ledger=None, table=None, id=None):
+        """Drop cached entries. Arguments narrow the entries dropped; with no arguments, the cache is cleared.
+
+        :param ledger: Name of the ledger, defaults to `None`
+        :type ledger: str, optional
+        :param table: Name of the table, defaults to `None`
+        :type table: str, optional
+        :param id: Index id of the document, defaults to `None`
+        :type id: str, optional
+        """
+        with self._lock:
+            if ledger is not None and table is not None and id is not None:
+                keys = [(ledger, table, id)] if (
+                    ledger, table, id) in self._entries else []
+            else:
+                keys = [key for key in self._entries
+                        if (ledger is None or key[0] == ledger)
+                        and (table is None or key[1] == table)
+                        and (id is None or key[2] == id)]
+            for key in keys:
+                self.bytes -= self._entries.pop(key).size
+
+
+cache = DocumentCache()
@@ -0,0 +1,125 @@
+import datetime
+import json
+import os
+from qldb_orm.static.logger import getLogger
+
+log = getLogger('qldb-orm.checkpoint')
+
+
+def txtime(value):
+    """Convert the `metadata.txTime` of a revision, either a `datetime.datetime` or its down converted `str`, into a timezone-aware `datetime.datetime`. Times without an offset are taken to be UTC.
+
+    :param value: Commit time of a revision
+    :return: Commit time
+    :rtype: datetime.datetime
+    """
+    if not isinstance(value, datetime.datetime):
+        text = str(value).strip()
+        if text.endswith('Z'):
+            text = text[:-1] + '+00:00'
+        value = datetime.datetime.fromisoformat(text)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=datetime.timezone.utc)
+    return value
+
+
+class Checkpoint():
+    """Resume point of a revision history tail, see `qldb-orm.qldb.Query.history_since`. A checkpoint holds a watermark, a commit time up to which every revision was read, along with the `(metadata.id, metadata.version)` of each revision read at or after that time, since history bounds are inclusive and those revisions are read again on the next call.
+
+    **QLDB** does not return the revisions of different documents in commit order, so the watermark does not move while revisions are read: `advance()` only records each revision read, and `complete()` moves the watermark up to the latest of them once the whole range of history was read. A tail that is interrupted keeps its watermark and skips the revisions it recorded.
+
+    If a `path` is given, the checkpoint is loaded from that file, if it exists, and `save()` writes it back as JSON. The file is replaced atomically, so an interrupted save leaves the previous checkpoint in place.
+
+    :param path: Path of the JSON file persisting the checkpoint, defaults to `None`, i.e. the checkpoint is only kept in memory
+    :type path: str, optional
+    :param time: Watermark, defaults to `None`, i.e. the start of the history
+    :type time: datetime.datetime, optional
+    :param revisions: `(metadata.id, metadata.version)` of the revisions committed at `time`, defaults to `()`
+    :type revisions: iterable, optional
+    """
+
+    def __init__(self, path=None, time=None, revisions=()):
+        self.path = path
+        self.time = None if time is None else txtime(time)
+        self.revisions = set(revisions)
+        self._times = {revision: self.time for revision in self.revisions}
+        if path is not None and os.path.exists(path):
+            self.load()
+
+    def _state(self):
+        def iso(time):
+            return None if time is None else time.isoformat()
+        return {
+            'time': iso(self.time),
+            'revisions': sorted([meta_id, version, iso(self._times.get((meta_id, version)))]
+                                for meta_id, version in self.revisions)
+        }
+
+    def _restore(self, state):
+        self.time = None if state['time'] is None else txtime(state['time'])
+        self.revisions, self._times = set(), {}
+        for meta_id, version, *time in state['revisions']:
+            self.revisions.add((meta_id, version))
+            # NOTE: checkpoints saved without commit times only held revisions committed at the watermark.
+            self._times[(meta_id, version)] = txtime(time[0]) if time and time[0] is not None else self.time
+
+    def load(self):
+        """Read the checkpoint from its file.
+        """
+        with open(self.path, 'r') as infile:
+            self._restore(json.load(infile))
+        log.debug("Loaded CHECKPOINT(%s = %s)", self.path, self.time)
+
+    def save(self):
+        """Write the checkpoint to its file, if it has one.
+        """
+        if self.path is None:
+            return
+        state = self._state()
+        temporary = '{}.tmp'.format(self.path)
+        with open(temporary, 'w') as outfile:
+            json.dump(state, outfile)
+        os.replace(temporary, self.path)
+        log.debug("Saved CHECKPOINT(%s = %s)", self.path, self.time)
+
+    def seen(self, meta_id, version, time):
+        """Check whether a revision was read before, i.e. it was committed before the watermark or it was recorded through `advance()`.
+
+        :param meta_id: `metadata.id` of the revision
+        :type meta_id: str
+        :param version: `metadata.version` of the revision
+        :type version: int
+        :param time: `metadata.txTime` of the revision
+        :type time: datetime.datetime
+        :return: True if the revision was read before, False otherwise
+        :rtype: bool
+        """
+        return (self.time is not None and time < self.time) or (meta_id, version) in self.revisions
+
+    def advance(self, meta_id, version, time):
+        """Record a revision as read. The watermark is not moved until `complete()` is called.
+
+        :param meta_id: `metadata.id` of the revision
+        :type meta_id: str
+        :param version: `metadata.version` of the revision
+        :type version: int
+        :param time: `metadata.txTime` of the revision
+        :type time: datetime.datetime
+        """
+        self.revisions.add((meta_id, version))
+        self._times[(meta_id, version)] = time
+
+    def complete(self, end=None):
+        """Move the watermark up to the latest revision recorded, once every revision from the watermark up to `end` was read. Only the revisions committed at or after the new watermark are kept.
+
+        :param end: Latest commit time of the range that was read, inclusive, defaults to `None`, i.e. the whole history
+        :type end: datetime.datetime, optional
+        """
+        end = None if end is None else txtime(end)
+        times = [time for time in self._times.values() if time is not None and (end is None or time <= end)]
+        if times and (self.time is None or max(times) > self.time):
+            self.time = max(times)
+        self.revisions = {revision for revision in self.revisions
+                          if self.time is None or self._times.get(revision) is None
+                          or self._times[revision] >= self.time}
+        self._times = {revision: self._times.get(revision) for revision in self.revisions}
@@ -1,6 +1,9 @@
 EQUALS = "="
 LIKE = "LIKE"
 IN = "IN"
+BETWEEN = "BETWEEN"
+OPERATORS = [EQUALS, "<>", ">", ">=", "<", "<=", LIKE, IN, BETWEEN]
+CONNECTORS = ["AND", "OR"]
 
 
 def where_equals(*columns):
@@ -56,3 +59,56 @@ def set_statement(*columns):
         else:
             clause += ', {} = ? '.format(column)
     return clause
+
+
+def bag(n):
+    """Generates a **PartiQL** bag of `n` parameters, `<< ?, ? .. , ? >>`, e.g. for inserting multiple documents in a single `INSERT` statement.
+
+    :param n: Number of parameters in the bag.
+    :type n: int
+    :return: bag of parameters
+    :rtype: str
+    """
+    if n < 1:
+        return None
+    return "<< " + ", ".join("?" for _ in range(n)) + " >>"
+
+
+def predicate(column, operator, n=1):
+    """Generates a single parameterized **PartiQL** predicate, e.g. `column > ?`, `column IN (?, ? .. , ?)` or `column BETWEEN ? AND ?`.
+
+    :param column: Column of the predicate.
+    :type column: str
+    :param operator: One of `qldb_orm.static.clauses.OPERATORS`.
+    :type operator: str
+    :param n: Number of parameters of an `IN` predicate, defaults to `1`.
+    :type n: int, optional
+    :return: predicate
+    :rtype: str
+    """
+    if operator == IN:
+        return "{} IN ({})".format(column, ",".join("?" for _ in range(n)))
+    if operator == BETWEEN:
+        return "{} BETWEEN ? AND ?".format(column)
+    return "{} {} ?".format(column, operator)
+
+
+def condition(shape):
+    """Generates a **PartiQL** condition from the shape of a `qldb_orm.static.filters.Where`, i.e. a `(connector, negated, children)` tuple whose children are either nested shapes or `(column, operator, n)` predicates. Nested conditions are parenthesized.
+
+    :param shape: Shape of the condition.
+    :type shape: tuple
+    :return: condition, without the `WHERE` keyword
+    :rtype: str
+    """
+    connector, negated, children = shape
+    parts = []
+    for child in children:
+        if len(child) == 3 and isinstance(child[2], tuple):
+            parts.append("({})".format(condition(child)))
+        else:
+            parts.append(predicate(*child))
+    clause = " {} ".format(connector).join(parts)
+    if negated:
+        return "NOT ({})".format(clause)
+    return clause
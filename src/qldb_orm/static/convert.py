@@ -0,0 +1,177 @@
+from base64 import standard_b64encode
+from math import isinf, isnan
+from amazon.ion.core import IonType
+from amazon.ion.simple_types import IonPyDict, IonPyNull, IonPyInt, IonPyFloat, IonPyDecimal, \
+    IonPyTimestamp, IonPyText, IonPyBytes, IonPySymbol
+from qldb_orm.static.objects import Strut
+
+# NOTE: characters stripped from string parameters. Double quotes are kept in document values, since they
+#       are bound as parameters rather than formatted into the statement.
+ESCAPES = str.maketrans('', '', '\\\'"\b\n\r\t\0')
+DOCUMENT_ESCAPES = str.maketrans('', '', '\\\'\b\n\r\t\0')
+
+NATIVE_SCALARS = (str, int, float, bool, type(None))
+
+
+def native_key(key):
+    """Convert a mapping key into a `str`, following the conventions of `json.dumps`.
+
+    :param key: Mapping key
+    :return: `str` key
+    :rtype: str
+    """
+    if isinstance(key, str):
+        return str(key)
+    if key is True:
+        return 'true'
+    if key is False:
+        return 'false'
+    if key is None:
+        return 'null'
+    if isinstance(key, float):
+        return float.__repr__(key)
+    return str(int(key))
+
+
+def ion_scalar(obj):
+    """Convert an `amazon.ion` scalar value into its native Python equivalent, mirroring `amazon.ion.json_encoder.IonToJSONEncoder`.
+
+    :param obj: `amazon.ion` scalar
+    :return: Native Python value
+    """
+    if isinstance(obj, IonPyNull):
+        return None
+    ion_type = obj.ion_type
+    if ion_type == IonType.BOOL:
+        return obj == 1
+    if isinstance(obj, IonPyInt):
+        return int(obj)
+    if isinstance(obj, IonPyFloat):
+        if isinf(obj) or isnan(obj):
+            return None
+        return float(obj)
+    if isinstance(obj, IonPyDecimal):
+        return float(obj)
+    if isinstance(obj, IonPyTimestamp):
+        return str(obj)
+    if isinstance(obj, IonPySymbol):
+        return obj.text
+    if isinstance(obj, IonPyText):
+        return str(obj)
+    if isinstance(obj, IonPyBytes):
+        if ion_type == IonType.BLOB:
+            return standard_b64encode(obj).decode('utf-8')
+        return ''.join(chr(b) for b in obj)
+    return None
+
+
+def _native_scalar(obj):
+    cls = type(obj)
+    if cls in NATIVE_SCALARS:
+        return obj
+    if isinstance(obj, IonPySymbol):
+        return obj.text
+    if hasattr(obj, 'ion_type'):
+        return ion_scalar(obj)
+    if isinstance(obj, bool):
+        return bool(obj)
+    if isinstance(obj, str):
+        return str(obj)
+    if isinstance(obj, int):
+        return int(obj)
+    if isinstance(obj, float):
+        return float(obj)
+    return obj
+
+
+def _clean_scalar(obj):
+    native = obj if type(obj) in NATIVE_SCALARS else _native_scalar(obj)
+    if type(native) is str:
+        return native.translate(DOCUMENT_ESCAPES)
+    return native
+
+
+def _clean_key(key):
+    return native_key(key).translate(DOCUMENT_ESCAPES)
+
+
+def _container(value):
+    """Fields of a struct as `(key, value)` pairs, the elements of a list, or `None` for any other value.
+    """
+    cls = type(value)
+    if cls in NATIVE_SCALARS:
+        return None
+    if cls is IonPyDict:
+        return {}, [(field, value[field]) for field in value.keys()]
+    if isinstance(value, Strut):
+        return {}, list(value._data.items())
+    if isinstance(value, dict):
+        return {}, list(value.items())
+    if isinstance(value, (list, tuple)) and not isinstance(value, IonPySymbol):
+        return [None] * len(value), list(enumerate(value))
+    return None
+
+
+def _walk(obj, key, scalar):
+    """Rebuild a nested value as native `dict` and `list` containers, converting struct keys with `key` and every other value with `scalar`. Walks the value with an explicit stack rather than recursion, so documents of any depth can be converted.
+    """
+    container = _container(obj)
+    if container is None:
+        return scalar(obj)
+    root = container[0]
+    stack = [container]
+    while stack:
+        converted, items = stack.pop()
+        mapping = type(converted) is dict
+        for field, value in items:
+            if mapping:
+                field = key(field)
+            container = _container(value)
+            if container is None:
+                converted[field] = scalar(value)
+            else:
+                converted[field] = container[0]
+                stack.append(container)
+    return root
+
+
+def to_native(obj):
+    """Convert an `amazon.ion` value, `qldb_orm.static.objects.Strut` or nested combination of the two into native Python `dict`, `list`, `str`, `int`, `float`, `bool` and `None` values. Walks the value directly, without serializing it to text.
+
+    :param obj: Value to convert
+    :return: Native Python value
+    """
+    if type(obj) in NATIVE_SCALARS:
+        return obj
+    return _walk(obj, native_key, _native_scalar)
+
+
+def clean_document(obj):
+    """Convert a document into native Python values, stripping escape characters from every key and string leaf in a single `str.translate` pass per string.
+
+    :param obj: Document, i.e. a `dict`, `amazon.ion.simple_types.IonPyDict` or `qldb_orm.static.objects.Strut`, or any value nested within one.
+    :return: Sanitized native Python value
+    """
+    return _walk(obj, _clean_key, _clean_scalar)
+
+
+def sanitize(obj):
+    """Strip escape characters from a statement or statement parameter.
+
+    1. `int` and `float` are returned as is.
+    2. Documents (`dict`, `amazon.ion.simple_types.IonPyDict`, `qldb_orm.static.objects.Strut`) are converted into native `dict` with every key and string leaf sanitized, except double quotes are kept.
+    3. `list` elements are converted to `str` and sanitized.
+    4. `str` is sanitized.
+
+    :param obj: Statement or parameter to sanitize
+    :return: Sanitized value
+    """
+    if isinstance(obj, (int, float)):
+        return obj
+    if isinstance(obj, (dict, IonPyDict, Strut)):
+        return clean_document(obj)
+    if isinstance(obj, list):
+        return [str(param).translate(ESCAPES) for param in obj]
+    if isinstance(obj, str):
+        return obj.translate(ESCAPES)
+    return obj
@@ -0,0 +1,139 @@
+import threading
+from queue import Queue, Empty, Full
+from qldb_orm import settings
+from qldb_orm.static.logger import getLogger
+
+log = getLogger('qldb-orm.cursor')
+
+_DONE = object()
+
+
+class _Failure():
+    def __init__(self, error):
+        self.error = error
+
+
+class ResultStream():
+    """Lazy iterator over the results of a **QLDB** transaction. The transaction is executed on a background thread, which reads the `pyqldb` cursor page by page *inside* the transaction and hands rows over through a bounded buffer, so at most `buffer_size` rows (plus the page being read) are held in memory at once.
+
+    The transaction starts on the first call to `next()`. Closing the stream, either explicitly through `close()`, by leaving a `with` block, or by abandoning a generator built on top of it, stops reading and ends the transaction early.
+
+    :param driver: QLDB Driver
+    :type driver: :class:`pyqldb.driver.qldb_driver.QldbDriver`
+    :param query_lambda: Function that receives a `pyqldb.execution.executor.Executor` and returns a cursor, i.e. the same function that would be passed to `execute_lambda`.
+    :type query_lambda: function
+    :param buffer_size: Maximum number of rows buffered between the transaction and the consumer, defaults to `qldb_orm.settings.STREAM_BUFFER`.
+    :type buffer_size: int, optional
+
+    .. note::
+      If the driver retries the transaction after rows have been handed out, rows already read are skipped on the retry so the consumer does not see duplicates.
+    """
+
+    def __init__(self, driver, query_lambda, buffer_size=settings.STREAM_BUFFER):
+        self.driver = driver
+        self.query_lambda = query_lambda
+        self._queue = Queue(maxsize=max(buffer_size, 1))
+        self._stopped = threading.Event()
+        self._thread = None
+        self._produced = 0
+        self._finished = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._finished:
+            raise StopIteration
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+        item = self._queue.get()
+        if item is _DONE:
+            self._finish()
+            raise StopIteration
+        if isinstance(item, _Failure):
+            self._finish()
+            raise item.error
+        return item
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _put(self, item):
+        """Block until `item` fits into the buffer or the stream is closed.
+
+        :return: True if the item was buffered, False if the stream was closed
+        :rtype: bool
+        """
+        while not self._stopped.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except Full:
+                continue
+        return False
+
+    def _transaction(self, executor):
+        skip = self._produced
+        cursor = self.query_lambda(executor)
+        try:
+            for row in cursor:
+                if skip > 0:
+                    skip -= 1
+                    continue
+                if not self._put(row):
+                    break
+                self._produced += 1
+        finally:
+            close = getattr(cursor, 'close', None)
+            if close is not None:
+                close()
+
+    def _run(self):
+        try:
+            self.driver.execute_lambda(self._transaction)
+        except Exception as e:  # pylint: disable=broad-except
+            self._put(_Failure(e))
+        finally:
+            self._put(_DONE)
+
+    def _finish(self):
+        self._finished = True
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def close(self):
+        """Stop reading results and end the transaction. Any buffered rows are discarded.
+        """
+        if self._finished:
+            return
+        self._stopped.set()
+        while True:
+            try:
+                self._queue.get_nowait()
+            except Empty:
+                break
+        self._finish()
+        log.debug("Closed result stream after %s rows", self._produced)
+
+
+class StreamingDriver():
+    """Wrapper around a `pyqldb.driver.qldb_driver.QldbDriver` whose `execute_lambda` returns a lazy `qldb_orm.static.cursor.ResultStream` instead of a fully buffered cursor. Since it exposes the same `execute_lambda` signature, it can be passed to any of the `qldb_orm.static.driver.Driver` query methods in place of a driver.
+
+    :param driver: QLDB Driver
+    :type driver: :class:`pyqldb.driver.qldb_driver.QldbDriver`
+    :param buffer_size: Maximum number of rows buffered per stream, defaults to `qldb_orm.settings.STREAM_BUFFER`.
+    :type buffer_size: int, optional
+    """
+
+    def __init__(self, driver, buffer_size=settings.STREAM_BUFFER):
+        self.driver = driver
+        self.buffer_size = buffer_size
+
+    def execute_lambda(self, query_lambda):
+        return ResultStream(self.driver, query_lambda, self.buffer_size)
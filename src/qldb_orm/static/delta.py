@@ -0,0 +1,209 @@
+from collections import OrderedDict
+from collections.abc import Mapping
+from amazon.ion.simple_types import IonPyDict
+from qldb_orm import settings
+from qldb_orm.static.objects import Strut
+
+ADD = 'add'
+REMOVE = 'remove'
+CHANGE = 'change'
+
+
+class Change():
+    """A change to a single path of a snapshot, see `qldb-orm.static.delta.diff`.
+
+    :param kind: `add`, `remove` or `change`
+    :type kind: str
+    :param path: Keys of the changed field, from the root of the snapshot; list elements are addressed by their `int` index, e.g. `('members', 0, 'name')`
+    :type path: tuple
+    :param old: Value before the change, `None` for an `add`
+    :param new: Value after the change, `None` for a `remove`
+    """
+    __slots__ = ('kind', 'path', 'old', 'new')
+
+    def __init__(self, kind, path, old=None, new=None):
+        self.kind = kind
+        self.path = path
+        self.old = old
+        self.new = new
+
+    def __eq__(self, other):
+        if isinstance(other, Change):
+            return (self.kind, self.path, self.old, self.new) == (other.kind, other.path, other.old, other.new)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return 'Change({!r}, {!r}, {!r}, {!r})'.format(self.kind, self.path, self.old, self.new)
+
+
+def _unwrap(value):
+    return value._data if isinstance(value, Strut) else value
+
+
+def _mapping(value):
+    # NOTE: `IonPyDict` is an abstract `Mapping`, so `isinstance` checks against it are slow; test the exact type first.
+    return type(value) is dict or type(value) is IonPyDict or isinstance(value, Mapping)
+
+
+def _differs(old, new):
+    # NOTE: `True == 1`, but a field that changed from an `int` to a `bool` still changed.
+    return old != new or isinstance(old, bool) is not isinstance(new, bool)
+
+
+def diff(old, new):
+    """Structural diff between two snapshots, i.e. `dict`, Ion struct or `qldb-orm.static.objects.Strut` trees. Structs are compared key by key and lists element by element, so a change deep within a document is reported at its own path rather than as a change to the whole document. Subtrees shared by both snapshots are skipped without being walked.
+
+    :param old: Earlier snapshot
+    :param new: Later snapshot
+    :return: Changes that turn `old` into `new`. Elements removed from the end of a list are reported from the last one, so the changes can be applied in order, see `qldb-orm.static.delta.patch`.
+    :rtype: list
+
+    .. note::
+      Lists are compared by position: an element inserted at the front of a list is reported as a change to every following element and an `add` at its end.
+    """
+    changes = []
+    stack = [((), old, new)]
+    while stack:
+        path, old, new = stack.pop()
+        if old is new:
+            continue
+        old, new = _unwrap(old), _unwrap(new)
+        if _mapping(old) and _mapping(new):
+            nested = []
+            for key in old.keys():
+                if key in new:
+                    nested.append((path + (key,), old[key], new[key]))
+                else:
+                    changes.append(Change(REMOVE, path + (key,), _unwrap(old[key])))
+            for key in new.keys():
+                if key not in old:
+                    changes.append(Change(ADD, path + (key,), new=_unwrap(new[key])))
+            stack.extend(reversed(nested))
+        elif isinstance(old, list) and isinstance(new, list):
+            common = min(len(old), len(new))
+            for index in range(len(old) - 1, common - 1, -1):
+                changes.append(Change(REMOVE, path + (index,), _unwrap(old[index])))
+            for index in range(common, len(new)):
+                changes.append(Change(ADD, path + (index,), new=_unwrap(new[index])))
+            stack.extend((path + (index,), old[index], new[index]) for index in range(common - 1, -1, -1))
+        elif _differs(old, new):
+            changes.append(Change(CHANGE, path, old, new))
+    return changes
+
+
+def _copy(value):
+    value = _unwrap(value)
+    return list(value) if isinstance(value, list) else dict(value)
+
+
+def patch(snapshot, changes):
+    """Apply the changes returned by `qldb-orm.static.delta.diff` to a snapshot. The snapshot is not modified: only the structs and lists along the changed paths are copied, and every other subtree is shared with `snapshot`.
+
+    :param snapshot: Snapshot to apply the changes to
+    :param changes: Changes to apply, in order
+    :type changes: list
+    :return: The changed snapshot
+    """
+    root, copies = snapshot, set()
+    for change in changes:
+        if not change.path:
+            root, copies = change.new, set()
+            continue
+        if id(root) not in copies:
+            root = _copy(root)
+            copies.add(id(root))
+        node = root
+        for key in change.path[:-1]:
+            child = node[key]
+            if id(child) not in copies:
+                child = _copy(child)
+                copies.add(id(child))
+                node[key] = child
+            node = child
+        key = change.path[-1]
+        if change.kind == REMOVE:
+            del node[key]
+        elif change.kind == ADD and isinstance(node, list):
+            node.insert(key, change.new)
+        else:
+            node[key] = change.new
+    return root
+
+
+class DeltaChain():
+    """Versioned snapshots, stored as a full snapshot every `interval` versions and as the changes from the previous version in between, see `qldb-orm.static.delta.diff`. Any version can be read back; it is rebuilt from the closest earlier full snapshot, and the last `cache_size` rebuilt versions are cached. Rebuilt snapshots share their unchanged subtrees with the stored ones, so they must not be modified.
+
+    :param interval: Number of versions between full snapshots, defaults to `qldb-orm.settings.STRAND_PAGE_SIZE`
+    :type interval: int, optional
+    :param cache_size: Number of rebuilt versions to cache, defaults to `8`
+    :type cache_size: int, optional
+    """
+
+    def __init__(self, interval=settings.STRAND_PAGE_SIZE, cache_size=8):
+        self.interval = max(1, interval)
+        self.cache_size = cache_size
+        self._snapshots = {}
+        self._deltas = {}
+        self._cache = OrderedDict()
+
+    def __contains__(self, version):
+        return version in self._snapshots or version in self._deltas
+
+    def __len__(self):
+        return len(self._snapshots) + len(self._deltas)
+
+    def put(self, version, snapshot):
+        """Store a version. Versions should be stored in ascending order, so that they can be stored as changes from the previous version; a version already stored is ignored.
+
+        :param version: Version of the snapshot
+        :type version: int
+        :param snapshot: Snapshot of the version; it must not be modified once it is stored
+        """
+        if version in self:
+            return
+        if version % self.interval and version - 1 in self:
+            self._deltas[version] = diff(self.get(version - 1), snapshot)
+        else:
+            self._snapshots[version] = snapshot
+        following = version + 1
+        # NOTE: the next version was stored first, as a full snapshot, e.g. when the newest page is read first.
+        if following % self.interval and following in self._snapshots:
+            self._deltas[following] = diff(snapshot, self._snapshots.pop(following))
+        self._remember(version, snapshot)
+
+    def get(self, version):
+        """Read a version.
+
+        :param version: Version of the snapshot
+        :type version: int
+        :raises KeyError: If the version is not stored
+        :return: Snapshot of the version
+        """
+        if version in self._cache:
+            self._cache.move_to_end(version)
+            return self._cache[version]
+        base = version
+        while base not in self._snapshots and base not in self._cache:
+            if base not in self._deltas:
+                raise KeyError(version)
+            base -= 1
+        snapshot = self._cache[base] if base in self._cache else self._snapshots[base]
+        for following in range(base + 1, version + 1):
+            snapshot = patch(snapshot, self._deltas[following])
+        self._remember(version, snapshot)
+        return snapshot
+
+    def _remember(self, version, snapshot):
+        self._cache[version] = snapshot
+        self._cache.move_to_end(version)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def clear(self):
+        """Drop every stored version.
+        """
+        self._snapshots.clear()
+        self._deltas.clear()
+        self._cache.clear()
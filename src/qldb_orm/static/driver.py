@@ -1,25 +1,37 @@
-from json import loads, dumps
-from amazon.ion.simple_types import IonPyDict
-from amazon.ion.json_encoder import IonToJSONEncoder
+import logging
 from pyqldb.driver.qldb_driver import QldbDriver
-from qldb-orm.static.logger import getLogger
-from qldb-orm.static import clauses
-from qldb-orm.static.objects import Strut, StrutEncoder
+from qldb_orm import settings
+from qldb_orm.static.logger import getLogger
+from qldb_orm.static import convert, statements
+from qldb_orm.static.pool import pool
+from qldb_orm.static.cursor import StreamingDriver
+from qldb_orm.static.memory import MemoryDriver
+from qldb_orm.static.objects import resolve
+from qldb_orm.static.filters import Where
+from qldb_orm.static.metrics import instrumentation, attempts
+from qldb_orm.static import metrics
 
 log = getLogger('qldb-orm.driver')
 
+# NOTE: a backend is any constructor accepting `ledger_name` and keyword configuration that returns an object
+#       exposing the `execute_lambda`, `list_tables` and `close` methods of a `QldbDriver`.
+backends = {
+    'qldb': QldbDriver,
+    'memory': MemoryDriver
+}
+
 
 class Driver():
     @staticmethod
     def down_convert(ion_obj):
-        """Down nonvert an `amazon.ion` ION object
+        """Down convert an `amazon.ion` ION object into native Python values.
 
         :param ion_obj: an `Amazon.ion` object.
         :type ion_obj: [type]
         :return: JSON object
         :rtype: dict
         """
-        return loads(dumps(ion_obj, cls=IonToJSONEncoder))
+        return convert.to_native(ion_obj)
 
     @staticmethod
     def sanitize(obj):
@@ -29,66 +41,112 @@ class Driver():
         :type query: str
         :return: Sanitized query
         """
-        dict_flag, list_flag = False, False
-
-        if isinstance(obj, (int, float)):
-            return obj
-
-        if isinstance(obj, (dict, IonPyDict)):
-            dict_flag = True
-            obj = loads(dumps(obj, cls=StrutEncoder))
-            obj = dumps(obj, cls=IonToJSONEncoder)
-
-        elif isinstance(obj, list):
-            list_flag = True
-            obj = "~~".join(str(param) for param in obj)
-
-        for char in ["\\", "\'", "\"", "\b", "\n", "\r", "\t", "\0"]:
-            if not dict_flag or not char == "\"":
-                obj = obj.replace(char, "")
-
-        if dict_flag:
-            obj = loads(obj)
-
-        elif list_flag:
-            obj = obj.split("~~")
-
-        return obj
+        return convert.sanitize(obj)
 
     @staticmethod
     def execute(transaction_executor, statement, *params, unsafe=False):
         r"""Static method for executing transactions with QLDB driver.
 
         :param transaction_executor: Executor is injected into callback function through `pyqldb.driver.qldb_driver.execute_lambda` method.
-        :param statement: Parameterized PartialQL query.
+        :param statement: Parameterized PartialQL query. Statements built by `qldb_orm.static.statements` are executed as is, since their identifiers were validated when they were built.
         :type statement: str
         :param \*params: Arguments for parameterized query.
         """
-        sanitized_statement = Driver().sanitize(statement)
-        if len(params) == 0:
-            log.debug(
-                "Executing statement: \n\t\t\t\t\t\t\t %s \n", sanitized_statement)
-            return transaction_executor.execute_statement(sanitized_statement)
-
-        if unsafe:
+        if isinstance(statement, statements.Statement):
+            sanitized_statement = statement
+        else:
+            sanitized_statement = Driver.sanitize(statement)
+        if unsafe or len(params) == 0:
             sanitized_params = params
         else:
-            sanitized_params = tuple(Driver().sanitize(param)
+            sanitized_params = tuple(Driver.sanitize(param)
                                      for param in params)
-        log.debug(
-            "Executing statement: \n\t\t\t\t\t\t\t %s \n\t\t\t\t\t\t\t parameters: %s \n", sanitized_statement, sanitized_params)
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("Executing statement: \n\t\t\t\t\t\t\t %s \n\t\t\t\t\t\t\t parameters: %s \n",
+                      sanitized_statement, sanitized_params)
+        if instrumentation.active:
+            return metrics.execute(instrumentation, transaction_executor, sanitized_statement, sanitized_params)
         return transaction_executor.execute_statement(sanitized_statement, *sanitized_params)
 
     @staticmethod
-    def driver(ledger):
-        """Static method for retrieving a QLDB driver
+    def transaction(driver, query_lambda):
+        """Static method for executing a function within a transaction. If statement hooks are registered on `qldb_orm.static.metrics.instrumentation`, attempts are counted, so statement events report how often the transaction was retried.
+
+        :param driver: QLDB Driver
+        :type driver: :class:`pyqldb.driver.qldb_driver.QldbDriver`
+        :param query_lambda: Function that receives a `pyqldb.execution.executor.Executor`
+        :type query_lambda: function
+        :return: Result of `query_lambda`
+        """
+        if instrumentation.active:
+            query_lambda = attempts(query_lambda)
+        return driver.execute_lambda(query_lambda)
+
+    @staticmethod
+    def register_backend(name, backend):
+        """Static method for registering a driver backend, so it can be selected through the **BACKEND** environment variable or the `backend` argument of `qldb_orm.static.driver.Driver.driver`.
+
+        :param name: Name of the backend
+        :type name: str
+        :param backend: Constructor accepting `ledger_name` and keyword configuration, returning an object that exposes `execute_lambda`, `list_tables` and `close`.
+        :type backend: type
+        """
+        backends[name] = backend
+
+    @staticmethod
+    def backend(name=None):
+        """Static method for retrieving a driver backend by name.
+
+        :param name: Name of the backend, defaults to `qldb_orm.settings.BACKEND`. Built-in backends are `qldb`, for `pyqldb.driver.qldb_driver.QldbDriver`, and `memory`, for the in-memory `qldb_orm.static.memory.MemoryDriver`.
+        :type name: str, optional
+        :return: Driver constructor
+        :rtype: type
+        """
+        name = name or settings.BACKEND
+        if name not in backends:
+            raise ValueError('Unknown backend: {}. Registered backends are: {}'.format(
+                name, ', '.join(backends)))
+        return backends[name]
+
+    @staticmethod
+    def driver(ledger, pooled=True, backend=None, **config):
+        """Static method for retrieving a QLDB driver. Drivers are shared through the process-wide `qldb_orm.static.pool.DriverPool`, so sessions are reused across calls.
 
         :param ledger: Name of the ledger
         :type ledger: str
+        :param pooled: Flag to retrieve the driver from the pool, defaults to `True`. If `False`, a new driver is created; the caller is responsible for closing it.
+        :type pooled: bool, optional
+        :param backend: Name of the driver backend, defaults to `qldb_orm.settings.BACKEND`. See `qldb_orm.static.driver.Driver.backend`.
+        :type backend: str, optional
+        :param config: Keyword arguments passed through to the backend constructor, e.g. `pyqldb.driver.qldb_driver.QldbDriver`.
         :return: QLDB Driver
         :rtype: :class:`pyqldb.driver.qldb_driver.QldbDriver`
         """
-        return QldbDriver(ledger_name=ledger)
+        factory = Driver.backend(backend)
+        if not pooled:
+            return factory(ledger_name=ledger, **config)
+        return pool.get(ledger, backend=factory, **config)
+
+    @staticmethod
+    def stream(ledger, **config):
+        """Static method for retrieving a streaming QLDB driver. Query methods invoked with a streaming driver return a lazy `qldb_orm.static.cursor.ResultStream` that reads result pages inside the transaction, instead of a fully buffered cursor.
+
+        :param ledger: Name of the ledger
+        :type ledger: str
+        :param config: Keyword arguments passed through to `qldb_orm.static.driver.Driver.driver`.
+        :return: Streaming QLDB Driver
+        :rtype: :class:`qldb_orm.static.cursor.StreamingDriver`
+        """
+        return StreamingDriver(Driver.driver(ledger, **config))
+
+    @staticmethod
+    def close(ledger=None):
+        """Static method for closing pooled QLDB drivers.
+
+        :param ledger: Name of the ledger, defaults to `None`. If `None`, all pooled drivers are closed.
+        :type ledger: str, optional
+        """
+        pool.close(ledger)
 
     @staticmethod
     def query(driver, query, unsafe=False):
@@ -102,7 +160,7 @@ class Driver():
         :type unsafe: bool, optional
         :return: Iterable containg result
         """
-        return driver.execute_lambda(lambda executor: Driver.execute(executor, query, unsafe=unsafe))
+        return Driver.transaction(driver, lambda executor: Driver.execute(executor, query, unsafe=unsafe))
 
     @staticmethod
     def tables(ledger):
@@ -113,7 +171,21 @@ class Driver():
         :return: List of tables in ledger
         :rtype: list
         """
-        return QldbDriver(ledger_name=ledger).list_tables()
+        return Driver.driver(ledger).list_tables()
+
+    @staticmethod
+    def indexes(ledger):
+        """Return the indexed fields of every active table in the current **QLDB** ledger, read from `information_schema.user_tables`.
+
+        :param ledger: Name of the ledger
+        :type ledger: str
+        :return: `dict` mapping table names to a `set` of indexed fields
+        :rtype: dict
+        """
+        rows = Driver.transaction(Driver.driver(ledger), lambda executor: Driver.execute(
+            executor, statements.USER_TABLES))
+        return {str(row['name']): {str(index['expr']).strip('[]`"\' ') for index in (row.get('indexes') or ())}
+                for row in rows}
 
     @staticmethod
     def create_table(driver, table):
@@ -125,15 +197,13 @@ class Driver():
         :type table: str
         :return: iterable containing result
         """
-        # NOTE: I don't like directly formatting strings with query parameters that will
-        # be run directly against the persistence layer (since malicious users could inject
-        # bad parameters), but the driver won't parameterize `Create`` queries for some reason.
-        # What follows is how the official documentation does it:
+        # NOTE: the driver won't parameterize `Create` queries, so the table name is formatted directly
+        # into the statement, as the official documentation does it:
         # https://docs.aws.amazon.com/qldb/latest/developerguide/getting-started.python.step-3.html
-        # NOTE: This is going to necessitate some logic in this library to prevent malicious strings from
-        # gettings injected through parameters.
-        statement = 'Create TABLE {}'.format(table)
-        return driver.execute_lambda(lambda executor: Driver.execute(executor, statement))
+        # `qldb_orm.static.statements` validates the identifier to prevent malicious strings from
+        # getting injected.
+        statement = statements.create_table(table)
+        return Driver.transaction(driver, lambda executor: Driver.execute(executor, statement))
 
     @staticmethod
     def create_index(driver, table, index):
@@ -148,11 +218,11 @@ class Driver():
         :return: iterable containing result
         """
         # NOTE: See above note.
-        statement = 'CREATE INDEX on {} ({})'.format(table, index)
-        return driver.execute_lambda(lambda executor: Driver.execute(executor, statement))
+        statement = statements.create_index(table, index)
+        return Driver.transaction(driver, lambda executor: Driver.execute(executor, statement))
 
     @staticmethod
-    def history(driver, table, id):
+    def history(driver, table, id, start=None, end=None, version=None, until=None):
         """Query table revision history for a particular document metadata ID.
 
         :param driver: QLDB Driver
@@ -161,26 +231,44 @@ class Driver():
         :type table: str
         :param id: metadata id of the document revision history
         :type id: str
+        :param start: earliest commit time of the revisions, inclusive, defaults to `None`
+        :type start: datetime.datetime, optional
+        :param end: latest commit time of the revisions, inclusive, defaults to `None`
+        :type end: datetime.datetime, optional
+        :param version: only return revisions whose `metadata.version` is greater than `version`, defaults to `None`
+        :type version: int, optional
+        :param until: only return revisions whose `metadata.version` is at most `until`, defaults to `None`
+        :type until: int, optional
         :return: iterable containing result
 
         .. note::
           `id` is *not* the index of the document. It is the `metadata.id` associated with the document across revisions. Query entire history to find a particular `metadata.id`
         """
-        statement = 'SELECT * FROM history({}) WHERE metadata.id = ?'.format(table)
-        return driver.execute_lambda(lambda executor: Driver.execute(executor, statement, id))
+        lookups = {}
+        if version is not None:
+            lookups['metadata__version__gt'] = version
+        if until is not None:
+            lookups['metadata__version__lte'] = until
+        shape, params = Where(**lookups).compile() if lookups else (None, ())
+        statement = statements.history(table, start, end, equals=('metadata.id',), where=shape)
+        return Driver.transaction(driver, lambda executor: Driver.execute(executor, statement, id, *params))
 
     @staticmethod
-    def history_full(driver, table):
-        """Query entire table revision history.
+    def history_full(driver, table, start=None, end=None):
+        """Query entire table revision history, optionally bounded by commit time through `history(table, start, end)`.
 
         :param driver: QLDB Driver
         :type driver: :class:`pyqldb.driver.qldb_driver.QldbDriver`
         :param table: table to be updated
         :type table: str
+        :param start: earliest commit time of the revisions, inclusive, defaults to `None`
+        :type start: datetime.datetime, optional
+        :param end: latest commit time of the revisions, inclusive, defaults to `None`
+        :type end: datetime.datetime, optional
         :return: iterable containing result
         """
-        statement = 'SELECT * FROM history({})'.format(table)
-        return driver.execute_lambda(lambda executor: Driver.execute(executor, statement))
+        statement = statements.history(table, start, end)
+        return Driver.transaction(driver, lambda executor: Driver.execute(executor, statement))
 
     @staticmethod
     def insert(driver, document, table):
@@ -194,13 +282,26 @@ class Driver():
         :type table: str
         :return: iterable containing result
         """
-        # NOTE: See above note.
-        # TODO: check table string for malicious parameterization
-        statement = 'INSERT INTO {} ?'.format(table)
-        return driver.execute_lambda(lambda executor: Driver.execute(executor, statement, document))
+        statement = statements.insert(table)
+        return Driver.transaction(driver, lambda executor: Driver.execute(executor, statement, document))
 
     @staticmethod
-    def update(driver, document, table, index):
+    def assignments(document, columns=()):
+        """Sanitized parameters of the `SET` clause of an `UPDATE`, i.e. the whole `document`, or the value of each of the `columns` within it. Values are sanitized as document fields, so e.g. `list` values keep the type of their elements.
+
+        :param document: document to be updated
+        :type document: dict
+        :param columns: dotted paths to set, defaults to `()`, i.e. the whole document
+        :type columns: tuple, optional
+        :return: parameters
+        :rtype: tuple
+        """
+        if not columns:
+            return (Driver.sanitize(document),)
+        return tuple(convert.clean_document(resolve(document, column)) for column in columns)
+
+    @staticmethod
+    def update(driver, document, table, index, columns=()):
         """Static method for updating QLDB table
 
         :param driver: QLDB Driver
@@ -211,18 +312,110 @@ class Driver():
         :type table: dict
         :param index: name of the table index
         :type index: str
+        :param columns: dotted paths of the document to set, defaults to `()`, i.e. the whole document is replaced
+        :type columns: tuple, optional
         :return: iterable containing result set
         """
-        lookup = document[index]
-        # NOTE: See notes in prior methods
-        # TODO: check table string for malicious parameterization
-        query = 'UPDATE {} as p SET p = ? WHERE {} = ?'.format(table, index)
-        return driver.execute_lambda(lambda executor: Driver.execute(
-            executor, query, document, lookup
+        lookup = Driver.sanitize(document[index])
+        query = statements.update(table, index, columns)
+        params = Driver.assignments(document, columns)
+        return Driver.transaction(driver, lambda executor: Driver.execute(
+            executor, query, *params, lookup, unsafe=True
         ))
 
     @staticmethod
-    def query_all(driver, table):
+    def upsert(driver, document, table, index, columns=()):
+        """Static method for inserting or updating a document in a single transaction. The existence check and the write are executed through the same transaction executor, so only one transaction is committed and no other writer can interleave between the check and the write.
+
+        :param driver: QLDB Driver
+        :type driver: :class:`pyqldb.driver.qldb_driver.QldbDriver`
+        :param document: document to be inserted or updated
+        :type document: dict
+        :param table: name of the table where the document is
+        :type table: str
+        :param index: name of the table index
+        :type index: str
+        :param columns: dotted paths of the document to set if it exists, defaults to `()`, i.e. the whole document is replaced. A document that does not exist is always inserted whole.
+        :type columns: tuple, optional
+        :return: iterable containing result set
+        """
+        select = statements.select(table, equals=(index,), fields=(index,), by=None)
+        update = statements.update(table, index, columns)
+        insert = statements.insert(table)
+
+        # NOTE: the lambda may be retried on OCC conflicts, so parameters are sanitized once up front.
+        sanitized_document = Driver.sanitize(document)
+        sanitized_params = Driver.assignments(document, columns) if columns else (sanitized_document,)
+        lookup = Driver.sanitize(document[index])
+
+        def write(executor):
+            if next(iter(Driver.execute(executor, select, lookup, unsafe=True)), None) is not None:
+                return Driver.execute(executor, update, *sanitized_params, lookup, unsafe=True)
+            return Driver.execute(executor, insert, sanitized_document, unsafe=True)
+
+        return Driver.transaction(driver, write)
+
+    @staticmethod
+    def bulk_upsert(driver, documents, table, index, exists=None):
+        """Static method for inserting or updating a batch of documents in a single transaction. Existing documents are found with one `SELECT ... WHERE index IN (...)`, new documents are written with one multi-document `INSERT INTO table << ?, ... >>` and existing documents are updated individually.
+
+        :param driver: QLDB Driver
+        :type driver: :class:`pyqldb.driver.qldb_driver.QldbDriver`
+        :param documents: documents to be inserted or updated
+        :type documents: list
+        :param table: name of the table where the documents are
+        :type table: str
+        :param index: name of the table index
+        :type index: str
+        :param exists: Hint for whether the documents already exist, defaults to `None`. If `True`, every document is updated; if `False`, every document is inserted. In either case, the existence check is skipped.
+        :type exists: bool, optional
+        :return: `documentId` of each document, in the same order as `documents`. Documents sharing an index value are written once, with the last of their snapshots, and share its `documentId`.
+        :rtype: list
+
+        .. note::
+          **QLDB** limits the number of documents a single transaction can modify, see `qldb_orm.settings.BATCH_SIZE`. Use `qldb_orm.qldb.Query.bulk_save` to split a large collection into batches.
+        """
+        update = statements.update(table, index)
+
+        # NOTE: the lambda may be retried on OCC conflicts, so parameters are sanitized once up front.
+        sanitized_documents = [Driver.sanitize(document)
+                               for document in documents]
+        lookups = [Driver.sanitize(document[index]) for document in documents]
+        # NOTE: a document repeated within the batch is written once, with its last snapshot, as saving the
+        #       documents one by one would leave it.
+        last = {lookup: i for i, lookup in enumerate(lookups)}
+        unique = sorted(last.values())
+
+        def write(executor):
+            if exists is None:
+                select = statements.select(
+                    table, within=((index, len(unique)),), fields=(index,), by=None)
+                existing = {row[index] for row in Driver.execute(
+                    executor, select, *statements.pad([lookups[i] for i in unique]), unsafe=True)}
+                flags = {i: lookups[i] in existing for i in unique}
+            else:
+                flags = dict.fromkeys(unique, exists)
+
+            ids = {}
+            inserts = [i for i in unique if not flags[i]]
+            if inserts:
+                insert = statements.insert(table, len(inserts))
+                results = Driver.execute(executor, insert, *(sanitized_documents[i] for i in inserts),
+                                         unsafe=True)
+                for i, result in zip(inserts, results):
+                    ids[i] = result['documentId']
+
+            for i in unique:
+                if flags[i]:
+                    result = next(iter(Driver.execute(
+                        executor, update, sanitized_documents[i], lookups[i], unsafe=True)), None)
+                    ids[i] = result['documentId'] if result is not None else None
+            return [ids.get(last[lookup]) for lookup in lookups]
+
+        return Driver.transaction(driver, write)
+
+    @staticmethod
+    def query_all(driver, table, projection=None):
         """Static method for querying table by field.
 
         :param driver: QLDB Driver
@@ -233,15 +426,17 @@ class Driver():
         :type value: str
         :param table: table to be quiered
         :type table: str
+        :param projection: Paths to select, either as `path` or `(path, alias)`, defaults to `None`, i.e. `SELECT *`
+        :type projection: tuple, optional
         :return: iterable containing result
         """
-        statement = 'SELECT * FROM {} BY meta_id'.format(table)
-        return driver.execute_lambda(lambda executor: Driver.execute(
+        statement = statements.select(table, fields=projection)
+        return Driver.transaction(driver, lambda executor: Driver.execute(
             executor, statement
         ))
 
     @staticmethod
-    def query_by_fields(driver, table, **fields):
+    def query_by_fields(driver, table, projection=None, **fields):
         """Static method for querying table by field.
 
         :param driver: QLDB Driver
@@ -249,24 +444,85 @@ class Driver():
         :param fields: Keyword arguments. A dictionary containing the fields used to construct `WHERE` clause in query.
         :type fields: dict
         :type table: str
+        :param projection: Paths to select, either as `path` or `(path, alias)`, defaults to `None`, i.e. `SELECT *`
+        :type projection: tuple, optional
         :return: iterable containing result
         """
+        columns, values = tuple(fields.keys()), list(fields.values())
+        statement = statements.select(table, equals=columns, fields=projection)
+        return Driver.transaction(driver, lambda executor: Driver.execute(
+            executor, statement, *values
+        ))
+
+    @staticmethod
+    def query_where(driver, table, where, projection=None):
+        """Static method for querying table by an arbitrary condition, e.g. range, `LIKE` and nested path predicates combined with `AND` and `OR`.
+
+        :param driver: QLDB Driver
+        :type driver: :class:`pyqldb.driver.qldb_driver.QldbDriver`
+        :param table: table to be queried
+        :type table: str
+        :param where: condition used to construct the `WHERE` clause in query
+        :type where: :class:`qldb_orm.static.filters.Where`
+        :param projection: Paths to select, either as `path` or `(path, alias)`, defaults to `None`, i.e. `SELECT *`
+        :type projection: tuple, optional
+        :return: iterable containing result
+        """
+        shape, params = where.compile()
+        statement = statements.select(table, fields=projection, where=shape)
+        return Driver.transaction(driver, lambda executor: Driver.execute(
+            executor, statement, *params
+        ))
+
+    @staticmethod
+    def query_committed(driver, table, **fields):
+        """Static method for querying the committed view of a table by field. Each result contains the document `data` along with its `metadata`, i.e. its `metadata.id` and `metadata.version`.
+
+        :param driver: QLDB Driver
+        :type driver: :class:`pyqldb.driver.qldb_driver.QldbDriver`
+        :param table: table to be queried
+        :type table: str
+        :param fields: Keyword arguments. A dictionary containing the document fields used to construct `WHERE` clause in query.
+        :type fields: dict
+        :return: iterable containing result
+        """
+        columns, values = list(fields.keys()), list(fields.values())
+        statement = statements.select(table, equals=tuple('data.{}'.format(column) for column in columns),
+                                      by=None, source='committed')
+        return Driver.transaction(driver, lambda executor: Driver.execute(
+            executor, statement, *values
+        ))
+
+    @staticmethod
+    def revision(driver, table, **fields):
+        """Static method for querying the current `metadata.version` of documents by field, without retrieving the documents themselves.
+
+        :param driver: QLDB Driver
+        :type driver: :class:`pyqldb.driver.qldb_driver.QldbDriver`
+        :param table: table to be queried
+        :type table: str
+        :param fields: Keyword arguments. A dictionary containing the document fields used to construct `WHERE` clause in query.
+        :type fields: dict
+        :return: iterable containing result, with fields `meta_id` and `version`
+        """
         columns, values = list(fields.keys()), list(fields.values())
-        where_clause = clauses.where_equals(*columns)
-        statement = 'SELECT * FROM {} BY meta_id {}'.format(
-            table, where_clause)
-        return driver.execute_lambda(lambda executor: Driver.execute(
+        statement = statements.select(table, equals=tuple('data.{}'.format(column) for column in columns),
+                                      fields=(('metadata.id', 'meta_id'), ('metadata.version', 'version')),
+                                      by=None, source='committed')
+        return Driver.transaction(driver, lambda executor: Driver.execute(
             executor, statement, *values
         ))
 
     @staticmethod
-    def query_in_fields(driver, table, **fields):
+    def query_in_fields(driver, table, projection=None, **fields):
         """Static method for querying table where fields match a value in a collection
 
         :param driver: [description]
         :type driver: [type]
         :param table: [description]
         :type table: [type]
+        :param projection: Paths to select, either as `path` or `(path, alias)`, defaults to `None`, i.e. `SELECT *`
+        :type projection: tuple, optional
 
         ..note::
           ```python
@@ -274,19 +530,13 @@ class Driver():
           ```
           will search all documents where a field `a` has a value belonging to the set `('b', 'c', 'd')` *and* a field `1` whose value belongs to the set `(2, 3, 4)`.
         """
-        column_numbers = {key: len(value) for key, value in fields.items()}
-        where_clause = clauses.where_in(**column_numbers)
-
-        unpacked_fields = []
-        for value in fields.values():
-            if isinstance(value, list):
-                for subval in value:
-                    unpacked_fields.append(subval)
-            elif isinstance(value, (int, float, str)):
-                unpacked_fields.append(value)
-
-        statement = 'SELECT * FROM {} BY meta_id {}'.format(
-            table, where_clause)
-        return driver.execute_lambda(lambda executor: Driver.execute(
+        # NOTE: each collection is padded to a power of two, so lists of similar length share a cached statement.
+        collections = [statements.pad(value if isinstance(value, (list, tuple, set)) else [value])
+                       for value in fields.values()]
+        statement = statements.select(
+            table, within=tuple(zip(fields.keys(), map(len, collections))), fields=projection)
+
+        unpacked_fields = [subval for collection in collections for subval in collection]
+        return Driver.transaction(driver, lambda executor: Driver.execute(
             executor, statement, *unpacked_fields
         ))
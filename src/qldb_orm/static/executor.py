@@ -0,0 +1,186 @@
+import asyncio
+import atexit
+import functools
+import threading
+import weakref
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from qldb_orm import settings
+from qldb_orm.static.logger import getLogger
+
+log = getLogger('qldb-orm.executor')
+
+THREAD_PREFIX = 'qldb-orm'
+
+
+class LedgerExecutor():
+    """Managed thread pool for running blocking ORM calls, e.g. `qldb_orm.qldb.Document.save`, off the calling thread. Calls against the same ledger are limited to `ledger_concurrency` at a time, so a burst of work cannot exhaust the session pool of the ledger's driver.
+
+    The pool is created lazily on first use and shut down when the interpreter exits.
+
+    :param max_workers: Maximum number of worker threads, defaults to `qldb_orm.settings.MAX_WORKERS`
+    :type max_workers: int, optional
+    :param ledger_concurrency: Maximum number of concurrent calls per ledger, defaults to `qldb_orm.settings.LEDGER_CONCURRENCY`
+    :type ledger_concurrency: int, optional
+    """
+
+    def __init__(self, max_workers=settings.MAX_WORKERS, ledger_concurrency=settings.LEDGER_CONCURRENCY):
+        self.max_workers = max_workers
+        self.ledger_concurrency = ledger_concurrency
+        self._pool = None
+        self._lock = threading.Lock()
+        self._semaphores = weakref.WeakKeyDictionary()
+
+    def pool(self):
+        """Return the underlying thread pool, creating it if necessary.
+
+        :rtype: :class:`concurrent.futures.ThreadPoolExecutor`
+        """
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                    thread_name_prefix=THREAD_PREFIX)
+        return self._pool
+
+    def _semaphore(self, loop, ledger):
+        """Return the `asyncio.Semaphore` limiting concurrent calls against a ledger on a particular event loop.
+        """
+        semaphores = self._semaphores.setdefault(loop, {})
+        if ledger not in semaphores:
+            semaphores[ledger] = asyncio.Semaphore(self.ledger_concurrency)
+        return semaphores[ledger]
+
+    async def run(self, ledger, fn, *args, **kwargs):
+        """Run a blocking function on the thread pool and await its result. Waits for a free slot if `ledger_concurrency` calls against `ledger` are already in flight.
+
+        :param ledger: Name of the ledger the function runs against
+        :type ledger: str
+        :param fn: Blocking function to run
+        :type fn: function
+        :return: Result of `fn(*args, **kwargs)`
+
+        .. note::
+          Cancelling the awaiting task before the function starts prevents it from running. Once started, the function runs to completion on its worker thread and its result is discarded.
+        """
+        loop = asyncio.get_running_loop()
+        async with self._semaphore(loop, ledger):
+            return await loop.run_in_executor(self.pool(), functools.partial(fn, *args, **kwargs))
+
+    def map(self, fn, items, parallelism=None):
+        """Apply a blocking function to each item concurrently on the thread pool, with at most `parallelism` calls in flight at once. Results are returned in the same order as `items`.
+
+        If invoked from one of the pool's own worker threads, e.g. through one of the asynchronous `qldb_orm.qldb.Query` methods, the items are processed sequentially on the calling thread instead, so that nested fan-outs cannot deadlock the pool.
+
+        :param fn: Blocking function of a single argument
+        :type fn: function
+        :param items: Items to apply `fn` to
+        :type items: list
+        :param parallelism: Maximum number of concurrent calls, defaults to `ledger_concurrency`. Capped at `ledger_concurrency`.
+        :type parallelism: int, optional
+        :return: Results of `fn(item)` for each item
+        :rtype: list
+        """
+        items = list(items)
+        parallelism = min(parallelism or self.ledger_concurrency,
+                          self.ledger_concurrency, self.max_workers)
+        worker = threading.current_thread().name.startswith(THREAD_PREFIX)
+        if len(items) <= 1 or parallelism <= 1 or worker:
+            return [fn(item) for item in items]
+
+        permits = threading.BoundedSemaphore(parallelism)
+        futures = []
+        try:
+            for item in items:
+                permits.acquire()
+                future = self.pool().submit(fn, item)
+                future.add_done_callback(lambda _: permits.release())
+                futures.append(future)
+            return [future.result() for future in futures]
+        finally:
+            for future in futures:
+                future.cancel()
+
+    def shutdown(self, wait=True):
+        """Shut down the thread pool. A new pool is created on the next call.
+
+        :param wait: Flag to block until running calls complete, defaults to `True`
+        :type wait: bool, optional
+        """
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait)
+
+
+class AsyncResults():
+    """Asynchronous iterator over a blocking iterator, e.g. the generator returned by `qldb_orm.qldb.Query.iter_all`. Items are pulled on the thread pool of a `qldb_orm.static.executor.LedgerExecutor` in chunks, so the event loop is never blocked on the ledger.
+
+    Closing the iterator, by leaving an `async with` block, calling `aclose()` or cancelling the consuming task, closes the underlying iterator and ends its transaction.
+
+    :param ledger: Name of the ledger the iterator reads from
+    :type ledger: str
+    :param iterator: Blocking iterator
+    :param chunk_size: Number of items pulled per trip to the thread pool, defaults to `qldb_orm.settings.STREAM_BUFFER`
+    :type chunk_size: int, optional
+    :param executor: Executor to pull items on, defaults to the process-wide `qldb_orm.static.executor.executor`
+    :type executor: :class:`qldb_orm.static.executor.LedgerExecutor`, optional
+    """
+
+    def __init__(self, ledger, iterator, chunk_size=settings.STREAM_BUFFER, executor=None):
+        self.ledger = ledger
+        self.iterator = iterator
+        self.chunk_size = max(chunk_size, 1)
+        self.executor = executor
+        self._buffer = deque()
+        self._exhausted = False
+        # NOTE: a generator cannot be closed while another thread is advancing it
+        self._lock = threading.Lock()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self._buffer:
+            if self._exhausted:
+                raise StopAsyncIteration
+            try:
+                chunk = await (self.executor or executor).run(self.ledger, self._pull)
+            except asyncio.CancelledError:
+                await self.aclose()
+                raise
+            self._buffer.extend(chunk)
+            if not self._buffer:
+                raise StopAsyncIteration
+        return self._buffer.popleft()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.aclose()
+
+    def _pull(self):
+        with self._lock:
+            chunk = list(islice(self.iterator, self.chunk_size))
+        if len(chunk) < self.chunk_size:
+            self._exhausted = True
+        return chunk
+
+    def _close(self):
+        with self._lock:
+            close = getattr(self.iterator, 'close', None)
+            if close is not None:
+                close()
+
+    async def aclose(self):
+        """Close the underlying iterator and discard any buffered items.
+        """
+        self._exhausted = True
+        self._buffer.clear()
+        await asyncio.get_running_loop().run_in_executor((self.executor or executor).pool(), self._close)
+
+
+executor = LedgerExecutor()
+atexit.register(executor.shutdown, False)
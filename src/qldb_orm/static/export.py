@@ -0,0 +1,263 @@
+import datetime
+import gzip
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from amazon.ion import simpleion
+from qldb_orm import settings
+from qldb_orm.static import convert
+from qldb_orm.static.checkpoint import Checkpoint, txtime
+from qldb_orm.static.logger import getLogger
+
+log = getLogger('qldb-orm.export')
+
+FORMATS = ('jsonl', 'ion')
+
+
+def encode(records, format='jsonl', compress=False):
+    """Serialize a chunk of records into a self-contained block, i.e. JSON Lines or an Ion binary stream starting with its own version marker, so that blocks can be encoded independently and concatenated. Compressed blocks are separate **gzip** members, which `gzip` readers decompress as one file.
+
+    :param records: Records to serialize, i.e. Ion values or native Python values
+    :type records: list
+    :param format: `jsonl` or `ion`, defaults to `jsonl`
+    :type format: str, optional
+    :param compress: Flag to compress the block, defaults to `False`
+    :type compress: bool, optional
+    :return: Serialized block
+    :rtype: bytes
+    """
+    if format == 'ion':
+        block = simpleion.dumps(records, binary=True, sequence_as_stream=True)
+    else:
+        block = ''.join(json.dumps(convert.to_native(record), ensure_ascii=False, separators=(',', ':'),
+                                   default=str) + '\n' for record in records).encode('utf-8')
+    return gzip.compress(block) if compress else block
+
+
+class ExportCheckpoint(Checkpoint):
+    """Resume point of an export, see `qldb-orm.static.export.Exporter`. Along with the watermark of a `qldb-orm.static.checkpoint.Checkpoint`, it holds the number of records and bytes written to the export file. While revision history is exported, the watermark stays where the run started; the run is bounded by a fixed `end` and counts the revisions it wrote in `run`, so an interrupted run can read the same range again and skip them.
+
+    :param path: Path of the JSON file persisting the checkpoint, defaults to `None`
+    :type path: str, optional
+    """
+
+    def __init__(self, path=None):
+        self.rows = 0
+        self.offset = 0
+        self.run = 0
+        self.end = None
+        super().__init__(path)
+
+    def _state(self):
+        return {**super()._state(), 'rows': self.rows, 'offset': self.offset, 'run': self.run,
+                'end': None if self.end is None else self.end.isoformat()}
+
+    def _restore(self, state):
+        super()._restore(state)
+        self.rows = state.get('rows', 0)
+        self.offset = state.get('offset', 0)
+        self.run = state.get('run', 0)
+        self.end = None if state.get('end') is None else txtime(state['end'])
+
+    def reset(self):
+        """Start the export over from the beginning.
+        """
+        self.time, self.revisions, self._times = None, set(), {}
+        self.rows, self.offset, self.run, self.end = 0, 0, 0, None
+
+
+class Progress():
+    """Throughput of an export.
+
+    :param rows: Number of records written, defaults to `0`
+    :type rows: int, optional
+    :param bytes: Number of bytes written, defaults to `0`
+    :type bytes: int, optional
+    """
+    __slots__ = ('rows', 'bytes', 'started', 'elapsed')
+
+    def __init__(self, rows=0, bytes=0):
+        self.rows = rows
+        self.bytes = bytes
+        self.started = time.monotonic()
+        self.elapsed = 0.0
+
+    def update(self, rows, bytes):
+        """Account for a block written to the export file.
+        """
+        self.rows += rows
+        self.bytes += bytes
+        self.elapsed = time.monotonic() - self.started
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def bytes_per_second(self):
+        return self.bytes / self.elapsed if self.elapsed else 0.0
+
+    def __str__(self):
+        return '{:,} rows, {:,.1f} MB in {:.1f}s ({:,.0f} rows/s, {:,.2f} MB/s)'.format(
+            self.rows, self.bytes / 1e6, self.elapsed, self.rows_per_second, self.bytes_per_second / 1e6)
+
+
+class Exporter():
+    """Stream records, e.g. the documents or revision history of a table, to a **JSON Lines** or **Ion** binary file. Records are grouped into chunks of `chunk_size`, which are serialized and compressed by `writers` threads while the next records are read, and appended to the file in order. At most `2 * writers` chunks are in flight at once, so memory use does not grow with the number of records.
+
+    After each chunk is written, the file is flushed and the position of the export is saved to a checkpoint file, `<path>.checkpoint`. An export started with `resume=True` truncates the file to the last saved position and carries on from there: a table export skips the records it already wrote, and a revision history export reads the range of its interrupted run again and skips the revisions it already wrote. Once a history export completes, its watermark moves up to its latest revision, so the next run only reads the revisions committed since.
+
+    :param path: Path of the export file
+    :type path: str
+    :param format: `jsonl` or `ion`, defaults to `qldb-orm.settings.EXPORT_FORMAT`
+    :type format: str, optional
+    :param compress: Flag to **gzip** the file, defaults to `None`, i.e. only if `path` ends with `.gz`
+    :type compress: bool, optional
+    :param writers: Number of threads serializing chunks, defaults to `qldb-orm.settings.EXPORT_WRITERS`
+    :type writers: int, optional
+    :param chunk_size: Number of records per chunk, defaults to `qldb-orm.settings.EXPORT_CHUNK_SIZE`
+    :type chunk_size: int, optional
+    :param resume: Flag to resume from the checkpoint of a previous export to `path`, defaults to `False`, i.e. the file is overwritten
+    :type resume: bool, optional
+    :param progress: Function called with the `qldb-orm.static.export.Progress` of the export at most every `interval` seconds, and once the export is done, defaults to `None`
+    :type progress: function, optional
+    :param interval: Seconds between progress reports, defaults to `5`
+    :type interval: float, optional
+    :raises ValueError: If `format` is not supported
+
+    .. note::
+      Interrupted exports are resumed by position, since **QLDB** reads have no stable order to resume from otherwise, and revisions of different documents are not returned in commit order. A table export is only consistent if the table was not modified in between. Revision history is immutable, and a history run is bounded by the commit time it started at, so history exports can be resumed at any time, e.g. to append the revisions committed since the last nightly export.
+    """
+
+    def __init__(self, path, format=settings.EXPORT_FORMAT, compress=None, writers=settings.EXPORT_WRITERS,
+                 chunk_size=settings.EXPORT_CHUNK_SIZE, resume=False, progress=None, interval=5):
+        if format not in FORMATS:
+            raise ValueError('Unsupported export FORMAT({}); use one of {}'.format(format, ', '.join(FORMATS)))
+        self.path = path
+        self.format = format
+        self.compress = path.endswith('.gz') if compress is None else compress
+        self.writers = max(1, writers)
+        self.chunk_size = max(1, chunk_size)
+        self.progress = progress
+        self.interval = interval
+        self.checkpoint = ExportCheckpoint('{}.checkpoint'.format(path))
+        if not resume:
+            self.checkpoint.reset()
+
+    def _open(self):
+        """Open the export file for appending, truncated to the checkpoint.
+        """
+        checkpoint = self.checkpoint
+        if checkpoint.offset == 0:
+            # NOTE: overwrite the checkpoint of a previous export, which no longer matches the file.
+            checkpoint.save()
+            return open(self.path, 'wb')
+        if not os.path.exists(self.path) or os.path.getsize(self.path) < checkpoint.offset:
+            raise ValueError('Cannot resume EXPORT({}); the file is shorter than its checkpoint'.format(self.path))
+        outfile = open(self.path, 'r+b')
+        outfile.truncate(checkpoint.offset)
+        outfile.seek(checkpoint.offset)
+        return outfile
+
+    def window(self, end=None):
+        """Range of commit times to read for a revision history export: from the watermark of the checkpoint up to `end`. The end of a run is fixed when it starts, so a resumed run reads the same revisions again.
+
+        :param end: Latest commit time of the revisions, inclusive, defaults to `None`, i.e. the time the run starts
+        :type end: datetime.datetime, optional
+        :return: `(start, end)` commit times
+        :rtype: tuple
+        """
+        checkpoint = self.checkpoint
+        if checkpoint.end is None:
+            checkpoint.end = datetime.datetime.now(datetime.timezone.utc) if end is None else txtime(end)
+        return checkpoint.time, checkpoint.end
+
+    def _chunks(self, records, history, latest):
+        """Group records into chunks, skipping the records written before the checkpoint. For revision history, `latest` collects the `(metadata.id, metadata.version, metadata.txTime)` of the revisions committed at the latest commit time read.
+        """
+        checkpoint = self.checkpoint
+        skip = checkpoint.run if history else checkpoint.rows
+        chunk = []
+        for record in records:
+            if history:
+                metadata = record['metadata']
+                mark = (str(metadata['id']), int(metadata['version']), txtime(metadata['txTime']))
+                # NOTE: the watermark does not move during a run, so out of order revisions are not skipped.
+                if checkpoint.seen(*mark):
+                    continue
+                if not latest or mark[2] > latest[0][2]:
+                    latest[:] = [mark]
+                elif mark[2] == latest[0][2]:
+                    latest.append(mark)
+            if skip:
+                skip -= 1
+                continue
+            chunk.append(record)
+            if len(chunk) == self.chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def write(self, records, history=False):
+        """Export records. The `records` are closed once they are exhausted, or if the export fails.
+
+        :param records: Records to export, e.g. a `qldb-orm.static.cursor.ResultStream`
+        :type records: iterable
+        :param history: Flag for revision records, i.e. `{ blockAddress, hash, data, metadata }`, read over `qldb-orm.static.export.Exporter.window`, defaults to `False`
+        :type history: bool, optional
+        :return: Progress of the export
+        :rtype: :class:`qldb-orm.static.export.Progress`
+        """
+        checkpoint, progress, latest = self.checkpoint, Progress(), []
+        reported = progress.started
+        try:
+            with self._open() as outfile, ThreadPoolExecutor(max_workers=self.writers) as pool:
+                pending = deque()
+
+                def flush(limit):
+                    nonlocal reported
+                    while len(pending) > limit:
+                        future, rows = pending.popleft()
+                        try:
+                            block = future.result()
+                        except BaseException:
+                            # NOTE: later chunks must not be written after a chunk that was not.
+                            pending.clear()
+                            raise
+                        outfile.write(block)
+                        outfile.flush()
+                        os.fsync(outfile.fileno())
+                        checkpoint.rows += rows
+                        if history:
+                            checkpoint.run += rows
+                        checkpoint.offset += len(block)
+                        checkpoint.save()
+                        progress.update(rows, len(block))
+                        if self.progress is not None and time.monotonic() - reported >= self.interval:
+                            reported = time.monotonic()
+                            self.progress(progress)
+
+                try:
+                    for chunk in self._chunks(records, history, latest):
+                        pending.append((pool.submit(encode, chunk, self.format, self.compress), len(chunk)))
+                        flush(2 * self.writers)
+                finally:
+                    # NOTE: chunks read before a failure are still written, so a resumed export does not read them again.
+                    flush(0)
+            if history:
+                for mark in latest:
+                    checkpoint.advance(*mark)
+                checkpoint.complete(checkpoint.end)
+                checkpoint.run, checkpoint.end = 0, None
+                checkpoint.save()
+        finally:
+            close = getattr(records, 'close', None)
+            if close is not None:
+                close()
+        log.debug("Exported %s to EXPORT(%s)", progress, self.path)
+        if self.progress is not None:
+            self.progress(progress)
+        return progress
@@ -0,0 +1,136 @@
+import copy
+from qldb_orm.static import clauses, statements
+
+SEPARATOR = '__'
+
+LOOKUPS = {
+    'eq': clauses.EQUALS,
+    'ne': '<>',
+    'gt': '>',
+    'gte': '>=',
+    'lt': '<',
+    'lte': '<=',
+    'like': clauses.LIKE,
+    'in': clauses.IN,
+    'between': clauses.BETWEEN
+}
+
+
+def lookup(key, value):
+    """Parse a keyword lookup into a `(column, operator, value)` predicate. The lookup is a path to a field, whose parts are separated by `__`, optionally followed by the name of an operator in `qldb_orm.static.filters.LOOKUPS`, e.g. `number__gt` or `panopticon__nest__title__like`. Lookups without an operator match by equality.
+
+    :param key: Keyword of the lookup
+    :type key: str
+    :param value: Value of the lookup. `in` lookups take a collection of values, `between` lookups a pair of bounds.
+    :raises ValueError: If the lookup is invalid
+    :return: Predicate
+    :rtype: tuple
+    """
+    parts = key.split(SEPARATOR)
+    operator = clauses.EQUALS
+    if len(parts) > 1 and parts[-1] in LOOKUPS:
+        operator = LOOKUPS[parts.pop()]
+    column = statements.identifier('.'.join(parts), True)
+    if operator == clauses.IN:
+        value = list(value)
+        if not value:
+            raise ValueError('Empty collection for lookup: {}'.format(key))
+    elif operator == clauses.BETWEEN:
+        value = list(value)
+        if len(value) != 2:
+            raise ValueError('Lookup {} expects a pair of bounds'.format(key))
+    return (column, operator, value)
+
+
+class Where():
+    """Composable **PartiQL** condition. Keyword lookups are combined with `AND`; conditions are combined with `&` and `|` and negated with `~`,
+
+    ```python
+    Where(number__gt=50, title__like='wise%') | ~Where(panopticon__nest__title='owl')
+    ```
+
+    See `qldb_orm.static.filters.lookup` for the syntax of lookups. Conditions are compiled into a hashable shape and a list of parameters, so `qldb_orm.static.statements` caches one statement per shape rather than per set of values.
+
+    :param conditions: Conditions to combine with `AND`
+    :type conditions: :class:`qldb_orm.static.filters.Where`
+    :param lookups: Keyword lookups to combine with `AND`
+    """
+
+    def __init__(self, *conditions, **lookups):
+        self.connector = 'AND'
+        self.negated = False
+        self.children = [condition for condition in conditions if condition is not None] + \
+            [lookup(key, value) for key, value in lookups.items()]
+
+    def __bool__(self):
+        return bool(self.children)
+
+    def _combine(self, other, connector):
+        if not isinstance(other, Where):
+            return NotImplemented
+        if not other:
+            return copy.deepcopy(self)
+        if not self:
+            return copy.deepcopy(other)
+        combined = Where()
+        combined.connector = connector
+        combined.children = [self, other]
+        return combined
+
+    def __and__(self, other):
+        return self._combine(other, 'AND')
+
+    def __or__(self, other):
+        return self._combine(other, 'OR')
+
+    def __invert__(self):
+        negated = copy.deepcopy(self)
+        negated.negated = not self.negated
+        return negated
+
+    def compile(self):
+        """Compile the condition into its shape, i.e. nested `(connector, negated, children)` tuples whose leaves are `(column, operator, n)` predicates, and its parameters. `IN` collections are padded by `qldb_orm.static.statements.pad`.
+
+        :return: shape and parameters
+        :rtype: tuple
+        """
+        shape, params = [], []
+        for child in self.children:
+            if isinstance(child, Where):
+                child_shape, child_params = child.compile()
+                shape.append(child_shape)
+                params.extend(child_params)
+                continue
+            column, operator, value = child
+            if operator == clauses.IN:
+                value = statements.pad(value)
+                shape.append((column, operator, len(value)))
+                params.extend(value)
+            elif operator == clauses.BETWEEN:
+                shape.append((column, operator, 2))
+                params.extend(value)
+            else:
+                shape.append((column, operator, 1))
+                params.append(value)
+        return (self.connector, self.negated, tuple(shape)), params
+
+    def indexed(self, indexes):
+        """Check if the condition constrains one of `indexes` by equality, i.e. through an `=` or `IN` predicate that every matching document must satisfy. **QLDB** can only use an index to evaluate a query if its condition constrains an indexed field this way; for an `OR`, every branch must do so.
+
+        :param indexes: Indexed fields
+        :type indexes: set
+        :return: True if the condition can be evaluated through an index, False otherwise
+        :rtype: bool
+        """
+        if self.negated or not self.children:
+            return False
+        checks = (child.indexed(indexes) if isinstance(child, Where)
+                  else child[1] in (clauses.EQUALS, clauses.IN) and child[0] in indexes
+                  for child in self.children)
+        if self.connector == 'AND':
+            return any(checks)
+        return all(checks)
+
+    def __repr__(self):
+        shape, params = self.compile()
+        return 'Where({}, {})'.format(clauses.condition(shape), params)
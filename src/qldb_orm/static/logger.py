@@ -1,5 +1,5 @@
 import logging
-from qldb-orm import settings
+from qldb_orm import settings
 
 
 def getLogger(name: str) -> logging.Logger:
@@ -0,0 +1,644 @@
+import copy
+import datetime
+import hashlib
+import random
+import re
+import string
+import threading
+import uuid
+from qldb_orm.static.cache import cache
+from qldb_orm.static.logger import getLogger
+
+log = getLogger('qldb-orm.memory')
+
+TOKENS = re.compile(r"""
+    \s*(?:
+        (?P<param>\?)|
+        (?P<number>-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?)|
+        (?P<string>'(?:[^']|'')*')|
+        (?P<ion>`[^`]*`)|
+        (?P<name>[A-Za-z_][\w]*(?:\.[A-Za-z_][\w]*)*)|
+        (?P<op><<|>>|<=|>=|<>|!=|=|<|>|\(|\)|,|\*)
+    )""", re.VERBOSE)
+
+ID_ALPHABET = string.ascii_letters + string.digits
+
+MISSING = object()
+
+
+class StatementError(Exception):
+    """Raised when the in-memory ledger cannot parse or execute a statement.
+    """
+
+
+def tokenize(statement):
+    """Split a **PartiQL** statement into `(kind, value)` tokens.
+
+    :param statement: **PartiQL** statement
+    :type statement: str
+    :return: tokens
+    :rtype: list
+    """
+    tokens, position, statement = [], 0, statement.strip()
+    while position < len(statement):
+        match = TOKENS.match(statement, position)
+        if match is None or match.end() == position:
+            raise StatementError(
+                'Unexpected character at {}: {}'.format(position, statement))
+        kind = match.lastgroup
+        value = match.group(kind)
+        if kind == 'name' and value.upper() in KEYWORDS:
+            kind, value = 'keyword', value.upper()
+        tokens.append((kind, value))
+        position = match.end()
+    return tokens
+
+
+KEYWORDS = {'SELECT', 'VALUE', 'FROM', 'WHERE', 'AND', 'OR', 'NOT', 'IN', 'LIKE', 'IS', 'NULL', 'MISSING', 'AS', 'BY',
+            'INSERT', 'INTO', 'UPDATE', 'SET', 'DELETE', 'CREATE', 'TABLE', 'INDEX', 'ON', 'TRUE', 'FALSE',
+            'BETWEEN'}
+
+
+def resolve(row, path):
+    """Resolve a dotted path against a row.
+
+    :param row: `dict` row
+    :type row: dict
+    :param path: dotted path, e.g. `metadata.version`
+    :type path: str
+    :return: the value at the path, or `MISSING`
+    """
+    value = row
+    for key in path.split('.'):
+        if not isinstance(value, dict) or key not in value:
+            return MISSING
+        value = value[key]
+    return value
+
+
+def like(value, pattern):
+    """Evaluate a **PartiQL** `LIKE` pattern, where `%` matches any sequence of characters and `_` matches any single character.
+    """
+    if not isinstance(value, str) or not isinstance(pattern, str):
+        return False
+    expression = ''.join('.*' if char == '%' else '.' if char == '_' else re.escape(char)
+                         for char in pattern)
+    return re.fullmatch(expression, value, re.DOTALL) is not None
+
+
+def compare(left, operator, right):
+    if left is MISSING or right is MISSING:
+        return False
+    if operator == '=':
+        return left == right
+    if operator in ('<>', '!='):
+        return left != right
+    try:
+        if operator == '<':
+            return left < right
+        if operator == '<=':
+            return left <= right
+        if operator == '>':
+            return left > right
+        if operator == '>=':
+            return left >= right
+    except TypeError:
+        return False
+    raise StatementError('Unsupported operator {}'.format(operator))
+
+
+class Parser():
+    """Recursive descent parser for the subset of **PartiQL** emitted by `qldb_orm`. Parameters are bound in order of appearance as the statement is parsed.
+
+    :param statement: **PartiQL** statement
+    :type statement: str
+    :param params: statement parameters
+    :type params: tuple
+    """
+
+    def __init__(self, statement, params):
+        self.statement = statement
+        self.tokens = tokenize(statement)
+        self.position = 0
+        self.params = list(params)
+        self.param_index = 0
+
+    def peek(self, offset=0):
+        index = self.position + offset
+        return self.tokens[index] if index < len(self.tokens) else (None, None)
+
+    def next(self):
+        token = self.peek()
+        self.position += 1
+        return token
+
+    def accept(self, value):
+        if self.peek()[1] == value:
+            self.position += 1
+            return True
+        return False
+
+    def expect(self, value):
+        if not self.accept(value):
+            raise StatementError('Expected {} but found {} in: {}'.format(
+                value, self.peek()[1], self.statement))
+
+    def done(self):
+        if self.position != len(self.tokens):
+            raise StatementError('Unexpected {} in: {}'.format(
+                self.peek()[1], self.statement))
+
+    def name(self):
+        kind, value = self.next()
+        if kind != 'name':
+            raise StatementError(
+                'Expected name but found {} in: {}'.format(value, self.statement))
+        return value
+
+    def param(self):
+        """Consume a `?` placeholder and bind the next parameter to it.
+        """
+        self.expect('?')
+        return self.bind()
+
+    def bind(self):
+        if self.param_index >= len(self.params):
+            raise StatementError(
+                'Not enough parameters for: {}'.format(self.statement))
+        value = self.params[self.param_index]
+        self.param_index += 1
+        return value
+
+    def operand(self):
+        """Parse a value: a parameter, literal or path. Returns a function of the row.
+        """
+        kind, value = self.next()
+        if kind == 'param':
+            bound = self.bind()
+            return lambda row: bound
+        if kind == 'number':
+            literal = float(value) if any(char in value for char in '.eE') else int(value)
+            return lambda row: literal
+        if kind == 'string':
+            literal = value[1:-1].replace("''", "'")
+            return lambda row: literal
+        if kind == 'ion':
+            literal = value[1:-1]
+            return lambda row: literal
+        if kind == 'keyword' and value in ('TRUE', 'FALSE'):
+            literal = value == 'TRUE'
+            return lambda row: literal
+        if kind == 'keyword' and value == 'NULL':
+            return lambda row: None
+        if kind == 'name':
+            return lambda row: resolve(row, value)
+        raise StatementError(
+            'Unexpected {} in: {}'.format(value, self.statement))
+
+    def condition(self):
+        """Parse an `OR` of `AND` groups. Returns a predicate of the row.
+        """
+        left = self.conjunction()
+        while self.accept('OR'):
+            right = self.conjunction()
+            left = (lambda a, b: lambda row: a(row) or b(row))(left, right)
+        return left
+
+    def conjunction(self):
+        left = self.negation()
+        while self.accept('AND'):
+            right = self.negation()
+            left = (lambda a, b: lambda row: a(row) and b(row))(left, right)
+        return left
+
+    def negation(self):
+        if self.accept('NOT'):
+            inner = self.negation()
+            return lambda row: not inner(row)
+        if self.peek()[1] == '(':
+            self.next()
+            inner = self.condition()
+            self.expect(')')
+            return inner
+        return self.predicate()
+
+    def predicate(self):
+        left = self.operand()
+        kind, value = self.next()
+        if value == 'IN':
+            self.expect('(')
+            values = [self.operand()]
+            while self.accept(','):
+                values.append(self.operand())
+            self.expect(')')
+            return lambda row: left(row) is not MISSING and any(left(row) == v(row) for v in values)
+        if value == 'NOT':
+            if self.accept('IN'):
+                self.expect('(')
+                values = [self.operand()]
+                while self.accept(','):
+                    values.append(self.operand())
+                self.expect(')')
+                return lambda row: left(row) is not MISSING and all(left(row) != v(row) for v in values)
+            self.expect('LIKE')
+            pattern = self.operand()
+            return lambda row: not like(left(row), pattern(row))
+        if value == 'LIKE':
+            pattern = self.operand()
+            return lambda row: like(left(row), pattern(row))
+        if value == 'BETWEEN':
+            low = self.operand()
+            self.expect('AND')
+            high = self.operand()
+            return lambda row: compare(left(row), '>=', low(row)) and compare(left(row), '<=', high(row))
+        if value == 'IS':
+            negate = self.accept('NOT')
+            kind, value = self.next()
+            if value == 'NULL':
+                def check(row): return left(row) is None or left(row) is MISSING
+            elif value == 'MISSING':
+                def check(row): return left(row) is MISSING
+            else:
+                raise StatementError(
+                    'Unexpected {} in: {}'.format(value, self.statement))
+            return (lambda row: not check(row)) if negate else check
+        if kind == 'op' and value in ('=', '<>', '!=', '<', '<=', '>', '>='):
+            right = self.operand()
+            return lambda row: compare(left(row), value, right(row))
+        raise StatementError(
+            'Unexpected {} in: {}'.format(value, self.statement))
+
+
+class MemoryLedger():
+    """In-memory stand-in for a **QLDB** ledger. Tables hold the latest revision of each document, keyed by document ID, along with the full revision history of the table.
+
+    :param name: Name of the ledger
+    :type name: str
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.tables = {}
+        self.lock = threading.RLock()
+        self.sequence = 0
+
+    @staticmethod
+    def document_id():
+        return ''.join(random.choice(ID_ALPHABET) for _ in range(22))
+
+    def table(self, name):
+        if name not in self.tables:
+            raise StatementError('No such table: {}'.format(name))
+        return self.tables[name]
+
+    def revision(self, table, document_id, data, version, transaction_id):
+        """Append a new revision of a document to the table's history and make it the latest revision. A revision without `data` deletes the document; like **QLDB**, its record only holds the metadata of the delete.
+
+        :return: Revision record, i.e. `{ blockAddress, hash, data, metadata }`
+        :rtype: dict
+        """
+        self.sequence += 1
+        metadata = {
+            'id': document_id,
+            'version': version,
+            'txTime': datetime.datetime.now(datetime.timezone.utc),
+            'txId': transaction_id
+        }
+        record = {
+            'blockAddress': {'strandId': self.name, 'sequenceNo': self.sequence},
+            'hash': hashlib.sha256(repr((data, metadata)).encode('utf-8')).digest(),
+            'metadata': metadata
+        }
+        table['history'].append(record)
+        if data is None:
+            del table['documents'][document_id]
+        else:
+            record['data'] = data
+            table['documents'][document_id] = record
+        return record
+
+
+def timestamp(value):
+    """Convert an Ion timestamp literal, e.g. `2022-01-01T00:00:00Z`, or `datetime.datetime` into a timezone-aware `datetime.datetime`. Timestamps without an offset are taken to be UTC.
+    """
+    if not isinstance(value, datetime.datetime):
+        text = str(value).strip()
+        if text.endswith('T'):
+            text = text[:-1]
+        if text.endswith('Z'):
+            text = text[:-1] + '+00:00'
+        value = datetime.datetime.fromisoformat(text)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=datetime.timezone.utc)
+    return value
+
+
+class MemoryExecutor():
+    """Transaction executor for a `qldb_orm.static.memory.MemoryLedger`, implementing `execute_statement` for the subset of **PartiQL** emitted by `qldb_orm`:
+
+    - `CREATE TABLE t`, `CREATE INDEX ON t (field)`
+    - `INSERT INTO t ?`, `INSERT INTO t << ?, ... >>`
+    - `UPDATE t [AS p] SET p = ? | path = ?, ... WHERE ...`
+    - `DELETE FROM t [AS p] WHERE ...`
+    - `SELECT * | VALUE path | path [AS alias], ... FROM t [AS p] [BY meta_id] [WHERE ...]`, where `t` may also be `history(t [, start [, end]])`, `_ql_committed_t` or `information_schema.user_tables`.
+
+    `WHERE` clauses support `=`, `<>`, `<`, `<=`, `>`, `>=`, `LIKE`, `IN`, `BETWEEN`, `IS [NOT] NULL | MISSING`, `NOT`, `AND`, `OR` and parentheses.
+
+    .. note::
+      Each statement is atomic, and every change made by the transaction is undone if it fails, but transactions are not isolated from one another.
+    """
+
+    def __init__(self, ledger, transaction_id):
+        self.ledger = ledger
+        self.transaction_id = transaction_id
+        self.undo = []
+
+    def execute_statement(self, statement, *params):
+        parser = Parser(statement, params)
+        with self.ledger.lock:
+            kind, value = parser.next()
+            if value == 'SELECT':
+                results = self._select(parser)
+            elif value == 'INSERT':
+                results = self._insert(parser)
+            elif value == 'UPDATE':
+                results = self._update(parser)
+            elif value == 'DELETE':
+                results = self._delete(parser)
+            elif value == 'CREATE':
+                results = self._create(parser)
+            else:
+                raise StatementError(
+                    'Unsupported statement: {}'.format(statement))
+            parser.done()
+            return iter(copy.deepcopy(results))
+
+    def _write(self, table, document_id, data=None, version=0):
+        """Write a new revision of a document, or delete it if `data` is `None`, recording its previous state so the transaction can be rolled back.
+        """
+        previous = table['documents'].get(document_id)
+        record = self.ledger.revision(
+            table, document_id, data, version, self.transaction_id)
+        self.undo.append((table, document_id, previous, record))
+
+    def rollback(self):
+        """Undo every change made by the transaction.
+        """
+        with self.ledger.lock:
+            for table, document_id, previous, record in reversed(self.undo):
+                table['history'].remove(record)
+                if previous is None:
+                    table['documents'].pop(document_id, None)
+                else:
+                    table['documents'][document_id] = previous
+            self.undo = []
+
+    def _create(self, parser):
+        if parser.accept('TABLE'):
+            name = parser.name()
+            if name in self.ledger.tables:
+                raise StatementError('Table already exists: {}'.format(name))
+            self.ledger.tables[name] = {'id': self.ledger.document_id(), 'documents': {},
+                                        'history': [], 'indexes': []}
+            return [{'tableId': self.ledger.tables[name]['id']}]
+        parser.expect('INDEX')
+        parser.expect('ON')
+        table = self.ledger.table(parser.name())
+        parser.expect('(')
+        field = parser.name()
+        parser.expect(')')
+        if field not in table['indexes']:
+            table['indexes'].append(field)
+        return [{'tableId': table['id']}]
+
+    @staticmethod
+    def _alias(parser):
+        if parser.accept('AS') or parser.peek()[0] == 'name':
+            return parser.name()
+        return None
+
+    @staticmethod
+    def _strip(path, alias):
+        if alias is not None and (path == alias or path.startswith(alias + '.')):
+            return path[len(alias) + 1:]
+        return path
+
+    @staticmethod
+    def _where(parser, alias=None):
+        if not parser.accept('WHERE'):
+            return lambda row: True
+        predicate = parser.condition()
+        if alias is None:
+            return predicate
+        return lambda row: predicate(dict(row, **{alias: row}))
+
+    def _insert(self, parser):
+        parser.expect('INTO')
+        table = self.ledger.table(parser.name())
+        if parser.accept('<<'):
+            documents = [parser.param()]
+            while parser.accept(','):
+                documents.append(parser.param())
+            parser.expect('>>')
+        else:
+            documents = [parser.param()]
+        results = []
+        for document in documents:
+            if not isinstance(document, dict):
+                raise StatementError('Documents must be structs')
+            document_id = self.ledger.document_id()
+            self._write(table, document_id, copy.deepcopy(document))
+            results.append({'documentId': document_id})
+        return results
+
+    def _update(self, parser):
+        table = self.ledger.table(parser.name())
+        alias = self._alias(parser)
+        parser.expect('SET')
+        assignments = []
+        while True:
+            path = self._strip(parser.name(), alias)
+            parser.expect('=')
+            assignments.append((path, parser.param()))
+            if not parser.accept(','):
+                break
+        predicate = self._where(parser, alias)
+        results = []
+        for document_id, record in list(table['documents'].items()):
+            if not predicate(record['data']):
+                continue
+            data = copy.deepcopy(record['data'])
+            for path, value in assignments:
+                if path == '':
+                    data = copy.deepcopy(value)
+                    continue
+                node, keys = data, path.split('.')
+                for key in keys[:-1]:
+                    if not isinstance(node.get(key), dict):
+                        node[key] = {}
+                    node = node[key]
+                node[keys[-1]] = copy.deepcopy(value)
+            self._write(table, document_id, data,
+                        record['metadata']['version'] + 1)
+            results.append({'documentId': document_id})
+        return results
+
+    def _delete(self, parser):
+        parser.expect('FROM')
+        table = self.ledger.table(parser.name())
+        alias = self._alias(parser)
+        predicate = self._where(parser, alias)
+        results = []
+        for document_id, record in list(table['documents'].items()):
+            if predicate(record['data']):
+                self._write(table, document_id, version=record['metadata']['version'] + 1)
+                results.append({'documentId': document_id})
+        return results
+
+    def _projection(self, parser):
+        """Parse the projection of a `SELECT`. Returns a function that maps a row to a result.
+        """
+        if parser.accept('*'):
+            return lambda row: row
+        if parser.accept('VALUE'):
+            path = parser.name()
+            return lambda row: resolve(row, path)
+        fields = []
+        while True:
+            path = parser.name()
+            name = path.split('.')[-1]
+            if parser.accept('AS'):
+                name = parser.name()
+            fields.append((path, name))
+            if not parser.accept(','):
+                break
+
+        def project(row):
+            result = {}
+            for path, name in fields:
+                value = resolve(row, path)
+                if value is not MISSING:
+                    result[name] = value
+            return result
+        return project
+
+    def _source(self, parser):
+        """Parse the `FROM` source of a `SELECT`. Returns the rows the source produces, and a flag indicating whether the rows are user data or revision records.
+        """
+        if parser.peek()[1] == 'history' and parser.peek(1)[1] == '(':
+            parser.next()
+            parser.next()
+            table = self.ledger.table(parser.name())
+            bounds = []
+            while parser.accept(','):
+                bounds.append(timestamp(parser.operand()({})))
+            parser.expect(')')
+            rows = table['history']
+            if bounds:
+                start = bounds[0]
+                end = bounds[1] if len(bounds) > 1 else None
+                rows = [row for row in rows if row['metadata']['txTime'] >= start
+                        and (end is None or row['metadata']['txTime'] <= end)]
+            return rows, False
+        name = parser.name()
+        if name == 'information_schema.user_tables':
+            return [{'name': table_name, 'tableId': table['id'], 'status': 'ACTIVE',
+                     'indexes': [{'indexId': '{}_{}'.format(table['id'], field), 'expr': '[{}]'.format(field),
+                                  'status': 'ONLINE'} for field in table['indexes']]}
+                    for table_name, table in self.ledger.tables.items()], False
+        if name.startswith('_ql_committed_'):
+            return list(self.ledger.table(name[len('_ql_committed_'):])['documents'].values()), False
+        return list(self.ledger.table(name)['documents'].values()), True
+
+    def _select(self, parser):
+        project = self._projection(parser)
+        parser.expect('FROM')
+        rows, user = self._source(parser)
+        alias = self._alias(parser)
+        by = parser.name() if parser.accept('BY') else None
+        if user:
+            records = []
+            for record in rows:
+                row = dict(record['data'])
+                if by is not None:
+                    row[by] = record['metadata']['id']
+                records.append(row)
+            rows = records
+        predicate = self._where(parser, alias)
+        return [project(row) for row in rows if predicate(row)]
+
+
+class MemoryDriver():
+    """In-memory stand-in for `pyqldb.driver.qldb_driver.QldbDriver`, for benchmarking and testing the ORM without a network connection. Drivers created for the same ledger name share the same `qldb_orm.static.memory.MemoryLedger`.
+
+    Enable through the **BACKEND** environment variable,
+
+    ```shell
+    export BACKEND='memory'
+    ```
+
+    :param ledger_name: Name of the ledger
+    :type ledger_name: str
+    """
+    ledgers = {}
+    ledgers_lock = threading.Lock()
+
+    def __init__(self, ledger_name, **config):
+        self.ledger_name = ledger_name
+        self._is_closed = False
+
+    @property
+    def ledger(self):
+        # NOTE: looked up on every transaction rather than held, so pooled drivers see a ledger dropped by `reset`.
+        ledger = MemoryDriver.ledgers.get(self.ledger_name)
+        if ledger is None:
+            with MemoryDriver.ledgers_lock:
+                if self.ledger_name not in MemoryDriver.ledgers:
+                    MemoryDriver.ledgers[self.ledger_name] = MemoryLedger(self.ledger_name)
+                ledger = MemoryDriver.ledgers[self.ledger_name]
+        return ledger
+
+    @staticmethod
+    def reset(ledger_name=None):
+        """Drop the contents of in-memory ledgers. Drivers already created for a dropped ledger, e.g. pooled ones, start over with an empty ledger, and the cached schema and documents of the ledger are invalidated.
+
+        :param ledger_name: Name of the ledger, defaults to `None`. If `None`, every ledger is dropped.
+        :type ledger_name: str, optional
+        """
+        # NOTE: imported here, since `qldb_orm.static.schema` imports the driver, which imports this module.
+        from qldb_orm.static.schema import schema
+        with MemoryDriver.ledgers_lock:
+            if ledger_name is None:
+                MemoryDriver.ledgers.clear()
+            else:
+                MemoryDriver.ledgers.pop(ledger_name, None)
+        schema.invalidate(ledger_name)
+        cache.invalidate(ledger_name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        self._is_closed = True
+
+    def execute_lambda(self, query_lambda, retry_config=None):
+        """Execute the function within a transaction against the in-memory ledger. Every change made by the transaction is undone if the function raises.
+        """
+        if self._is_closed:
+            raise StatementError('Driver is closed')
+        executor = MemoryExecutor(self.ledger, str(uuid.uuid4()))
+        try:
+            result = query_lambda(executor)
+            # NOTE: like pyqldb, cursors returned from the transaction are buffered before it commits
+            if hasattr(result, '__next__'):
+                result = iter(list(result))
+            return result
+        except Exception:
+            executor.rollback()
+            raise
+
+    def list_tables(self):
+        return iter(list(self.ledger.tables.keys()))
@@ -0,0 +1,516 @@
+import atexit
+import bisect
+import functools
+import os
+import re
+import socket
+import tempfile
+import threading
+import time
+from pyqldb.cursor.stream_cursor import StreamCursor
+from qldb_orm import settings
+from qldb_orm.static.logger import getLogger
+
+log = getLogger('qldb-orm.metrics')
+
+# NOTE: upper bounds in seconds, chosen to span single-digit millisecond point reads through multi-second scans
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+           0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LITERALS = re.compile(r"'(?:[^']|'')*'|`[^`]*`|\b-?\d+(?:\.\d+)?\b")
+PARAMETER_LISTS = re.compile(r'\?(?:\s*,\s*\?)+')
+WHITESPACE = re.compile(r'\s+')
+
+_local = threading.local()
+
+
+@functools.lru_cache(maxsize=1024)
+def fingerprint(statement):
+    """Normalize a **PartiQL** statement so statements that differ only in literals, whitespace or the number of parameters in an `IN` list or bag share a fingerprint, e.g. `SELECT * FROM t WHERE id IN (?, ?, ?)` becomes `SELECT * FROM t WHERE id IN (?+)`.
+
+    :param statement: **PartiQL** statement
+    :type statement: str
+    :return: Normalized statement
+    :rtype: str
+    """
+    normalized = LITERALS.sub('?', statement)
+    normalized = PARAMETER_LISTS.sub('?+', normalized)
+    return WHITESPACE.sub(' ', normalized).strip()
+
+
+class StatementEvent():
+    """Record of a single statement execution, passed to the hooks registered on `qldb_orm.static.metrics.Instrumentation`. Hooks invoked before the statement see only the fields known up front; `wall_time`, `rows`, `read_ios`, `processing_time` and `error` are filled in by the time hooks after the statement run.
+
+    :param statement: Sanitized **PartiQL** statement
+    :type statement: str
+    :param params: Number of statement parameters
+    :type params: int
+    :param transaction_id: ID of the transaction, if the executor exposes one
+    :type transaction_id: str
+    :param retries: Number of times the transaction was retried before this execution
+    :type retries: int
+    """
+    __slots__ = ('statement', 'fingerprint', 'params', 'transaction_id', 'retries', 'started',
+                 'wall_time', 'rows', 'read_ios', 'processing_time', 'error')
+
+    def __init__(self, statement, params, transaction_id=None, retries=0):
+        self.statement = statement
+        self.fingerprint = fingerprint(statement)
+        self.params = params
+        self.transaction_id = transaction_id
+        self.retries = retries
+        self.started = time.time()
+        self.wall_time = None
+        self.rows = 0
+        self.read_ios = None
+        self.processing_time = None
+        self.error = None
+
+
+class Instrumentation():
+    """Registry of statement hooks. Hooks registered `before` are called with a `qldb_orm.static.metrics.StatementEvent` just before `qldb_orm.static.driver.Driver.execute` runs a statement; hooks registered `after` are called once its cursor has been read to the end, closed, or its transaction has finished, or the statement has failed.
+
+    When no hooks are registered, statements are executed without any instrumentation overhead. Exceptions raised by hooks are logged and otherwise ignored.
+    """
+
+    def __init__(self):
+        self.before = []
+        self.after = []
+        self._lock = threading.Lock()
+
+    @property
+    def active(self):
+        return bool(self.before or self.after)
+
+    def register(self, before=None, after=None):
+        """Register statement hooks.
+
+        :param before: Function of a `qldb_orm.static.metrics.StatementEvent`, called before the statement runs, defaults to `None`
+        :type before: function, optional
+        :param after: Function of a `qldb_orm.static.metrics.StatementEvent`, called after the statement runs, defaults to `None`
+        :type after: function, optional
+        """
+        with self._lock:
+            if before is not None:
+                self.before = self.before + [before]
+            if after is not None:
+                self.after = self.after + [after]
+
+    def unregister(self, hook):
+        """Remove a hook, whether it was registered to run before or after statements.
+        """
+        with self._lock:
+            self.before = [fn for fn in self.before if fn is not hook]
+            self.after = [fn for fn in self.after if fn is not hook]
+
+    def clear(self):
+        with self._lock:
+            self.before, self.after = [], []
+
+    @staticmethod
+    def _emit(hooks, event):
+        for hook in hooks:
+            try:
+                hook(event)
+            except Exception as e:  # pylint: disable=broad-except
+                log.error("Statement hook failed: %s", e)
+
+    def emit_before(self, event):
+        self._emit(self.before, event)
+
+    def emit_after(self, event):
+        self._emit(self.after, event)
+
+
+def attempts(query_lambda):
+    """Wrap a transaction function so statements executed within it know how many times the transaction has been retried, and so statements whose cursors are abandoned still report once the attempt ends.
+
+    :param query_lambda: Function passed to `execute_lambda`
+    :type query_lambda: function
+    :return: Wrapped function
+    :rtype: function
+    """
+    counter = [0]
+
+    def attempt(executor):
+        previous = getattr(_local, 'attempt', None)
+        _local.attempt = (counter[0], [])
+        counter[0] += 1
+        result = None
+        try:
+            result = query_lambda(executor)
+            return result
+        finally:
+            _, cursors = _local.attempt
+            _local.attempt = previous
+            for cursor in cursors:
+                # NOTE: a returned cursor is still read, e.g. buffered by pyqldb, after the function returns
+                if cursor is not result:
+                    cursor.close()
+    return attempt
+
+
+def retries():
+    """Number of retries of the transaction attempt running on the current thread.
+    """
+    attempt = getattr(_local, 'attempt', None)
+    return 0 if attempt is None else attempt[0]
+
+
+class InstrumentedCursor(StreamCursor):
+    """Cursor wrapper that counts rows and completes its `qldb_orm.static.metrics.StatementEvent` once the underlying cursor is exhausted or closed, collecting the `consumed_ios` and `timing_information` reported by `pyqldb`.
+
+    .. note::
+      Subclasses `pyqldb.cursor.stream_cursor.StreamCursor` so that `pyqldb` still buffers it when a transaction function returns it.
+    """
+
+    def __init__(self, cursor, event, started, instrumentation):  # pylint: disable=super-init-not-called
+        self._cursor = iter(cursor)
+        self._source = cursor
+        self._event = event
+        self._started = started
+        self._instrumentation = instrumentation
+        self._finished = False
+        attempt = getattr(_local, 'attempt', None)
+        if attempt is not None:
+            attempt[1].append(self)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            row = next(self._cursor)
+        except StopIteration:
+            self._finish()
+            raise
+        self._event.rows += 1
+        return row
+
+    def _finish(self):
+        if self._finished:
+            return
+        self._finished = True
+        self._event.wall_time = time.perf_counter() - self._started
+        consumed_ios = self.get_consumed_ios()
+        if consumed_ios:
+            self._event.read_ios = consumed_ios.get('ReadIOs')
+        timing_information = self.get_timing_information()
+        if timing_information:
+            self._event.processing_time = timing_information.get(
+                'ProcessingTimeMilliseconds')
+        self._instrumentation.emit_after(self._event)
+
+    def close(self):
+        self._finish()
+        close = getattr(self._source, 'close', None)
+        if close is not None:
+            close()
+
+    def get_consumed_ios(self):
+        get_consumed_ios = getattr(self._source, 'get_consumed_ios', None)
+        return None if get_consumed_ios is None else get_consumed_ios()
+
+    def get_timing_information(self):
+        get_timing_information = getattr(
+            self._source, 'get_timing_information', None)
+        return None if get_timing_information is None else get_timing_information()
+
+
+def execute(instrumentation, executor, statement, params):
+    """Execute a statement, reporting it to the hooks registered on `instrumentation`.
+
+    :return: Instrumented cursor
+    :rtype: :class:`qldb_orm.static.metrics.InstrumentedCursor`
+    """
+    event = StatementEvent(statement, len(params), getattr(
+        executor, 'transaction_id', None), retries())
+    instrumentation.emit_before(event)
+    started = time.perf_counter()
+    try:
+        cursor = executor.execute_statement(statement, *params)
+    except Exception as e:
+        event.wall_time = time.perf_counter() - started
+        event.error = e
+        instrumentation.emit_after(event)
+        raise
+    return InstrumentedCursor(cursor, event, started, instrumentation)
+
+
+class Histogram():
+    """Cumulative histogram with fixed bucket upper bounds, in the style of a **Prometheus** histogram.
+
+    :param buckets: Sorted bucket upper bounds, defaults to `qldb_orm.static.metrics.BUCKETS`
+    :type buckets: tuple, optional
+    """
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q):
+        """Estimate a quantile by linear interpolation within its bucket.
+
+        :param q: Quantile, between `0` and `1`
+        :type q: float
+        :return: Estimated value, or `None` if nothing was observed. Values beyond the last bucket are reported as its upper bound.
+        :rtype: float
+        """
+        if self.count == 0:
+            return None
+        rank, seen = q * self.count, 0
+        for index, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                if index == len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[index - 1] if index > 0 else 0.0
+                return lower + (self.buckets[index] - lower) * (rank - seen) / count
+            seen += count
+        return self.buckets[-1]
+
+
+class StatementStats():
+    """Aggregated statistics of the statements sharing a fingerprint.
+    """
+
+    def __init__(self):
+        self.duration = Histogram()
+        self.rows = 0
+        self.read_ios = 0
+        self.processing_time = 0
+        self.retries = 0
+        self.errors = 0
+
+    def observe(self, event):
+        self.duration.observe(event.wall_time or 0.0)
+        self.rows += event.rows
+        self.read_ios += event.read_ios or 0
+        self.processing_time += event.processing_time or 0
+        self.retries += event.retries
+        if event.error is not None:
+            self.errors += 1
+
+
+def escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class StatementMetrics():
+    """Built-in statement hook aggregating a duration histogram and row, read IO, processing time, retry and error totals per statement fingerprint. Register it through `qldb_orm.static.metrics.Instrumentation.register(after=metrics)`, or set the **METRICS** environment variable to `true`.
+    """
+
+    def __init__(self):
+        self.stats = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, event):
+        with self._lock:
+            stats = self.stats.get(event.fingerprint)
+            if stats is None:
+                stats = self.stats[event.fingerprint] = StatementStats()
+            stats.observe(event)
+
+    def reset(self):
+        with self._lock:
+            self.stats = {}
+
+    def top(self, n=10, key='duration'):
+        """Return the statements that cost the most in total.
+
+        :param n: Number of statements, defaults to `10`
+        :type n: int, optional
+        :param key: Cost to rank by, one of `duration`, `read_ios`, `processing_time`, `rows`, `retries` or `errors`, defaults to `duration`
+        :type key: str, optional
+        :return: `(fingerprint, stats)` pairs, most expensive first
+        :rtype: list
+        """
+        def cost(item):
+            value = getattr(item[1], key)
+            return value.sum if isinstance(value, Histogram) else value
+        with self._lock:
+            items = list(self.stats.items())
+        return sorted(items, key=cost, reverse=True)[:n]
+
+    def prometheus(self):
+        """Render the aggregated statistics in the **Prometheus** text exposition format.
+
+        :rtype: str
+        """
+        with self._lock:
+            items = sorted(self.stats.items())
+        lines = [
+            '# HELP qldb_orm_statement_duration_seconds Wall time of statements, from execution until their cursor is read.',
+            '# TYPE qldb_orm_statement_duration_seconds histogram'
+        ]
+        for key, stats in items:
+            label = 'fingerprint="{}"'.format(escape(key))
+            cumulative = 0
+            for bound, count in zip(stats.duration.buckets + ('+Inf',), stats.duration.counts):
+                cumulative += count
+                lines.append('qldb_orm_statement_duration_seconds_bucket{{{},le="{}"}} {}'.format(
+                    label, bound, cumulative))
+            lines.append('qldb_orm_statement_duration_seconds_sum{{{}}} {}'.format(
+                label, stats.duration.sum))
+            lines.append('qldb_orm_statement_duration_seconds_count{{{}}} {}'.format(
+                label, stats.duration.count))
+        for name, attribute, description in [
+            ('rows', 'rows', 'Rows read from statement cursors.'),
+            ('read_ios', 'read_ios', 'Read IOs consumed by statements, as reported by QLDB.'),
+            ('processing_milliseconds', 'processing_time',
+             'Server-side processing time of statements, as reported by QLDB.'),
+            ('retries', 'retries', 'Statements executed by retried transactions.'),
+            ('errors', 'errors', 'Statements that failed.')
+        ]:
+            lines.append(
+                '# HELP qldb_orm_statement_{}_total {}'.format(name, description))
+            lines.append(
+                '# TYPE qldb_orm_statement_{}_total counter'.format(name))
+            for key, stats in items:
+                lines.append('qldb_orm_statement_{}_total{{fingerprint="{}"}} {}'.format(
+                    name, escape(key), getattr(stats, attribute)))
+        return '\n'.join(lines) + '\n'
+
+
+class Sink():
+    """Destination for exported metrics: a local file, or a socket given as `udp://host:port`, `tcp://host:port` or `unix:///path/to/socket`.
+
+    :param target: Path or socket address
+    :type target: str
+    :param append: Flag to append to a file rather than replace it, defaults to `False`
+    :type append: bool, optional
+    """
+
+    def __init__(self, target, append=False):
+        self.target = target
+        self.append = append
+
+    def write(self, payload):
+        data = payload.encode('utf-8')
+        if self.target.startswith('udp://'):
+            host, port = self.target[len('udp://'):].rsplit(':', 1)
+            with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+                sock.sendto(data, (host, int(port)))
+        elif self.target.startswith('tcp://'):
+            host, port = self.target[len('tcp://'):].rsplit(':', 1)
+            with socket.create_connection((host, int(port)), timeout=5) as sock:
+                sock.sendall(data)
+        elif self.target.startswith('unix://'):
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.connect(self.target[len('unix://'):])
+                sock.sendall(data)
+        elif self.append:
+            with open(self.target, 'ab') as outfile:
+                outfile.write(data)
+        else:
+            # NOTE: write then rename, so a scraper never reads a partially written file
+            directory = os.path.dirname(os.path.abspath(self.target))
+            descriptor, path = tempfile.mkstemp(dir=directory)
+            with os.fdopen(descriptor, 'wb') as outfile:
+                outfile.write(data)
+            os.replace(path, self.target)
+
+
+class PrometheusExporter():
+    """Periodically write the statistics of a `qldb_orm.static.metrics.StatementMetrics` to a sink in the **Prometheus** text format, e.g. into the directory of the node exporter's textfile collector.
+
+    :param metrics: Statistics to export
+    :type metrics: :class:`qldb_orm.static.metrics.StatementMetrics`
+    :param target: File path or socket address, see `qldb_orm.static.metrics.Sink`
+    :type target: str
+    :param interval: Seconds between exports, defaults to `qldb_orm.settings.METRICS_INTERVAL`. If `0`, metrics are only exported when `export()` is called.
+    :type interval: float, optional
+    """
+
+    def __init__(self, metrics, target, interval=settings.METRICS_INTERVAL):
+        self.metrics = metrics
+        self.sink = Sink(target)
+        self.interval = interval
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def export(self):
+        try:
+            self.sink.write(self.metrics.prometheus())
+        except OSError as e:
+            log.error("Failed to export metrics to %s: %s", self.sink.target, e)
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            self.export()
+
+    def start(self):
+        if self.interval > 0 and self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop exporting, after a final export.
+        """
+        self._stopped.set()
+        self.export()
+
+
+class StatsDExporter():
+    """Statement hook that sends a **StatsD** timer for the duration of every statement, and counters for its rows and read IOs, to a sink. Metrics are named `<prefix>.<operation>.<table>.<metric>`, e.g. `qldb_orm.select.people.duration`.
+
+    :param target: File path or socket address, see `qldb_orm.static.metrics.Sink`. Files are appended to.
+    :type target: str
+    :param prefix: Metric name prefix, defaults to `qldb_orm`
+    :type prefix: str, optional
+    """
+
+    def __init__(self, target, prefix='qldb_orm'):
+        self.sink = Sink(target, append=True)
+        self.prefix = prefix
+
+    @staticmethod
+    @functools.lru_cache(maxsize=1024)
+    def scope(statement_fingerprint):
+        """Derive `<operation>.<table>` from a statement fingerprint.
+        """
+        words = statement_fingerprint.split()
+        operation = words[0].lower() if words else 'statement'
+        table = 'unknown'
+        upper = [word.upper() for word in words]
+        for marker in ('FROM', 'INTO', 'UPDATE', 'TABLE', 'ON'):
+            if marker in upper and upper.index(marker) + 1 < len(words):
+                table = words[upper.index(marker) + 1]
+                break
+        table = re.sub(r'[^\w]+', '_', table).strip('_') or 'unknown'
+        return '{}.{}'.format(operation, table)
+
+    def __call__(self, event):
+        name = '{}.{}'.format(self.prefix, self.scope(event.fingerprint))
+        lines = ['{}.duration:{:.3f}|ms'.format(name, (event.wall_time or 0.0) * 1000),
+                 '{}.rows:{}|c'.format(name, event.rows)]
+        if event.read_ios is not None:
+            lines.append('{}.read_ios:{}|c'.format(name, event.read_ios))
+        if event.retries:
+            lines.append('{}.retries:{}|c'.format(name, event.retries))
+        if event.error is not None:
+            lines.append('{}.errors:1|c'.format(name))
+        try:
+            self.sink.write('\n'.join(lines) + '\n')
+        except OSError as e:
+            log.error("Failed to send metrics to %s: %s", self.sink.target, e)
+
+
+instrumentation = Instrumentation()
+metrics = StatementMetrics()
+
+if settings.METRICS:
+    instrumentation.register(after=metrics)
+    if settings.METRICS_EXPORT:
+        if settings.METRICS_FORMAT == 'statsd':
+            instrumentation.register(after=StatsDExporter(settings.METRICS_EXPORT))
+        else:
+            atexit.register(PrometheusExporter(
+                metrics, settings.METRICS_EXPORT).start().stop)
@@ -1,4 +1,7 @@
 import json
+from collections.abc import Mapping
+from amazon.ion.simple_types import IonPyDict
+
 
 class Strut:
     """Simple object to parse `qldb-orm.qldb.Document`. Used to deserialize **QLDB** responses into Python native objects, with attributes accessible through object properties, i.e., the document
@@ -15,25 +18,123 @@ class Strut:
     ```python
     object.a.b.c == 'd'
     ```
+
+    A `Strut` is a slotted proxy around the `dict` or Ion struct holding its attributes; nested structs are only wrapped into a `Strut` when they are accessed, so hydrating a document does not copy its nested values. Setting an attribute writes through to the underlying struct, and `vars()` returns it.
+
+    .. note::
+      A `Strut` wrapped with an `owner`, e.g. a `qldb-orm.qldb.Document`, reports changes to the owner through its `_changed(path)` and `_watch(path, value)` methods, so the owner can track which nested fields were modified.
     """
+    __slots__ = ('_data', '_owner', '_path')
 
     def __init__(self, **kwargs):
         """Pass in `**kwargs` to assign attributes to the object
         """
-        for key, value in kwargs.items():
-            setattr(self, key, value)
-        self.__dict__.update(kwargs)
+        object.__setattr__(self, '_data', kwargs)
+        object.__setattr__(self, '_owner', None)
+        object.__setattr__(self, '_path', ())
+
+    @classmethod
+    def wrap(cls, data, owner=None, path=()):
+        """Wrap a `dict` or Ion struct into a `Strut`, without copying it.
+
+        :param data: Attributes of the object
+        :type data: dict
+        :param owner: Object notified of changes to the struct, defaults to `None`
+        :param path: Path of the struct within its owner, defaults to `()`
+        :type path: tuple, optional
+        :rtype: :class:`qldb-orm.static.objects.Strut`
+        """
+        strut = cls.__new__(cls)
+        object.__setattr__(strut, '_data', data)
+        object.__setattr__(strut, '_owner', owner)
+        object.__setattr__(strut, '_path', path)
+        return strut
+
+    @property
+    def __dict__(self):
+        # NOTE: the struct can be modified freely once it is handed out, so the owner assumes it was.
+        if self._owner is not None:
+            self._owner._changed(self._path)
+        return self._data
+
+    def __getattr__(self, key):
+        # NOTE: slots are only missing while an instance is being constructed, e.g. by `copy` or `pickle`.
+        if key in Strut.__slots__:
+            raise AttributeError(key)
+        try:
+            value = self._data[key]
+        except KeyError:
+            raise AttributeError(key) from None
+        # NOTE: `IonPyDict` is an abstract `Mapping`, so `isinstance` checks against it are slow; test the exact type first.
+        if type(value) is IonPyDict or isinstance(value, dict):
+            return Strut.wrap(value, self._owner, self._path + (key,))
+        if self._owner is not None and isinstance(value, list):
+            self._owner._watch(self._path + (key,), value)
+        return value
+
+    def __setattr__(self, key, value):
+        self._data[key] = value
+        if self._owner is not None:
+            self._owner._changed(self._path + (key,))
+
+    def __delattr__(self, key):
+        try:
+            del self._data[key]
+        except KeyError:
+            raise AttributeError(key) from None
+        if self._owner is not None:
+            self._owner._changed(self._path)
+
+    def __dir__(self):
+        return list(self._data.keys())
+
+    def __getstate__(self):
+        return self._data
+
+    def __setstate__(self, state):
+        object.__setattr__(self, '_data', state)
+        object.__setattr__(self, '_owner', None)
+        object.__setattr__(self, '_path', ())
+
+    def __eq__(self, other):
+        if isinstance(other, Strut):
+            return self._data == other._data
+        return NotImplemented
+
+    # NOTE: a `Strut` is mutable, so it is not hashable.
+    __hash__ = None
+
+    def __repr__(self):
+        return 'Strut({})'.format(', '.join('{}={!r}'.format(key, value) for key, value in self._data.items()))
 
     def to_json(self):
       return json.loads(json.dumps(self, cls=StrutEncoder))
 
+def resolve(obj, path):
+    """Resolve a dotted path against a `dict`, Ion struct or `qldb-orm.static.objects.Strut`.
+
+    :param obj: Object to resolve the path against
+    :param path: Dotted path, e.g. `nested.field`
+    :type path: str
+    :raises KeyError: If the path does not exist
+    :return: The value at the path
+    """
+    for key in path.split('.'):
+        if isinstance(obj, Strut):
+            obj = obj._data
+        obj = obj[key]
+    return obj
+
+
 class StrutEncoder(json.JSONEncoder):
     """Encoder object to deserialize `qldb-orm.static.objects.Strut` into string.
 
     """
     def default(self, obj):
-        """Method to convert `qldb-orm.static.objects.Strut` into deserializable object. Overrides `json.default` and adds a check for `Strut` objects. 
+        """Method to convert `qldb-orm.static.objects.Strut` into deserializable object. Overrides `json.default` and adds a check for `Strut` objects and Ion structs.
         """
         if isinstance(obj, Strut):
-            return vars(obj)
-        return json.JSONEncoder.default(self, obj)
\ No newline at end of file
+            return obj._data
+        if isinstance(obj, Mapping):
+            return dict(obj)
+        return json.JSONEncoder.default(self, obj)
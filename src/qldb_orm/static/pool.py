@@ -0,0 +1,106 @@
+import atexit
+import threading
+from pyqldb.driver.qldb_driver import QldbDriver
+from qldb_orm import settings
+from qldb_orm.static.logger import getLogger
+
+log = getLogger('qldb-orm.pool')
+
+
+class DriverPool():
+    """Thread-safe registry of `pyqldb.driver.qldb_driver.QldbDriver` instances, or instances of another backend, keyed by ledger, backend and client configuration. Each driver maintains its own session pool, so sharing a single driver across calls lets **QLDB** sessions be reused instead of started fresh for every statement.
+
+    Drivers are created lazily, on the first request for a given ledger and configuration, and are held until `close()` is called. All drivers are closed when the interpreter exits.
+
+    :param max_concurrent_transactions: Maximum number of concurrent transactions per driver, defaults to `qldb_orm.settings.MAX_CONCURRENT_TRANSACTIONS`. `0` defers to the limit of the underlying `botocore` client.
+    :type max_concurrent_transactions: int, optional
+    :param enabled: Flag to toggle pooling, defaults to `qldb_orm.settings.POOL_DRIVERS`. If `False`, a new driver is created on every request.
+    :type enabled: bool, optional
+    """
+
+    def __init__(self, max_concurrent_transactions=settings.MAX_CONCURRENT_TRANSACTIONS, enabled=settings.POOL_DRIVERS):
+        self.max_concurrent_transactions = max_concurrent_transactions
+        self.enabled = enabled
+        self._drivers = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._drivers)
+
+    def __contains__(self, ledger):
+        return any(key[0] == ledger for key in self._drivers)
+
+    @staticmethod
+    def _key(ledger, config, backend=None):
+        """Generate a hashable registry key from the ledger name, backend and driver configuration. Unhashable configuration values, e.g. a `botocore.config.Config`, are keyed by identity.
+
+        :param ledger: Name of the ledger
+        :type ledger: str
+        :param config: Keyword arguments passed to the driver constructor
+        :type config: dict
+        :param backend: Driver constructor, defaults to `None`
+        :type backend: type, optional
+        :return: registry key
+        :rtype: tuple
+        """
+        items = []
+        for key, value in sorted(config.items()):
+            try:
+                hash(value)
+            except TypeError:
+                value = id(value)
+            items.append((key, value))
+        return (ledger, tuple(items), backend)
+
+    def _create(self, ledger, config, backend=None):
+        config.setdefault('max_concurrent_transactions',
+                          self.max_concurrent_transactions)
+        log.debug("Creating driver for LEDGER(%s)", ledger)
+        return (backend or QldbDriver)(ledger_name=ledger, **config)
+
+    def get(self, ledger, backend=None, **config):
+        """Retrieve the driver for a ledger, creating it if it does not already exist.
+
+        :param ledger: Name of the ledger
+        :type ledger: str
+        :param backend: Driver constructor, defaults to `None`. If `None`, a `pyqldb.driver.qldb_driver.QldbDriver` is created. See `qldb_orm.static.driver.Driver.backend`.
+        :type backend: type, optional
+        :param config: Keyword arguments passed through to the driver constructor, e.g. `region_name`, `endpoint_url`, `read_ahead`.
+        :return: QLDB Driver
+        :rtype: :class:`pyqldb.driver.qldb_driver.QldbDriver`
+        """
+        if not self.enabled:
+            return self._create(ledger, config, backend)
+
+        key = self._key(ledger, config, backend)
+        driver = self._drivers.get(key)
+        if driver is not None:
+            return driver
+
+        with self._lock:
+            driver = self._drivers.get(key)
+            if driver is None:
+                driver = self._create(ledger, config, backend)
+                self._drivers[key] = driver
+        return driver
+
+    def close(self, ledger=None):
+        """Close pooled drivers and end their sessions. Subsequent requests will lazily create new drivers.
+
+        :param ledger: Name of the ledger whose drivers should be closed, defaults to `None`. If `None`, every driver in the pool is closed.
+        :type ledger: str, optional
+        """
+        with self._lock:
+            keys = [key for key in self._drivers
+                    if ledger is None or key[0] == ledger]
+            drivers = [self._drivers.pop(key) for key in keys]
+
+        for driver in drivers:
+            try:
+                driver.close()
+            except Exception as e:  # pylint: disable=broad-except
+                log.error(e)
+
+
+pool = DriverPool()
+atexit.register(pool.close)
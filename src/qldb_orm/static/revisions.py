@@ -0,0 +1,241 @@
+import atexit
+import datetime
+import sqlite3
+import threading
+from amazon.ion import simpleion
+from qldb_orm import settings
+from qldb_orm.static import convert
+from qldb_orm.static.checkpoint import txtime
+from qldb_orm.static.logger import getLogger
+
+log = getLogger('qldb-orm.revisions')
+
+EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS revisions (ledger TEXT NOT NULL, tbl TEXT NOT NULL, meta_id TEXT NOT NULL, "
+    "version INTEGER NOT NULL, tx_time INTEGER NOT NULL, record BLOB NOT NULL, "
+    "PRIMARY KEY (ledger, tbl, meta_id, version))",
+    "CREATE INDEX IF NOT EXISTS revisions_tx_time ON revisions (ledger, tbl, tx_time)",
+    "CREATE TABLE IF NOT EXISTS watermarks (ledger TEXT NOT NULL, tbl TEXT NOT NULL, tx_time INTEGER NOT NULL, "
+    "PRIMARY KEY (ledger, tbl))"
+)
+
+
+def microseconds(time):
+    """Convert a commit time into microseconds since the epoch, the sortable representation of `metadata.txTime` in the store.
+
+    :param time: Commit time, either a `datetime.datetime` or its `str` representation
+    :return: Microseconds since the epoch
+    :rtype: int
+    """
+    return (txtime(time) - EPOCH) // datetime.timedelta(microseconds=1)
+
+
+def instant(value):
+    """Convert microseconds since the epoch back into a `datetime.datetime` in UTC.
+    """
+    return EPOCH + datetime.timedelta(microseconds=value)
+
+
+class RevisionStore():
+    """Append-only, on-disk store of document revisions keyed by `(ledger, table, metadata.id, metadata.version)`. Revisions are immutable, so once a revision is stored it never has to be read from the ledger again. Records are kept in **SQLite** as Ion binary, exactly as the ledger returned them, and are down converted when they are read.
+
+    The store is opt-in; it is disabled unless a `path` is given, or the **REVISION_STORE** environment variable is set. `:memory:` keeps the store in memory for the lifetime of the process.
+
+    :param path: Path of the **SQLite** database, defaults to `qldb_orm.settings.REVISION_STORE`
+    :type path: str, optional
+    """
+
+    def __init__(self, path=settings.REVISION_STORE):
+        self.path = path
+        self.enabled = bool(path)
+        self._connection = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        if self._connection is None:
+            self._connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            if self.path != ':memory:':
+                self._connection.execute('PRAGMA journal_mode=WAL')
+            for statement in SCHEMA:
+                self._connection.execute(statement)
+        return self._connection
+
+    def _query(self, statement, *params):
+        with self._lock:
+            return self._connect().execute(statement, params).fetchall()
+
+    @staticmethod
+    def _load(rows):
+        return [convert.to_native(simpleion.loads(row[0])) for row in rows]
+
+    def append(self, ledger, table, records):
+        """Store revision records, as returned by `qldb_orm.static.driver.Driver.history`. Revisions that are already stored are ignored.
+
+        :param ledger: Name of the ledger
+        :type ledger: str
+        :param table: Name of the table
+        :type table: str
+        :param records: Revision records, i.e. `{ blockAddress, hash, data, metadata }`
+        :type records: iterable
+        :return: Latest `metadata.txTime` of the records, or `None` if there were none
+        :rtype: datetime.datetime
+        """
+        rows, latest = [], None
+        for record in records:
+            metadata = record['metadata']
+            time = microseconds(metadata['txTime'])
+            latest = time if latest is None else max(latest, time)
+            rows.append((ledger, table, str(metadata['id']), int(metadata['version']), time,
+                         simpleion.dumps(record, binary=True)))
+        if rows:
+            with self._lock:
+                connection = self._connect()
+                # NOTE: the connection commits the transaction on success and rolls it back on failure, so a failed
+                #       insert is not left open for the next statement.
+                with connection:
+                    connection.execute('BEGIN')
+                    connection.executemany('INSERT OR IGNORE INTO revisions VALUES (?, ?, ?, ?, ?, ?)', rows)
+            log.debug("Stored %s revisions of TABLE(%s)", len(rows), table)
+        return None if latest is None else instant(latest)
+
+    def version(self, ledger, table, meta_id, until=None):
+        """Latest stored `metadata.version` of a document.
+
+        :param until: Only consider revisions whose `metadata.version` is at most `until`, defaults to `None`
+        :type until: int, optional
+        :return: Version, or `None` if no revision of the document is stored
+        :rtype: int
+        """
+        return self._query('SELECT MAX(version) FROM revisions WHERE ledger = ? AND tbl = ? AND meta_id = ? '
+                           'AND version <= ?', ledger, table, meta_id,
+                           (1 << 62) if until is None else until)[0][0]
+
+    def count(self, ledger, table, meta_id, version=None, until=None):
+        """Number of stored revisions of a document within a range of versions, e.g. to find whether any revision in the range is missing.
+
+        :param version: Only count revisions whose `metadata.version` is greater than `version`, defaults to `None`
+        :type version: int, optional
+        :param until: Only count revisions whose `metadata.version` is at most `until`, defaults to `None`
+        :type until: int, optional
+        :return: Number of stored revisions
+        :rtype: int
+        """
+        return self._query('SELECT COUNT(*) FROM revisions WHERE ledger = ? AND tbl = ? AND meta_id = ? '
+                           'AND version > ? AND version <= ?', ledger, table, meta_id,
+                           -1 if version is None else version, (1 << 62) if until is None else until)[0][0]
+
+    def document(self, ledger, table, meta_id, start=None, end=None, version=None, until=None):
+        """Stored revisions of a document, ordered by `metadata.version`.
+
+        :param start: Earliest commit time of the revisions, inclusive, defaults to `None`
+        :type start: datetime.datetime, optional
+        :param end: Latest commit time of the revisions, inclusive, defaults to `None`
+        :type end: datetime.datetime, optional
+        :param version: Only return revisions whose `metadata.version` is greater than `version`, defaults to `None`
+        :type version: int, optional
+        :param until: Only return revisions whose `metadata.version` is at most `until`, defaults to `None`
+        :type until: int, optional
+        :return: Down converted revision records
+        :rtype: list
+        """
+        return self._load(self._query(
+            'SELECT record FROM revisions WHERE ledger = ? AND tbl = ? AND meta_id = ? AND version > ? '
+            'AND version <= ? AND tx_time BETWEEN ? AND ? ORDER BY version',
+            ledger, table, meta_id, -1 if version is None else version, (1 << 62) if until is None else until,
+            *self._bounds(start, end)))
+
+    def table(self, ledger, table, start=None, end=None):
+        """Stored revisions of a table, ordered by `metadata.txTime`.
+
+        :param start: Earliest commit time of the revisions, inclusive, defaults to `None`
+        :type start: datetime.datetime, optional
+        :param end: Latest commit time of the revisions, inclusive, defaults to `None`
+        :type end: datetime.datetime, optional
+        :return: Down converted revision records
+        :rtype: list
+        """
+        return self._load(self._query(
+            'SELECT record FROM revisions WHERE ledger = ? AND tbl = ? AND tx_time BETWEEN ? AND ? '
+            'ORDER BY tx_time, meta_id, version', ledger, table, *self._bounds(start, end)))
+
+    @staticmethod
+    def _bounds(start, end):
+        return (-(1 << 62) if start is None else microseconds(start), (1 << 62) if end is None else microseconds(end))
+
+    def as_of(self, ledger, table, meta_id, time):
+        """The revision of a document that was current at `time`, i.e. its latest revision committed at or before `time`.
+
+        :param time: Point in time
+        :type time: datetime.datetime
+        :return: Down converted revision record, or `None` if no stored revision was committed by then. The record has no `data` if the document was deleted.
+        :rtype: dict
+        """
+        records = self._load(self._query(
+            'SELECT record FROM revisions WHERE ledger = ? AND tbl = ? AND meta_id = ? AND tx_time <= ? '
+            'ORDER BY version DESC LIMIT 1', ledger, table, meta_id, microseconds(time)))
+        return records[0] if records else None
+
+    def snapshot(self, ledger, table, time):
+        """The revision of every stored document of a table that was current at `time`.
+
+        :param time: Point in time
+        :type time: datetime.datetime
+        :return: Down converted revision records, ordered by `metadata.id`
+        :rtype: list
+        """
+        time = microseconds(time)
+        return self._load(self._query(
+            'SELECT record FROM revisions AS r WHERE ledger = ? AND tbl = ? AND version = ('
+            'SELECT MAX(version) FROM revisions WHERE ledger = r.ledger AND tbl = r.tbl AND meta_id = r.meta_id '
+            'AND tx_time <= ?) ORDER BY meta_id', ledger, table, time))
+
+    def watermark(self, ledger, table):
+        """Commit time up to which the whole history of a table is stored, see `qldb_orm.static.revisions.RevisionStore.advance`.
+
+        :return: Watermark, or `None` if the history of the table was never stored
+        :rtype: datetime.datetime
+        """
+        rows = self._query('SELECT tx_time FROM watermarks WHERE ledger = ? AND tbl = ?', ledger, table)
+        return instant(rows[0][0]) if rows else None
+
+    def advance(self, ledger, table, time):
+        """Record that the whole history of a table, up to `time`, is stored.
+
+        :param time: Latest commit time of the stored history
+        :type time: datetime.datetime
+        """
+        self._query('INSERT INTO watermarks VALUES (?, ?, ?) ON CONFLICT (ledger, tbl) '
+                    'DO UPDATE SET tx_time = MAX(tx_time, excluded.tx_time)', ledger, table, microseconds(time))
+
+    def clear(self, ledger=None, table=None):
+        """Drop stored revisions, e.g. after a table is dropped and recreated with the same name.
+
+        :param ledger: Name of the ledger, defaults to `None`, i.e. every ledger
+        :type ledger: str, optional
+        :param table: Name of the table, defaults to `None`, i.e. every table of the ledger
+        :type table: str, optional
+        """
+        conditions, params = [], []
+        if ledger is not None:
+            conditions.append('ledger = ?')
+            params.append(ledger)
+            if table is not None:
+                conditions.append('tbl = ?')
+                params.append(table)
+        where = ' WHERE {}'.format(' AND '.join(conditions)) if conditions else ''
+        self._query('DELETE FROM revisions{}'.format(where), *params)
+        self._query('DELETE FROM watermarks{}'.format(where), *params)
+
+    def close(self):
+        """Close the connection to the database.
+        """
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+revisions = RevisionStore()
+atexit.register(revisions.close)
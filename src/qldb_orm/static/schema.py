@@ -0,0 +1,265 @@
+import threading
+import time
+from botocore.exceptions import ClientError
+from qldb_orm import settings
+from qldb_orm.static.logger import getLogger
+from qldb_orm.static.driver import Driver
+from qldb_orm.static.executor import executor
+
+log = getLogger('qldb-orm.schema')
+
+
+class SchemaCache():
+    """Per-ledger cache of the tables and indexes that exist on a **QLDB** ledger. Avoids a `list_tables` round trip every time a `qldb_orm.qldb.Document` checks its fixtures.
+
+    Entries expire after `ttl` seconds, after which the table list is re-read from the ledger on the next lookup. Tables and indexes created through the ORM are recorded with `add_table` and `add_index`, so they are visible immediately without waiting for the entry to expire. The indexes that exist on the ledger are read from `information_schema.user_tables` the first time an entry's indexes are looked up.
+
+    Indexed fields can be declared per table with `declare`, and the declared indexes that are missing from the ledger created in one pass with `create_missing`. Queries are checked against the indexes of their table through `check`, according to the `policy`.
+
+    :param ttl: Number of seconds a ledger's table list is considered fresh, defaults to `qldb_orm.settings.SCHEMA_TTL`. If `0`, the ledger is queried on every lookup.
+    :type ttl: float, optional
+    :param policy: What to do when a query cannot use an index, defaults to `qldb_orm.settings.INDEX_POLICY`. One of `ignore`, `warn`, to log a warning, or `raise`, to raise a `ValueError`.
+    :type policy: str, optional
+    """
+
+    def __init__(self, ttl=settings.SCHEMA_TTL, policy=settings.INDEX_POLICY):
+        self.ttl = ttl
+        self.policy = policy
+        self._ledgers = {}
+        self._declared = {}
+        self._warned = set()
+        self._lock = threading.Lock()
+
+    def _entry(self, ledger):
+        """Return the cached schema entry for a ledger, loading it from the ledger if it is missing or expired.
+
+        :param ledger: Name of the ledger
+        :type ledger: str
+        :return: `dict` with keys `expires` and `tables`, where `tables` maps table names to a `set` of indexed fields.
+        :rtype: dict
+        """
+        entry = self._ledgers.get(ledger)
+        if entry is not None and entry['expires'] > time.monotonic():
+            return entry
+
+        log.debug("Loading schema for LEDGER(%s)", ledger)
+        tables = {str(table): set() for table in Driver.tables(ledger)}
+        with self._lock:
+            previous = self._ledgers.get(ledger)
+            if previous is not None:
+                for table, indexes in previous['tables'].items():
+                    if table in tables:
+                        tables[table].update(indexes)
+            entry = {'expires': time.monotonic() + self.ttl, 'tables': tables, 'indexed': False}
+            self._ledgers[ledger] = entry
+        return entry
+
+    def _indexed_entry(self, ledger):
+        """Return the cached schema entry for a ledger, along with the indexes that exist on the ledger.
+
+        :param ledger: Name of the ledger
+        :type ledger: str
+        :return: `dict` with keys `expires`, `tables` and `indexed`
+        :rtype: dict
+        """
+        entry = self._entry(ledger)
+        if entry['indexed']:
+            return entry
+
+        log.debug("Loading indexes for LEDGER(%s)", ledger)
+        indexes = Driver.indexes(ledger)
+        with self._lock:
+            for table, fields in indexes.items():
+                if table in entry['tables']:
+                    entry['tables'][table].update(fields)
+            entry['indexed'] = True
+        return entry
+
+    def has_table(self, ledger, table):
+        """Check if a table exists on the ledger.
+
+        :param ledger: Name of the ledger
+        :type ledger: str
+        :param table: Name of the table
+        :type table: str
+        :return: True if the table exists, False otherwise
+        :rtype: bool
+        """
+        return table in self._entry(ledger)['tables']
+
+    def indexes(self, ledger, table):
+        """Return the indexed fields of a table.
+
+        :param ledger: Name of the ledger
+        :type ledger: str
+        :param table: Name of the table
+        :type table: str
+        :return: Indexed fields
+        :rtype: set
+        """
+        return set(self._indexed_entry(ledger)['tables'].get(table, ()))
+
+    def has_index(self, ledger, table, index):
+        """Check if an index on a table exists on the ledger, or has been recorded in the cache.
+
+        :param ledger: Name of the ledger
+        :type ledger: str
+        :param table: Name of the table
+        :type table: str
+        :param index: Name of the indexed field
+        :type index: str
+        :return: True if the index is known to exist, False otherwise
+        :rtype: bool
+        """
+        return index in self._indexed_entry(ledger)['tables'].get(table, ())
+
+    def add_table(self, ledger, table):
+        """Record a newly created table. Should be invoked after `qldb_orm.static.driver.Driver.create_table`.
+
+        :param ledger: Name of the ledger
+        :type ledger: str
+        :param table: Name of the table
+        :type table: str
+        """
+        with self._lock:
+            entry = self._ledgers.get(ledger)
+            if entry is not None:
+                entry['tables'].setdefault(table, set())
+
+    def add_index(self, ledger, table, index):
+        """Record a newly created index. Should be invoked after `qldb_orm.static.driver.Driver.create_index`.
+
+        :param ledger: Name of the ledger
+        :type ledger: str
+        :param table: Name of the table
+        :type table: str
+        :param index: Name of the indexed field
+        :type index: str
+        """
+        with self._lock:
+            entry = self._ledgers.get(ledger)
+            if entry is not None:
+                entry['tables'].setdefault(table, set()).add(index)
+
+    def declare(self, ledger, table, *fields):
+        """Declare indexed fields of a table. Declared indexes are not created until `create_missing` is invoked.
+
+        :param ledger: Name of the ledger
+        :type ledger: str
+        :param table: Name of the table
+        :type table: str
+        :param fields: Names of the indexed fields
+        :type fields: str
+        """
+        with self._lock:
+            self._declared.setdefault((ledger, table), set()).update(fields)
+
+    def declared(self, ledger, table):
+        """Return the declared indexed fields of a table.
+
+        :param ledger: Name of the ledger
+        :type ledger: str
+        :param table: Name of the table
+        :type table: str
+        :return: Declared indexed fields
+        :rtype: set
+        """
+        return set(self._declared.get((ledger, table), ()))
+
+    def create_missing(self, ledger=None, table=None, parallelism=None):
+        """Create the declared tables and indexes that do not exist on the ledger. The schema of each ledger is read once, then the missing tables are created, followed by the missing indexes, concurrently on pooled sessions.
+
+        :param ledger: Name of the ledger, defaults to `None`. If `None`, the declarations of every ledger are created.
+        :type ledger: str, optional
+        :param table: Name of the table, defaults to `None`. If `None`, the declarations of every table are created.
+        :type table: str, optional
+        :param parallelism: Maximum number of concurrent transactions, defaults to `qldb_orm.settings.LEDGER_CONCURRENCY`
+        :type parallelism: int, optional
+        :return: `(ledger, table, field)` of each created index
+        :rtype: list
+
+        .. note::
+          **QLDB** builds indexes on tables that already contain documents asynchronously; such an index is only used by queries once its status is `ONLINE`.
+        """
+        with self._lock:
+            declared = {key: set(fields) for key, fields in self._declared.items()
+                        if (ledger is None or key[0] == ledger) and (table is None or key[1] == table)}
+
+        created = []
+        for target in dict.fromkeys(key[0] for key in declared):
+            tables = [key[1] for key in declared if key[0] == target]
+
+            def create_table(name, target=target):
+                try:
+                    Driver.create_table(Driver.driver(target), name)
+                    self.add_table(target, name)
+                except ClientError as e:
+                    log.error(e)
+                    self.invalidate(target)
+
+            executor.map(create_table, [name for name in tables if not self.has_table(target, name)], parallelism)
+
+            missing = [(name, field) for name in tables for field in sorted(declared[(target, name)])
+                       if not self.has_index(target, name, field)]
+
+            def create_index(item, target=target):
+                try:
+                    Driver.create_index(Driver.driver(target), *item)
+                    self.add_index(target, *item)
+                    return (target,) + item
+                except ClientError as e:
+                    log.error(e)
+                    self.invalidate(target)
+                    return None
+
+            log.debug("Creating %s indexes on LEDGER(%s)", len(missing), target)
+            created.extend(item for item in executor.map(create_index, missing, parallelism) if item is not None)
+        return created
+
+    def check(self, ledger, table, columns, condition=None):
+        """Check if a query constraining `columns` by equality, combined with `condition` through `AND`, can use an index of the table. **QLDB** only uses an index when the condition of a query includes an equality or `IN` predicate on an indexed field; any other query scans the whole table. Depending on the `policy`, a query that cannot use an index is ignored, logged once or rejected.
+
+        :param ledger: Name of the ledger
+        :type ledger: str
+        :param table: Name of the table
+        :type table: str
+        :param columns: Columns constrained by equality
+        :type columns: set
+        :param condition: Condition of the query, defaults to `None`
+        :type condition: :class:`qldb_orm.static.filters.Where`, optional
+        :raises ValueError: If the query cannot use an index and the policy is `raise`
+        :return: True if the query can use an index, or the policy is `ignore`, False otherwise
+        :rtype: bool
+        """
+        if self.policy not in ['warn', 'raise']:
+            return True
+        columns = frozenset(columns)
+        indexes = self.indexes(ledger, table)
+        if columns & indexes or (condition is not None and condition.indexed(indexes)):
+            return True
+        predicates = ', '.join(sorted(columns))
+        if condition is not None:
+            predicates = ' AND '.join(filter(None, [predicates, repr(condition)]))
+        message = 'Query on TABLE({}) by ({}) cannot use an index of the table ({}) and scans every document'.format(
+            table, predicates or '-', ', '.join(sorted(indexes)) or '-')
+        if self.policy == 'raise':
+            raise ValueError(message)
+        if (ledger, table, predicates) not in self._warned:
+            self._warned.add((ledger, table, predicates))
+            log.warning(message)
+        return False
+
+    def invalidate(self, ledger=None):
+        """Drop cached schema entries, forcing the next lookup to query the ledger.
+
+        :param ledger: Name of the ledger, defaults to `None`. If `None`, every ledger is invalidated.
+        :type ledger: str, optional
+        """
+        with self._lock:
+            if ledger is None:
+                self._ledgers.clear()
+            else:
+                self._ledgers.pop(ledger, None)
+
+
+schema = SchemaCache()
@@ -0,0 +1,265 @@
+import datetime
+import functools
+import re
+from qldb_orm import settings
+from qldb_orm.static import clauses
+
+IDENTIFIER = re.compile(r'^[A-Za-z_]\w*$')
+PATH = re.compile(r'^[A-Za-z_]\w*(?:\.[A-Za-z_]\w*)*$')
+
+SOURCES = {
+    'table': '{}',
+    'committed': '_ql_committed_{}',
+    'history': 'history({})'
+}
+
+
+class Statement(str):
+    """Immutable **PartiQL** statement generated by `qldb_orm.static.statements`. Every identifier in the statement was validated when it was built, so `qldb_orm.static.driver.Driver.execute` runs it as is, without sanitizing it again. Since it is a `str`, it can be used anywhere a statement is accepted.
+    """
+
+
+# NOTE: `history(t, start)` requires a start time; histories bounded only by an end time start at the epoch.
+EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+
+# NOTE: the indexes of every active table on the ledger; `expr` holds the indexed field, e.g. `[team]`.
+USER_TABLES = Statement("SELECT name, indexes FROM information_schema.user_tables WHERE status = 'ACTIVE'")
+
+
+def identifier(name, path=False):
+    """Validate a table name, or a column path if `path` is set, e.g. `nested.field`.
+
+    :param name: Identifier to validate
+    :type name: str
+    :param path: Flag to allow dotted paths, defaults to `False`
+    :type path: bool, optional
+    :raises ValueError: If `name` is not a valid identifier
+    :return: `name`
+    :rtype: str
+    """
+    if not isinstance(name, str) or not (PATH if path else IDENTIFIER).match(name):
+        raise ValueError('Invalid identifier: {!r}'.format(name))
+    return name
+
+
+def bucket(n):
+    """Round the arity of an `IN` list up to the next power of two, so statements over lists of similar length share a cached statement.
+
+    :param n: Number of values in the list
+    :type n: int
+    :return: Bucketed arity
+    :rtype: int
+    """
+    return 1 if n <= 1 else 1 << (n - 1).bit_length()
+
+
+def pad(values):
+    """Pad the values of an `IN` list to its bucketed arity by repeating the last value. Repeated values do not change the result of an `IN` predicate.
+
+    :param values: Values of the `IN` list
+    :type values: list
+    :return: Padded values
+    :rtype: list
+    """
+    values = list(values)
+    if not values:
+        return values
+    return values + [values[-1]] * (bucket(len(values)) - len(values))
+
+
+def _where(equals, within, where):
+    clause = clauses.where_equals(*equals) if equals else None
+    if within:
+        clause_in = clauses.where_in(**dict(within))
+        clause = clause_in if clause is None else '{}{}'.format(
+            clause, clause_in.replace('WHERE', 'AND', 1))
+    if where is not None:
+        condition = clauses.condition(where)
+        clause = 'WHERE {}'.format(condition) if clause is None else '{}AND ({})'.format(clause, condition)
+    return clause.strip() if clause else None
+
+
+def _shape(shape):
+    """Validate the shape of a `qldb_orm.static.filters.Where`, see `qldb_orm.static.clauses.condition`.
+    """
+    connector, negated, children = shape
+    if connector not in clauses.CONNECTORS or not children:
+        raise ValueError('Invalid condition: {!r}'.format(shape))
+    validated = []
+    for child in children:
+        if len(child) == 3 and isinstance(child[2], tuple):
+            validated.append(_shape(child))
+            continue
+        column, operator, n = child
+        if operator not in clauses.OPERATORS or not isinstance(n, int) or n < 1:
+            raise ValueError('Invalid predicate: {!r}'.format(child))
+        validated.append((identifier(column, True), operator, bucket(n) if operator == clauses.IN else n))
+    return (connector, bool(negated), tuple(validated))
+
+
+@functools.lru_cache(maxsize=settings.STATEMENT_CACHE_SIZE)
+def _select(table, equals, within, fields, by, source, where):
+    if fields is None:
+        projection = '*'
+    else:
+        projection = ', '.join(
+            path if alias is None else '{} AS {}'.format(path, alias) for path, alias in fields)
+    parts = ['SELECT', projection, 'FROM', SOURCES[source].format(table)]
+    if by is not None:
+        parts += ['BY', by]
+    clause = _where(equals, within, where)
+    if clause is not None:
+        parts.append(clause)
+    return Statement(' '.join(parts))
+
+
+def select(table, equals=(), within=(), fields=None, by='meta_id', source='table', where=None):
+    """Build a `SELECT` statement, or retrieve it from the statement cache.
+
+    :param table: Name of the table
+    :type table: str
+    :param equals: Columns matched with `column = ?`, defaults to `()`
+    :type equals: tuple, optional
+    :param within: `(column, n)` pairs matched with `column IN (?, .. ?)` against `n` values, defaults to `()`. `n` is rounded up by `qldb_orm.static.statements.bucket`; pad the values with `qldb_orm.static.statements.pad`.
+    :type within: tuple, optional
+    :param fields: Projected paths, either as `path` or `(path, alias)`, defaults to `None`, i.e. `*`
+    :type fields: tuple, optional
+    :param by: Name bound to the document ID through `BY`, defaults to `meta_id`. If `None`, no `BY` clause is added.
+    :type by: str, optional
+    :param source: One of `table`, `committed`, for the committed view of the table, or `history`, for its revision history, defaults to `table`
+    :type source: str, optional
+    :param where: Shape of a `qldb_orm.static.filters.Where` condition, combined with `equals` and `within` through `AND`, defaults to `None`
+    :type where: tuple, optional
+    :raises ValueError: If an identifier is invalid
+    :return: Statement
+    :rtype: :class:`qldb_orm.static.statements.Statement`
+    """
+    if source not in SOURCES:
+        raise ValueError('Invalid source: {!r}'.format(source))
+    if fields is not None:
+        fields = tuple((identifier(field, True), None) if isinstance(field, str)
+                       else (identifier(field[0], True), None if field[1] is None else identifier(field[1]))
+                       for field in fields)
+    return _select(identifier(table), tuple(identifier(column, True) for column in equals),
+                   tuple((identifier(column, True), bucket(n)) for column, n in within),
+                   fields, None if by is None else identifier(by), source,
+                   None if where is None or not where[2] else _shape(where))
+
+
+def timestamp(value):
+    """Format a `datetime.datetime` as an Ion timestamp literal in UTC, e.g. `` `2022-01-01T00:00:00.000000Z` ``. Naive values are taken to be UTC.
+
+    :param value: Time to format
+    :type value: datetime.datetime
+    :raises ValueError: If `value` is not a `datetime.datetime`
+    :return: Ion timestamp literal
+    :rtype: str
+    """
+    if not isinstance(value, datetime.datetime):
+        raise ValueError('Invalid timestamp: {!r}'.format(value))
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=datetime.timezone.utc)
+    return '`{}`'.format(value.astimezone(datetime.timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%fZ'))
+
+
+def history(table, start=None, end=None, equals=(), where=None):
+    """Build a `SELECT` statement over the revision history of a table, optionally bounded by `history(table, start, end)`. The statement without bounds is retrieved from the statement cache; since the bounds are rendered as Ion timestamp literals, bounded statements are not cached themselves.
+
+    :param table: Name of the table
+    :type table: str
+    :param start: Earliest commit time of the revisions, inclusive, defaults to `None`
+    :type start: datetime.datetime, optional
+    :param end: Latest commit time of the revisions, inclusive, defaults to `None`
+    :type end: datetime.datetime, optional
+    :param equals: Columns matched with `column = ?`, defaults to `()`
+    :type equals: tuple, optional
+    :param where: Shape of a `qldb_orm.static.filters.Where` condition, defaults to `None`
+    :type where: tuple, optional
+    :raises ValueError: If an identifier or timestamp is invalid
+    :return: Statement
+    :rtype: :class:`qldb_orm.static.statements.Statement`
+    """
+    statement = select(table, equals=equals, by=None, source='history', where=where)
+    if start is None and end is None:
+        return statement
+    bounds = [timestamp(EPOCH if start is None else start)]
+    if end is not None:
+        bounds.append(timestamp(end))
+    return Statement(statement.replace(SOURCES['history'].format(table),
+                                       'history({}, {})'.format(table, ', '.join(bounds)), 1))
+
+
+@functools.lru_cache(maxsize=settings.STATEMENT_CACHE_SIZE)
+def _insert(table, n):
+    if n == 1:
+        return Statement('INSERT INTO {} ?'.format(table))
+    return Statement('INSERT INTO {} {}'.format(table, clauses.bag(n)))
+
+
+def insert(table, n=1):
+    """Build an `INSERT` statement for `n` documents, or retrieve it from the statement cache. Bags of documents are not bucketed, since padding them would insert duplicates.
+
+    :param table: Name of the table
+    :type table: str
+    :param n: Number of documents, defaults to `1`
+    :type n: int, optional
+    :return: Statement
+    :rtype: :class:`qldb_orm.static.statements.Statement`
+    """
+    if n < 1:
+        raise ValueError('Cannot insert {} documents'.format(n))
+    return _insert(identifier(table), n)
+
+
+@functools.lru_cache(maxsize=settings.STATEMENT_CACHE_SIZE)
+def _update(table, index, columns):
+    if columns:
+        assignment = clauses.set_statement(*('p.{}'.format(column) for column in columns)).strip()
+    else:
+        assignment = 'SET p = ?'
+    return Statement('UPDATE {} as p {} WHERE {} = ?'.format(table, assignment, index))
+
+
+def update(table, index, columns=()):
+    """Build an `UPDATE` statement for the document whose `index` matches, or retrieve it from the statement cache. By default the whole document is replaced; if `columns` are given, only those paths are set, through `SET p.column = ?, ..`.
+
+    :param table: Name of the table
+    :type table: str
+    :param index: Name of the table index
+    :type index: str
+    :param columns: Paths to set, defaults to `()`, i.e. the whole document
+    :type columns: tuple, optional
+    :return: Statement
+    :rtype: :class:`qldb_orm.static.statements.Statement`
+    """
+    return _update(identifier(table), identifier(index, True),
+                   tuple(identifier(column, True) for column in columns))
+
+
+def create_table(table):
+    """Build a `CREATE TABLE` statement.
+    """
+    return Statement('Create TABLE {}'.format(identifier(table)))
+
+
+def create_index(table, index):
+    """Build a `CREATE INDEX` statement.
+    """
+    return Statement('CREATE INDEX on {} ({})'.format(identifier(table), identifier(index, True)))
+
+
+def cache_info():
+    """Return the hit and miss statistics of the statement cache.
+
+    :return: `functools.lru_cache` statistics of each statement builder
+    :rtype: dict
+    """
+    return {'select': _select.cache_info(), 'insert': _insert.cache_info(), 'update': _update.cache_info()}
+
+
+def cache_clear():
+    """Empty the statement cache.
+    """
+    _select.cache_clear()
+    _insert.cache_clear()
+    _update.cache_clear()
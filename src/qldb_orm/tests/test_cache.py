@@ -0,0 +1,63 @@
+import os
+import sys
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_DIR = os.path.dirname(TEST_DIR)
+sys.path.append(APP_DIR)
+
+from static.cache import DocumentCache, sizeof
+
+
+def test_cache_get_put():
+    cache = DocumentCache(enabled=True)
+    snapshot = {'id': 'a', 'nested': {'list': [1, 2]}}
+    cache.put('ledger', 'table', 'a', snapshot, 'meta', 1)
+    snapshot['nested']['list'].append(3)
+    entry = cache.get('ledger', 'table', 'a')
+    assert entry.snapshot == {'id': 'a', 'nested': {'list': [1, 2]}}
+    assert entry.meta_id == 'meta'
+    assert entry.version == 1
+    assert cache.get('ledger', 'table', 'b') is None
+    assert cache.get('another ledger', 'table', 'a') is None
+
+
+def test_cache_ttl():
+    cache = DocumentCache(enabled=True, ttl=0)
+    cache.put('ledger', 'table', 'a', {'id': 'a'}, 'meta', 1)
+    assert cache.get('ledger', 'table', 'a') is None
+    assert len(cache) == 0
+    assert cache.bytes == 0
+
+
+def test_cache_lru_entries():
+    cache = DocumentCache(enabled=True, max_entries=2)
+    cache.put('ledger', 'table', 'a', {'id': 'a'}, 'meta', 1)
+    cache.put('ledger', 'table', 'b', {'id': 'b'}, 'meta', 1)
+    cache.get('ledger', 'table', 'a')
+    cache.put('ledger', 'table', 'c', {'id': 'c'}, 'meta', 1)
+    assert ('ledger', 'table', 'a') in cache
+    assert ('ledger', 'table', 'b') not in cache
+    assert ('ledger', 'table', 'c') in cache
+
+
+def test_cache_lru_bytes():
+    snapshot = {'id': 'x' * 100}
+    cache = DocumentCache(enabled=True, max_bytes=sizeof(snapshot) * 2)
+    for id in ['a', 'b', 'c']:
+        cache.put('ledger', 'table', id, snapshot, 'meta', 1)
+    assert len(cache) == 2
+    assert cache.bytes <= cache.max_bytes
+
+
+def test_cache_invalidate():
+    cache = DocumentCache(enabled=True)
+    cache.put('ledger', 'table', 'a', {'id': 'a'}, 'meta', 1)
+    cache.put('ledger', 'table', 'b', {'id': 'b'}, 'meta', 1)
+    cache.put('ledger', 'another table', 'a', {'id': 'a'}, 'meta', 1)
+    cache.invalidate('ledger', 'table', 'a')
+    assert len(cache) == 2
+    cache.invalidate(table='table')
+    assert len(cache) == 1
+    cache.invalidate()
+    assert len(cache) == 0
+    assert cache.bytes == 0
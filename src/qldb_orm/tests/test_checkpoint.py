@@ -0,0 +1,66 @@
+import datetime
+import os
+import sys
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_DIR = os.path.dirname(TEST_DIR)
+sys.path.append(APP_DIR)
+
+from static.checkpoint import Checkpoint, txtime
+
+FIRST = datetime.datetime(2022, 1, 1, tzinfo=datetime.timezone.utc)
+SECOND = datetime.datetime(2022, 1, 2, tzinfo=datetime.timezone.utc)
+
+
+def test_txtime():
+    assert txtime(FIRST) == FIRST
+    assert txtime('2022-01-01 00:00:00+00:00') == FIRST
+    assert txtime('2022-01-01T00:00:00Z') == FIRST
+    assert txtime(datetime.datetime(2022, 1, 1)) == FIRST
+
+
+def test_checkpoint_advance():
+    checkpoint = Checkpoint()
+    assert not checkpoint.seen('a', 0, FIRST)
+    checkpoint.advance('a', 0, FIRST)
+    checkpoint.advance('b', 0, FIRST)
+    assert checkpoint.seen('a', 0, FIRST)
+    assert not checkpoint.seen('a', 1, FIRST)
+    checkpoint.advance('a', 1, SECOND)
+    assert checkpoint.time is None
+    checkpoint.complete()
+    assert checkpoint.time == SECOND
+    assert checkpoint.revisions == {('a', 1)}
+    assert checkpoint.seen('b', 0, FIRST)
+
+
+def test_checkpoint_out_of_order():
+    third = datetime.datetime(2022, 1, 3, tzinfo=datetime.timezone.utc)
+    checkpoint = Checkpoint()
+    checkpoint.advance('a', 0, SECOND)
+    assert not checkpoint.seen('b', 0, FIRST)
+    checkpoint.advance('b', 0, FIRST)
+    checkpoint.advance('a', 1, third)
+    checkpoint.complete(end=SECOND)
+    assert checkpoint.time == SECOND
+    assert checkpoint.revisions == {('a', 0), ('a', 1)}
+    checkpoint.complete()
+    assert checkpoint.time == third and checkpoint.revisions == {('a', 1)}
+
+
+def test_checkpoint_save_load(tmp_path):
+    path = str(tmp_path / 'checkpoint.json')
+    Checkpoint(path).save()
+    assert Checkpoint(path).time is None
+    checkpoint = Checkpoint(path, time=FIRST, revisions=[('a', 0)])
+    assert checkpoint.time is None
+    checkpoint.advance('a', 1, SECOND)
+    checkpoint.save()
+    loaded = Checkpoint(path)
+    assert loaded.time is None and loaded.seen('a', 1, SECOND)
+    loaded.complete()
+    loaded.save()
+    loaded = Checkpoint(path)
+    assert loaded.time == SECOND
+    assert loaded.revisions == {('a', 1)}
+    assert os.listdir(str(tmp_path)) == ['checkpoint.json']
@@ -35,3 +35,12 @@ def test_where_in(columns,ns,expected_clause):
 ])
 def test_set_statement(columns, expected_clause):
     assert clauses.set_statement(*columns) == expected_clause
+
+
+@pytest.mark.parametrize('n,expected_clause', [
+    (0, None),
+    (1, '<< ? >>'),
+    (3, '<< ?, ?, ? >>')
+])
+def test_bag(n, expected_clause):
+    assert clauses.bag(n) == expected_clause
@@ -0,0 +1,114 @@
+from json import loads, dumps
+from amazon.ion.json_encoder import IonToJSONEncoder
+from amazon.ion.core import IonType
+from amazon.ion.simple_types import IonPyDict, IonPyList
+from amazon.ion import simpleion
+import pytest
+import os
+import sys
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_DIR = os.path.dirname(TEST_DIR)
+sys.path.append(APP_DIR)
+
+from static import convert
+# NOTE: `static.convert` checks against the installed package's `Strut`
+from qldb_orm.static.objects import Strut, StrutEncoder
+
+
+def legacy_down_convert(ion_obj):
+    return loads(dumps(ion_obj, cls=IonToJSONEncoder))
+
+
+def legacy_sanitize(obj):
+    dict_flag, list_flag = False, False
+
+    if isinstance(obj, (int, float)):
+        return obj
+
+    if isinstance(obj, (dict, IonPyDict)):
+        dict_flag = True
+        obj = loads(dumps(obj, cls=StrutEncoder))
+        obj = dumps(obj, cls=IonToJSONEncoder)
+
+    elif isinstance(obj, list):
+        list_flag = True
+        obj = "~~".join(str(param) for param in obj)
+
+    for char in ["\\", "\'", "\"", "\b", "\n", "\r", "\t", "\0"]:
+        if not dict_flag or not char == "\"":
+            obj = obj.replace(char, "")
+
+    if dict_flag:
+        obj = loads(obj)
+
+    elif list_flag:
+        obj = obj.split("~~")
+
+    return obj
+
+
+ION_RECORDS = [
+    '{ a: "x", b: 1.5e0, c: 2.5, d: 2020-01-01T00:00:00Z, e: sym, f: {{aGVsbG8=}}, g: null.string, '
+    'h: true, i: [1, (2 3)], j: nan, k: {{"clob"}}, l: null, m: -inf, n: false }',
+    '{ blockAddress: { strandId: "JdxjkR9bSYB5jMHWcI464T", sequenceNo: 1 }, hash: {{ aGVsbG8= }}, '
+    'data: { id: "abc", nested: { deep: { value: 12 } }, list: [ { a: 1 }, { b: "two" } ] }, '
+    'metadata: { id: "meta", version: 3, txTime: 2022-02-22T15:04:12.123Z, txId: "tx" } }',
+    '[1, 2.0e0, "three", [4, { five: 5 }]]',
+]
+
+
+@pytest.mark.parametrize('record', ION_RECORDS)
+def test_down_convert_parity(record):
+    ion_obj = simpleion.loads(record)
+    assert convert.to_native(ion_obj) == legacy_down_convert(ion_obj)
+
+
+@pytest.mark.parametrize('obj', [
+    12,
+    4.5,
+    True,
+    "SELECT * FROM table WHERE a = 'b'",
+    "tab\tnew\nline\r\\back\0null\"quote\b",
+    ['a', "b'c", 1, 2.5],
+    {'a': 'b', 'c': 1, 'd': [1, 'two', {'e': "f'g"}], 'h': None, 'i': True, 'j': 2.5},
+    {'a': {'b': {'c': {'d': 'deep'}}}, "ke'y": 'value'},
+    {'a': Strut(b='c', d=Strut(e="f'")), 'g': [Strut(h=1)]},
+    {1: 'int key', 'tuple': (1, 2)},
+    {'back\\slash': 'back\\slash'},
+])
+def test_sanitize_parity(obj):
+    assert convert.sanitize(obj) == legacy_sanitize(obj)
+
+
+def test_sanitize_document_escapes():
+    assert convert.sanitize({'a': 'tab\there "quoted"\n'}) == {'a': 'tabhere "quoted"'}
+
+
+def test_sanitize_ion_document():
+    ion_obj = simpleion.loads('{ a: "b\'c", d: { e: 2022-01-01T00:00:00Z, f: 1.5 } }')
+    assert convert.sanitize(ion_obj) == {'a': 'bc', 'd': {'e': '2022-01-01 00:00:00+00:00', 'f': 1.5}}
+
+
+def test_sanitize_native_types():
+    result = convert.sanitize(simpleion.loads('{ a: "b", c: [ "d" ] }'))
+    assert type(result['a']) is str
+    assert type(result['c']) is list
+    assert type(result['c'][0]) is str
+
+
+def test_convert_deep_document():
+    document = value = {}
+    ion_obj = ion_value = IonPyDict()
+    for _ in range(2000):
+        value['nest'], ion_value['nest'] = [{}], IonPyList.from_value(IonType.LIST, [IonPyDict()])
+        value, ion_value = value['nest'][0], ion_value['nest'][0]
+    value['bottom'] = ion_value['bottom'] = 'tab\there'
+    for result in (convert.to_native(ion_obj), convert.clean_document(Strut.wrap(document)),
+                   convert.sanitize(ion_obj)):
+        depth = 0
+        while 'nest' in result:
+            result, depth = result['nest'][0], depth + 1
+        assert depth == 2000
+        assert type(result) is dict
+    assert result == {'bottom': 'tabhere'}
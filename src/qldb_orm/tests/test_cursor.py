@@ -0,0 +1,63 @@
+import pytest
+import os
+import sys
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_DIR = os.path.dirname(TEST_DIR)
+sys.path.append(APP_DIR)
+
+from static.cursor import ResultStream, StreamingDriver
+
+
+class FakeExecutor():
+    def __init__(self, rows):
+        self.rows = rows
+
+    def execute_statement(self, statement, *params):
+        return iter(self.rows)
+
+
+class FakeDriver():
+    def __init__(self, rows, retries=0, error=None):
+        self.rows = rows
+        self.retries = retries
+        self.error = error
+        self.calls = 0
+
+    def execute_lambda(self, query_lambda):
+        while True:
+            self.calls += 1
+            if self.error is not None:
+                raise self.error
+            result = query_lambda(FakeExecutor(self.rows))
+            if self.calls > self.retries:
+                return result
+
+
+def query(executor):
+    return executor.execute_statement('SELECT * FROM table')
+
+
+def test_stream_results():
+    stream = StreamingDriver(FakeDriver(list(range(10))), buffer_size=2).execute_lambda(query)
+    assert isinstance(stream, ResultStream)
+    assert list(stream) == list(range(10))
+
+
+def test_stream_early_termination():
+    driver = FakeDriver(list(range(1000)))
+    with ResultStream(driver, query, buffer_size=5) as stream:
+        assert [next(stream) for _ in range(3)] == [0, 1, 2]
+    assert stream._produced < 1000
+    assert list(stream) == []
+
+
+def test_stream_retry_skips_delivered_rows():
+    stream = ResultStream(FakeDriver(list(range(10)), retries=1), query, buffer_size=20)
+    assert list(stream) == list(range(10))
+
+
+def test_stream_error():
+    stream = ResultStream(FakeDriver([], error=ValueError('bad')), query)
+    with pytest.raises(ValueError):
+        next(stream)
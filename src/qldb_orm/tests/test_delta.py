@@ -0,0 +1,91 @@
+import copy
+import os
+import sys
+import pytest
+from amazon.ion import simpleion
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_DIR = os.path.dirname(TEST_DIR)
+sys.path.append(APP_DIR)
+
+from static.delta import diff, patch, Change, DeltaChain
+from qldb_orm.static.objects import Strut
+
+OLD = {
+    'team': 'x',
+    'members': ['a', 'b', 'c'],
+    'panopticon': {'nest': {'title': 'owl', 'size': 1}, 'flag': True},
+    'removed': 1
+}
+NEW = {
+    'team': 'y',
+    'members': ['a', 'd'],
+    'panopticon': {'nest': {'title': 'owl', 'size': 2}, 'flag': 1},
+    'added': [1]
+}
+
+
+def test_diff():
+    assert diff(OLD, copy.deepcopy(OLD)) == []
+    assert diff(OLD, NEW) == [
+        Change('remove', ('removed',), 1),
+        Change('add', ('added',), new=[1]),
+        Change('change', ('team',), 'x', 'y'),
+        Change('remove', ('members', 2), 'c'),
+        Change('change', ('members', 1), 'b', 'd'),
+        Change('change', ('panopticon', 'nest', 'size'), 1, 2),
+        Change('change', ('panopticon', 'flag'), True, 1)
+    ]
+    assert diff({'members': ['a']}, {'members': ['a', 'b', 'c']}) == [
+        Change('add', ('members', 1), new='b'),
+        Change('add', ('members', 2), new='c')
+    ]
+    assert diff({'nest': 1}, {'nest': {'a': 1}}) == [Change('change', ('nest',), 1, {'a': 1})]
+
+
+def test_diff_strut_and_ion():
+    old = Strut.wrap({'nest': Strut(title='owl')})
+    assert diff(old, {'nest': {'title': 'bat'}}) == [Change('change', ('nest', 'title'), 'owl', 'bat')]
+    ion = simpleion.loads(simpleion.dumps(NEW))
+    assert diff(NEW, ion) == []
+    assert diff(old, {}) == [Change('remove', ('nest',), {'title': 'owl'})]
+
+
+def test_patch():
+    old = copy.deepcopy(OLD)
+    patched = patch(old, diff(OLD, NEW))
+    assert patched == NEW
+    assert old == OLD
+    assert patched['panopticon']['nest'] is not old['panopticon']['nest']
+    assert patch(old, diff(OLD, {'team': 'x', 'members': OLD['members']}))['members'] is old['members']
+    assert patch({'members': ['a']}, diff({'members': ['a']}, {'members': ['a', 'b', 'c']})) == {
+        'members': ['a', 'b', 'c']}
+    assert patch(old, [Change('change', (), old, NEW)]) == NEW
+
+
+def test_delta_chain():
+    revisions = [{'team': 'x', 'number': number, 'nest': {'size': number // 2}} for number in range(7)]
+    chain = DeltaChain(interval=3, cache_size=2)
+    for version, revision in enumerate(revisions):
+        chain.put(version, revision)
+    assert len(chain) == 7
+    assert sorted(chain._snapshots) == [0, 3, 6]
+    assert chain._deltas[1] == [Change('change', ('number',), 0, 1)]
+    chain._cache.clear()
+    assert [chain.get(version) for version in range(7)] == revisions
+    assert chain.get(5) == revisions[5]
+    with pytest.raises(KeyError):
+        chain.get(7)
+    chain.clear()
+    assert 0 not in chain
+
+
+def test_delta_chain_out_of_order():
+    chain = DeltaChain(interval=10, cache_size=0)
+    chain.put(5, {'number': 5})
+    chain.put(6, {'number': 6})
+    chain.put(4, {'number': 4})
+    assert sorted(chain._snapshots) == [4]
+    assert [chain.get(version) for version in (4, 5, 6)] == [{'number': 4}, {'number': 5}, {'number': 6}]
+    with pytest.raises(KeyError):
+        chain.get(3)
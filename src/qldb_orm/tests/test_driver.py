@@ -1,3 +1,4 @@
+from unittest.mock import patch
 import boto3
 from botocore.stub import Stubber
 import os
@@ -8,3 +9,147 @@ APP_DIR = os.path.dirname(TEST_DIR)
 sys.path.append(APP_DIR)
 
 from static.driver import Driver
+from static.pool import DriverPool
+from qldb_orm.static.objects import Strut
+
+
+@patch('static.pool.QldbDriver')
+def test_pool_reuses_driver(mock_qldb_driver):
+    pool = DriverPool()
+    first, second = pool.get('ledger'), pool.get('ledger')
+    assert first is second
+    assert mock_qldb_driver.call_count == 1
+    assert 'ledger' in pool
+
+
+@patch('static.pool.QldbDriver')
+def test_pool_keys_by_config(mock_qldb_driver):
+    pool = DriverPool()
+    pool.get('ledger')
+    pool.get('ledger', region_name='us-east-1')
+    pool.get('another ledger')
+    assert mock_qldb_driver.call_count == 3
+    assert len(pool) == 3
+
+
+@patch('static.pool.QldbDriver')
+def test_pool_max_concurrent_transactions(mock_qldb_driver):
+    DriverPool(max_concurrent_transactions=5).get('ledger')
+    mock_qldb_driver.assert_called_once_with(
+        ledger_name='ledger', max_concurrent_transactions=5)
+
+
+@patch('static.pool.QldbDriver')
+def test_pool_close(mock_qldb_driver):
+    pool = DriverPool()
+    pool.get('ledger')
+    pool.get('another ledger')
+    pool.close('ledger')
+    assert 'ledger' not in pool
+    assert 'another ledger' in pool
+    pool.close()
+    assert len(pool) == 0
+    assert mock_qldb_driver.return_value.close.call_count == 2
+    pool.get('ledger')
+    assert mock_qldb_driver.call_count == 3
+
+
+@patch('static.pool.QldbDriver')
+def test_pool_disabled(mock_qldb_driver):
+    pool = DriverPool(enabled=False)
+    pool.get('ledger')
+    pool.get('ledger')
+    assert mock_qldb_driver.call_count == 2
+    assert len(pool) == 0
+
+
+class FakeExecutor():
+    def __init__(self, existing):
+        self.existing = existing
+        self.statements = []
+        self.params = []
+
+    def execute_statement(self, statement, *params):
+        self.statements.append(statement)
+        self.params.append(params)
+        if statement.startswith('SELECT'):
+            return iter(self.existing)
+        if statement.startswith('INSERT'):
+            return iter([{'documentId': 'new-{}'.format(param['id'])} for param in params])
+        return iter([{'documentId': 'test'}])
+
+
+class FakeDriver():
+    def __init__(self, existing):
+        self.executor = FakeExecutor(existing)
+        self.transactions = 0
+
+    def execute_lambda(self, query_lambda):
+        self.transactions += 1
+        return query_lambda(self.executor)
+
+
+def test_upsert_insert():
+    driver = FakeDriver([])
+    result = Driver.upsert(driver, {'id': 'a', 'b': 'c'}, 'table', 'id')
+    assert next(result) == {'documentId': 'new-a'}
+    assert driver.transactions == 1
+    assert [statement.split(' ')[0] for statement in driver.executor.statements] == ['SELECT', 'INSERT']
+
+
+def test_upsert_update():
+    driver = FakeDriver([{'id': 'a'}])
+    Driver.upsert(driver, {'id': 'a', 'b': 'c'}, 'table', 'id')
+    assert driver.transactions == 1
+    assert [statement.split(' ')[0] for statement in driver.executor.statements] == ['SELECT', 'UPDATE']
+
+
+def test_upsert_columns():
+    driver = FakeDriver([{'id': 'a'}])
+    Driver.upsert(driver, {'id': 'a', 'b': 'c', 'd': {'e': 'f'}}, 'table', 'id', columns=('b', 'd.e'))
+    assert driver.executor.statements[1] == 'UPDATE table as p SET p.b = ? , p.d.e = ? WHERE id = ?'
+    assert driver.executor.params[1] == ('c', 'f', 'a')
+
+
+def test_upsert_columns_insert():
+    driver = FakeDriver([])
+    Driver.upsert(driver, {'id': 'a', 'b': 'c'}, 'table', 'id', columns=('b',))
+    assert driver.executor.statements[1] == 'INSERT INTO table ?'
+    assert driver.executor.params[1] == ({'id': 'a', 'b': 'c'},)
+
+
+def test_update_columns():
+    driver = FakeDriver([])
+    Driver.update(driver, {'id': 'a', 'b': Strut(c=1)}, 'table', 'id', columns=('b.c',))
+    assert driver.executor.statements == ['UPDATE table as p SET p.b.c = ? WHERE id = ?']
+    assert driver.executor.params == [(1, 'a')]
+
+
+def test_bulk_upsert():
+    driver = FakeDriver([{'id': 'b'}])
+    documents = [{'id': 'a'}, {'id': 'b'}, {'id': 'c'}]
+    ids = Driver.bulk_upsert(driver, documents, 'table', 'id')
+    assert ids == ['new-a', 'test', 'new-c']
+    assert driver.transactions == 1
+    assert driver.executor.statements == [
+        'SELECT id FROM table WHERE id IN (?,?,?,?)',
+        'INSERT INTO table << ?, ? >>',
+        'UPDATE table as p SET p = ? WHERE id = ?'
+    ]
+
+
+def test_bulk_upsert_duplicates():
+    driver = FakeDriver([])
+    ids = Driver.bulk_upsert(driver, [{'id': 'a', 'x': 1}, {'id': 'b'}, {'id': 'a', 'x': 2}], 'table', 'id')
+    assert ids == ['new-a', 'new-b', 'new-a']
+    assert driver.executor.statements == [
+        'SELECT id FROM table WHERE id IN (?,?)',
+        'INSERT INTO table << ?, ? >>'
+    ]
+    assert driver.executor.params[1] == ({'id': 'b'}, {'id': 'a', 'x': 2})
+
+def test_bulk_upsert_hint():
+    driver = FakeDriver([])
+    ids = Driver.bulk_upsert(driver, [{'id': 'a'}, {'id': 'b'}], 'table', 'id', exists=False)
+    assert ids == ['new-a', 'new-b']
+    assert driver.executor.statements == ['INSERT INTO table << ?, ? >>']
@@ -0,0 +1,137 @@
+import asyncio
+import threading
+import time
+import os
+import sys
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_DIR = os.path.dirname(TEST_DIR)
+sys.path.append(APP_DIR)
+
+from static.executor import LedgerExecutor, AsyncResults
+
+
+def test_executor_run():
+    executor = LedgerExecutor(max_workers=2)
+
+    async def main():
+        return await executor.run('ledger', lambda a, b=0: threading.current_thread().name + str(a + b), 1, b=2)
+
+    result = asyncio.run(main())
+    executor.shutdown()
+    assert result.startswith('qldb-orm')
+    assert result.endswith('3')
+
+
+def test_executor_ledger_concurrency():
+    executor = LedgerExecutor(max_workers=8, ledger_concurrency=2)
+    lock = threading.Lock()
+    state = {'running': 0, 'peak': 0}
+
+    def work():
+        with lock:
+            state['running'] += 1
+            state['peak'] = max(state['peak'], state['running'])
+        time.sleep(0.02)
+        with lock:
+            state['running'] -= 1
+
+    async def main():
+        await asyncio.gather(*(executor.run('ledger', work) for _ in range(6)))
+
+    asyncio.run(main())
+    executor.shutdown()
+    assert state['peak'] == 2
+
+
+def test_async_results():
+    executor = LedgerExecutor(max_workers=2)
+
+    async def main():
+        return [item async for item in AsyncResults('ledger', iter(range(25)), chunk_size=10, executor=executor)]
+
+    assert asyncio.run(main()) == list(range(25))
+    executor.shutdown()
+
+
+def test_async_results_close():
+    executor = LedgerExecutor(max_workers=2)
+    state = {'closed': False}
+
+    def generator():
+        try:
+            for i in range(100):
+                yield i
+        finally:
+            state['closed'] = True
+
+    async def main():
+        async with AsyncResults('ledger', generator(), chunk_size=5, executor=executor) as results:
+            async for item in results:
+                if item == 3:
+                    break
+
+    asyncio.run(main())
+    executor.shutdown()
+    assert state['closed']
+
+
+def test_async_results_cancel():
+    executor = LedgerExecutor(max_workers=2)
+    state = {'closed': False}
+
+    def generator():
+        try:
+            while True:
+                time.sleep(0.01)
+                yield 1
+        finally:
+            state['closed'] = True
+
+    async def consume(results):
+        async for _ in results:
+            pass
+
+    async def main():
+        task = asyncio.ensure_future(consume(AsyncResults('ledger', generator(), chunk_size=2, executor=executor)))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    asyncio.run(main())
+    executor.shutdown()
+    assert state['closed']
+
+
+def test_executor_map():
+    executor = LedgerExecutor(max_workers=8, ledger_concurrency=3)
+    lock = threading.Lock()
+    state = {'running': 0, 'peak': 0}
+
+    def work(item):
+        with lock:
+            state['running'] += 1
+            state['peak'] = max(state['peak'], state['running'])
+        time.sleep(0.01)
+        with lock:
+            state['running'] -= 1
+        return item * 2
+
+    assert executor.map(work, range(10), parallelism=5) == [item * 2 for item in range(10)]
+    executor.shutdown()
+    assert state['peak'] == 3
+
+
+def test_executor_map_nested():
+    executor = LedgerExecutor(max_workers=1)
+
+    def outer(item):
+        return sum(executor.map(lambda inner: inner + item, range(3)))
+
+    assert executor.map(outer, range(2), parallelism=1) == [3, 6]
+    future = executor.pool().submit(outer, 1)
+    assert future.result(timeout=1) == 6
+    executor.shutdown()
@@ -0,0 +1,117 @@
+import datetime
+import gzip
+import json
+import os
+import sys
+import pytest
+from amazon.ion import simpleion
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_DIR = os.path.dirname(TEST_DIR)
+sys.path.append(APP_DIR)
+
+from static.export import encode, Exporter, ExportCheckpoint
+
+RECORDS = [{'id': 'n{:02}'.format(n), 'number': n, 'nest': {'rank': n % 3}} for n in range(10)]
+
+
+def revision(meta_id, version, day):
+    return {'data': {'id': meta_id}, 'metadata': {'id': meta_id, 'version': version,
+                                                  'txTime': datetime.datetime(2022, 1, day, tzinfo=datetime.timezone.utc)}}
+
+
+def lines(path):
+    with open(path, 'rb') as infile:
+        data = infile.read()
+    if path.endswith('.gz'):
+        data = gzip.decompress(data)
+    return [json.loads(line) for line in data.decode('utf-8').splitlines()]
+
+
+def test_encode():
+    assert encode(RECORDS[:2]) == b'{"id":"n00","number":0,"nest":{"rank":0}}\n{"id":"n01","number":1,"nest":{"rank":1}}\n'
+    ion = encode(RECORDS[:2], 'ion') + encode(RECORDS[2:3], 'ion')
+    assert simpleion.loads(ion, single_value=False) == RECORDS[:3]
+    assert gzip.decompress(encode(RECORDS[:2], compress=True) + encode(RECORDS[2:3], compress=True)) == \
+        encode(RECORDS[:3])
+    with pytest.raises(ValueError):
+        Exporter('export.csv', format='csv')
+
+
+@pytest.mark.parametrize('name,writers', [('export.jsonl', 1), ('export.jsonl.gz', 3)])
+def test_exporter(tmp_path, name, writers):
+    path = str(tmp_path / name)
+    reports = []
+    progress = Exporter(path, writers=writers, chunk_size=3, progress=reports.append, interval=0).write(iter(RECORDS))
+    assert lines(path) == RECORDS
+    assert progress.rows == 10 and progress.bytes == os.path.getsize(path)
+    assert len(reports) == 5 and reports[-1] is progress
+    checkpoint = ExportCheckpoint(path + '.checkpoint')
+    assert checkpoint.rows == 10 and checkpoint.offset == os.path.getsize(path)
+
+
+def test_exporter_resume(tmp_path):
+    path = str(tmp_path / 'export.jsonl.gz')
+
+    def failing():
+        yield from RECORDS[:7]
+        raise RuntimeError('connection lost')
+
+    with pytest.raises(RuntimeError):
+        Exporter(path, chunk_size=3).write(failing())
+    assert lines(path) == RECORDS[:6]
+    with open(path, 'ab') as outfile:
+        outfile.write(b'partial chunk')
+    progress = Exporter(path, chunk_size=3, resume=True).write(iter(RECORDS))
+    assert progress.rows == 4
+    assert lines(path) == RECORDS
+    Exporter(path, chunk_size=3).write(iter(RECORDS[:2]))
+    assert lines(path) == RECORDS[:2]
+    os.remove(path)
+    with pytest.raises(ValueError):
+        Exporter(path, resume=True).write(iter(RECORDS))
+
+
+def test_exporter_history(tmp_path):
+    path = str(tmp_path / 'history.ion')
+    records = [revision('a', 0, 1), revision('b', 0, 2), revision('a', 1, 2)]
+    Exporter(path, format='ion', chunk_size=2).write(iter(records), history=True)
+    checkpoint = ExportCheckpoint(path + '.checkpoint')
+    assert checkpoint.time == datetime.datetime(2022, 1, 2, tzinfo=datetime.timezone.utc)
+    assert checkpoint.revisions == {('b', 0), ('a', 1)}
+    progress = Exporter(path, format='ion', resume=True).write(iter(records[1:] + [revision('b', 1, 3)]),
+                                                                history=True)
+    assert progress.rows == 1
+    with open(path, 'rb') as infile:
+        exported = simpleion.loads(infile.read(), single_value=False)
+    assert [(record['metadata']['id'], record['metadata']['version']) for record in exported] == [
+        ('a', 0), ('b', 0), ('a', 1), ('b', 1)]
+
+
+def test_exporter_history_out_of_order(tmp_path):
+    path = str(tmp_path / 'history.jsonl')
+    records = [revision('a', 0, 5), revision('b', 0, 3), revision('c', 0, 7), revision('d', 0, 6)]
+
+    def failing():
+        yield from records[:3]
+        raise RuntimeError('connection lost')
+
+    exporter = Exporter(path, chunk_size=1)
+    exporter.window(datetime.datetime(2022, 1, 8, tzinfo=datetime.timezone.utc))
+    with pytest.raises(RuntimeError):
+        exporter.write(failing(), history=True)
+    checkpoint = ExportCheckpoint(path + '.checkpoint')
+    assert checkpoint.time is None and checkpoint.run == 3
+    assert checkpoint.end == datetime.datetime(2022, 1, 8, tzinfo=datetime.timezone.utc)
+    exporter = Exporter(path, chunk_size=1, resume=True)
+    assert exporter.window() == (None, checkpoint.end)
+    progress = exporter.write(iter(records), history=True)
+    assert progress.rows == 1
+    assert [record['metadata']['id'] for record in lines(path)] == ['a', 'b', 'c', 'd']
+    checkpoint = ExportCheckpoint(path + '.checkpoint')
+    assert checkpoint.time == datetime.datetime(2022, 1, 7, tzinfo=datetime.timezone.utc)
+    assert checkpoint.run == 0 and checkpoint.end is None
+    progress = Exporter(path, resume=True).write(iter(records + [revision('b', 1, 7), revision('e', 0, 8)]),
+                                                 history=True)
+    assert progress.rows == 2
+    assert [record['metadata']['id'] for record in lines(path)] == ['a', 'b', 'c', 'd', 'b', 'e']
@@ -0,0 +1,72 @@
+import pytest
+import os
+import sys
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_DIR = os.path.dirname(TEST_DIR)
+sys.path.append(APP_DIR)
+
+from static.filters import Where, lookup
+from static import statements
+
+
+@pytest.mark.parametrize('key,value,expected', [
+    ('number', 1, ('number', '=', 1)),
+    ('number__gt', 1, ('number', '>', 1)),
+    ('number__ne', 1, ('number', '<>', 1)),
+    ('panopticon__nest__title__like', 'a%', ('panopticon.nest.title', 'LIKE', 'a%')),
+    ('panopticon__nest', 'a', ('panopticon.nest', '=', 'a')),
+    ('team__in', ('a', 'b'), ('team', 'IN', ['a', 'b'])),
+    ('number__between', (1, 5), ('number', 'BETWEEN', [1, 5]))
+])
+def test_filters_lookup(key, value, expected):
+    assert lookup(key, value) == expected
+
+
+@pytest.mark.parametrize('key,value', [
+    ('team__in', []),
+    ('number__between', (1, 2, 3)),
+    ('number; DROP', 1)
+])
+def test_filters_invalid_lookup(key, value):
+    with pytest.raises(ValueError):
+        lookup(key, value)
+
+
+def test_filters_compile():
+    condition = Where(number__gt=50, title__like='wise%') | ~Where(team__in=['a', 'b', 'c'])
+    shape, params = condition.compile()
+    assert params == [50, 'wise%', 'a', 'b', 'c', 'c']
+    assert statements.select('people', where=shape) == \
+        'SELECT * FROM people BY meta_id WHERE (number > ? AND title LIKE ?) OR (NOT (team IN (?,?,?,?)))'
+
+
+def test_filters_combine():
+    assert not Where()
+    condition = Where() & Where(a=1)
+    assert condition.compile() == (('AND', False, (('a', '=', 1),)), [1])
+    shape, params = (Where(a=1) & Where(b__between=(1, 2))).compile()
+    assert statements.select('people', equals=('id',), where=shape, by=None) == \
+        'SELECT * FROM people WHERE id = ? AND ((a = ?) AND (b BETWEEN ? AND ?))'
+    assert params == [1, 1, 2]
+
+
+def test_filters_shape_cached():
+    statements.cache_clear()
+    first = statements.select('people', where=Where(team__in=['a', 'b', 'c']).compile()[0])
+    second = statements.select('people', where=Where(team__in=['d', 'e', 'f', 'g']).compile()[0])
+    assert first is second
+
+
+@pytest.mark.parametrize('condition,expected', [
+    (Where(id='a', number__gt=1), True),
+    (Where(id__in=['a', 'b']), True),
+    (Where(number=1), False),
+    (Where(id__gt='a'), False),
+    (~Where(id='a'), False),
+    (Where(id='a') | Where(team='b'), True),
+    (Where(id='a') | Where(number=1), False),
+    (Where(Where(id='a') | Where(team='b'), number=1), True)
+])
+def test_filters_indexed(condition, expected):
+    assert condition.indexed({'id', 'team'}) == expected
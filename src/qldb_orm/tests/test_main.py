@@ -2,12 +2,13 @@ import pytest
 import os
 import sys
 import argparse
+from unittest.mock import patch
 
 TEST_DIR = os.path.dirname(os.path.abspath(__file__))
 APP_DIR = os.path.dirname(TEST_DIR)
 sys.path.append(APP_DIR)
 
-from main import KeyValue
+from main import KeyValue, do_program
 
 @pytest.mark.parametrize('args,expected_keys,expected_props', [
     ('--test a=b c=d', ['a', 'c'], ['b', 'd']),
@@ -20,3 +21,13 @@ def test_keyvalue_parsing(args, expected_keys, expected_props):
     parsed_args = parser.parse_args(args.split(' '))
     assert all(parsed_args.test.get(key) == value for key,
                value in zip(expected_keys, expected_props))
+
+
+@patch('main.Query')
+def test_export(mock_query):
+    do_program(['--table', 'teams', '--export', 'teams.ion.gz', '--format', 'ion', '--writers', '2', '--resume'])
+    args, kwargs = mock_query.return_value.export.call_args
+    assert args == ('teams.ion.gz',)
+    assert kwargs['format'] == 'ion' and kwargs['writers'] == 2 and kwargs['resume'] and kwargs['compress'] is None
+    do_program(['--table', 'teams', '--export', 'history.jsonl', '--history', '--gzip'])
+    assert mock_query.return_value.export_history.call_args[1]['compress'] is True
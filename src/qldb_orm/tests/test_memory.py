@@ -0,0 +1,179 @@
+from unittest.mock import patch
+import pytest
+import os
+import sys
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_DIR = os.path.dirname(TEST_DIR)
+sys.path.append(APP_DIR)
+
+from qldb import Document, Query, schema
+from qldb_orm.static.memory import MemoryDriver, StatementError, tokenize, like
+from qldb_orm.static.driver import Driver
+
+
+@pytest.fixture
+def driver():
+    MemoryDriver.reset()
+    schema.invalidate()
+    driver = Driver.driver('ledger', pooled=False, backend='memory')
+    with patch('qldb.Driver.driver', lambda ledger, **config: driver):
+        yield driver
+    MemoryDriver.reset()
+    schema.invalidate()
+
+
+def execute(driver, statement, *params):
+    return list(driver.execute_lambda(lambda executor: Driver.execute(executor, statement, *params)))
+
+
+def test_memory_backend_registry():
+    assert Driver.backend('memory') is MemoryDriver
+    with pytest.raises(ValueError):
+        Driver.backend('nonexistent')
+
+
+def test_memory_tokenize():
+    assert tokenize("SELECT * FROM t BY meta_id WHERE a.b IN (?, 1)") == [
+        ('keyword', 'SELECT'), ('op', '*'), ('keyword', 'FROM'), ('name', 't'), ('keyword', 'BY'),
+        ('name', 'meta_id'), ('keyword', 'WHERE'), ('name', 'a.b'), ('keyword', 'IN'), ('op', '('),
+        ('param', '?'), ('op', ','), ('number', '1'), ('op', ')')]
+
+
+@pytest.mark.parametrize('value,pattern,expected', [
+    ('hello', 'h%', True),
+    ('hello', 'h_llo', True),
+    ('hello', 'h.llo', False),
+    ('hello', '%z%', False),
+    (5, '%', False)
+])
+def test_memory_like(value, pattern, expected):
+    assert like(value, pattern) == expected
+
+
+def test_memory_insert_update_select(driver):
+    execute(driver, 'CREATE TABLE people')
+    ids = execute(driver, 'INSERT INTO people << ?, ? >>',
+                  {'id': 'a', 'number': 1}, {'id': 'b', 'number': 2, 'nested': {'x': 'y'}})
+    assert len(ids) == 2
+    execute(driver, 'UPDATE people as p SET p = ? WHERE id = ?',
+            {'id': 'a', 'number': 3}, 'a')
+    execute(driver, 'UPDATE people SET nested.x = ?, number = ? WHERE id = ?', 'z', 4, 'b')
+
+    rows = execute(driver, 'SELECT * FROM people BY meta_id WHERE id IN (?, ?)', 'a', 'b')
+    assert sorted(row['number'] for row in rows) == [3, 4]
+    assert {row['meta_id'] for row in rows} == {row['documentId'] for row in ids}
+    assert execute(driver, 'SELECT * FROM people WHERE number > ? AND NOT nested.x = ?', 2, 'z') == [
+        {'id': 'a', 'number': 3}]
+    assert execute(driver, 'SELECT VALUE id FROM people WHERE id = ? OR number <= ?', 'b', 0) == ['b']
+    assert execute(driver, 'SELECT id, nested.x AS x FROM people WHERE nested IS NOT MISSING') == [
+        {'id': 'b', 'x': 'z'}]
+
+
+def test_memory_history_and_committed(driver):
+    execute(driver, 'CREATE TABLE people')
+    meta_id = execute(driver, 'INSERT INTO people ?', {'id': 'a', 'number': 1})[0]['documentId']
+    execute(driver, 'UPDATE people as p SET p = ? WHERE id = ?', {'id': 'a', 'number': 2}, 'a')
+
+    history = execute(driver, 'SELECT * FROM history(people) WHERE metadata.id = ?', meta_id)
+    assert [(row['data']['number'], row['metadata']['version']) for row in history] == [(1, 0), (2, 1)]
+    assert history[0]['blockAddress']['sequenceNo'] < history[1]['blockAddress']['sequenceNo']
+
+    committed = execute(driver, 'SELECT metadata.id AS meta_id, metadata.version AS version FROM _ql_committed_people WHERE data.id = ?', 'a')
+    assert committed == [{'meta_id': meta_id, 'version': 1}]
+
+
+def test_memory_delete_history(driver):
+    execute(driver, 'CREATE TABLE people')
+    meta_id = execute(driver, 'INSERT INTO people ?', {'id': 'a', 'number': 1})[0]['documentId']
+    execute(driver, 'UPDATE people as p SET p = ? WHERE id = ?', {'id': 'a', 'number': 2}, 'a')
+    assert execute(driver, 'DELETE FROM people WHERE id = ?', 'a') == [{'documentId': meta_id}]
+    assert execute(driver, 'SELECT * FROM people') == []
+
+    history = execute(driver, 'SELECT * FROM history(people) WHERE metadata.id = ?', meta_id)
+    assert [row['metadata']['version'] for row in history] == [0, 1, 2]
+    assert 'data' not in history[-1]
+    assert history[-1]['metadata']['txTime'] >= history[-2]['metadata']['txTime']
+
+    def transaction(executor):
+        executor.execute_statement('INSERT INTO people ?', {'id': 'b'})
+        executor.execute_statement('DELETE FROM people WHERE id = ?', 'b')
+        raise RuntimeError('abort')
+
+    with pytest.raises(RuntimeError):
+        driver.execute_lambda(transaction)
+    assert len(execute(driver, 'SELECT * FROM history(people)')) == 3
+
+def test_memory_reset_pooled_driver():
+    from qldb_orm.static.pool import pool
+    MemoryDriver.reset()
+    with patch('qldb_orm.settings.BACKEND', 'memory'):
+        Document('people', id='a', snapshot={'id': 'a', 'number': 1}, ledger='reset').save()
+        assert len(Query('people', 'reset').get_all()) == 1
+        driver = Driver.driver('reset')
+        MemoryDriver.reset('reset')
+        assert Driver.driver('reset') is driver
+        assert 'people' not in driver.ledger.tables
+        with pytest.raises(StatementError):
+            Query('people', 'reset').get_all()
+        document = Document('people', id='b', snapshot={'id': 'b'}, ledger='reset')
+        assert Query('people', 'reset').get_all() == []
+        document.save()
+        assert [document.id for document in Query('people', 'reset').get_all()] == ['b']
+        assert driver.ledger is MemoryDriver.ledgers['reset']
+    pool.close('reset')
+    MemoryDriver.reset()
+
+def test_memory_rollback(driver):
+    execute(driver, 'CREATE TABLE people')
+    execute(driver, 'INSERT INTO people ?', {'id': 'a', 'number': 1})
+
+    def transaction(executor):
+        executor.execute_statement('UPDATE people as p SET p = ? WHERE id = ?', {'id': 'a', 'number': 2}, 'a')
+        executor.execute_statement('INSERT INTO people ?', {'id': 'b'})
+        raise RuntimeError('abort')
+
+    with pytest.raises(RuntimeError):
+        driver.execute_lambda(transaction)
+    assert execute(driver, 'SELECT * FROM people') == [{'id': 'a', 'number': 1}]
+    assert len(execute(driver, 'SELECT * FROM history(people)')) == 1
+
+
+def test_memory_statement_errors(driver):
+    with pytest.raises(StatementError):
+        execute(driver, 'SELECT * FROM missing')
+    execute(driver, 'CREATE TABLE people')
+    with pytest.raises(StatementError):
+        execute(driver, 'SELECT * FROM people WHERE id = ?')
+    with pytest.raises(StatementError):
+        execute(driver, 'DROP TABLE people')
+
+
+def test_memory_isolated_results(driver):
+    execute(driver, 'CREATE TABLE people')
+    document = {'id': 'a', 'list': [1]}
+    execute(driver, 'INSERT INTO people ?', document)
+    document['list'].append(2)
+    execute(driver, 'SELECT * FROM people')[0]['list'].append(3)
+    assert execute(driver, 'SELECT * FROM people')[0]['list'] == [1]
+
+
+def test_memory_document_round_trip(driver):
+    document = Document('people', id='a', snapshot={'name': 'bob', 'nested': {'number': 1}}, ledger='ledger')
+    document.save()
+    document.name = 'alice'
+    document.save()
+
+    loaded = Document('people', id='a', ledger='ledger', stranded=True)
+    assert loaded.name == 'alice'
+    assert loaded.nested.number == 1
+    assert loaded.meta_id == document.meta_id
+    assert [strand.name for strand in loaded.strands] == ['bob', 'alice']
+
+    query = Query('people', ledger='ledger')
+    query.bulk_save([Document('people', id=str(i), snapshot={'name': str(i)}, ledger='ledger', fixtures=False)
+                     for i in range(5)])
+    assert len(query.get_all()) == 6
+    assert [doc.name for doc in query.find_by(name='alice')] == ['alice']
+    assert sorted(doc.id for doc in query.find_in(id=['1', '2', 'x'])) == ['1', '2']
+    assert len(list(query.iter_all())) == 6
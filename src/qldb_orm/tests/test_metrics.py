@@ -0,0 +1,174 @@
+import pytest
+import os
+import sys
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_DIR = os.path.dirname(TEST_DIR)
+sys.path.append(APP_DIR)
+
+from static.driver import Driver
+from qldb_orm.static.metrics import instrumentation, fingerprint, Histogram, StatementMetrics, \
+    StatsDExporter, PrometheusExporter, InstrumentedCursor
+
+
+class FakeCursor(list):
+    def get_consumed_ios(self):
+        return {'ReadIOs': 7}
+
+    def get_timing_information(self):
+        return {'ProcessingTimeMilliseconds': 3}
+
+
+class FakeExecutor():
+    transaction_id = 'transaction'
+
+    def __init__(self, rows=None, error=None):
+        self.rows = rows or []
+        self.error = error
+
+    def execute_statement(self, statement, *params):
+        if self.error is not None:
+            raise self.error
+        return FakeCursor(self.rows)
+
+
+class RetryingDriver():
+    """Fails the first commit of every transaction, like an OCC conflict retried by pyqldb. Returned cursors are buffered before the commit, as pyqldb does.
+    """
+
+    def __init__(self, executor):
+        self.executor = executor
+
+    def execute_lambda(self, query_lambda):
+        for attempt in range(2):
+            result = query_lambda(self.executor)
+            if isinstance(result, InstrumentedCursor):
+                result = list(result)
+            if attempt > 0:
+                return result
+
+
+@pytest.fixture
+def events():
+    recorded = {'before': [], 'after': []}
+    instrumentation.register(before=recorded['before'].append, after=recorded['after'].append)
+    yield recorded
+    instrumentation.clear()
+
+
+@pytest.mark.parametrize('statement,expected', [
+    ('SELECT * FROM t WHERE id IN (?, ?,?)', 'SELECT * FROM t WHERE id IN (?+)'),
+    ('INSERT INTO t << ?, ?, ? >>', 'INSERT INTO t << ?+ >>'),
+    ("SELECT *   FROM t\n WHERE a = 'x' AND b = 10", 'SELECT * FROM t WHERE a = ? AND b = ?'),
+    ('SELECT * FROM history(t1) WHERE metadata.id = ?', 'SELECT * FROM history(t1) WHERE metadata.id = ?')
+])
+def test_metrics_fingerprint(statement, expected):
+    assert fingerprint(statement) == expected
+
+
+def test_metrics_inactive_returns_raw_cursor():
+    assert not instrumentation.active
+    cursor = Driver.execute(FakeExecutor([1]), 'SELECT * FROM t')
+    assert type(cursor) is FakeCursor
+
+
+def test_metrics_statement_event(events):
+    cursor = Driver.execute(FakeExecutor([{'a': 1}, {'a': 2}]), 'SELECT * FROM t WHERE a IN (?, ?)', 1, 2)
+    assert len(events['before']) == 1 and events['after'] == []
+    assert list(cursor) == [{'a': 1}, {'a': 2}]
+
+    event = events['after'][0]
+    assert event is events['before'][0]
+    assert event.fingerprint == 'SELECT * FROM t WHERE a IN (?+)'
+    assert event.params == 2
+    assert event.rows == 2
+    assert event.read_ios == 7
+    assert event.processing_time == 3
+    assert event.transaction_id == 'transaction'
+    assert event.retries == 0
+    assert event.wall_time >= 0
+
+
+def test_metrics_statement_error(events):
+    with pytest.raises(ValueError):
+        Driver.execute(FakeExecutor(error=ValueError('bad')), 'SELECT * FROM t')
+    assert isinstance(events['after'][0].error, ValueError)
+
+
+def test_metrics_retries_and_abandoned_cursors(events):
+    def transaction(executor):
+        next(Driver.execute(executor, 'SELECT id FROM t WHERE id = ?', 'a'), None)
+        return Driver.execute(executor, 'SELECT * FROM t')
+
+    rows = Driver.transaction(RetryingDriver(FakeExecutor([1, 2, 3])), transaction)
+    assert rows == [1, 2, 3]
+    assert [(event.fingerprint, event.retries, event.rows) for event in events['after']] == [
+        ('SELECT id FROM t WHERE id = ?', 0, 1),
+        ('SELECT * FROM t', 0, 3),
+        ('SELECT id FROM t WHERE id = ?', 1, 1),
+        ('SELECT * FROM t', 1, 3)
+    ]
+
+
+def test_metrics_failing_hook_is_ignored():
+    def hook(event):
+        raise RuntimeError('broken hook')
+    instrumentation.register(after=hook)
+    try:
+        assert list(Driver.execute(FakeExecutor([1]), 'SELECT * FROM t')) == [1]
+    finally:
+        instrumentation.unregister(hook)
+    assert not instrumentation.active
+
+
+def test_metrics_histogram():
+    histogram = Histogram(buckets=(1.0, 2.0, 4.0))
+    for value in [0.5, 1.5, 1.5, 3.0, 10.0]:
+        histogram.observe(value)
+    assert histogram.counts == [1, 2, 1, 1]
+    assert histogram.count == 5
+    assert histogram.sum == 16.5
+    assert histogram.quantile(0.5) == pytest.approx(1.75)
+    assert histogram.quantile(1.0) == 4.0
+    assert Histogram().quantile(0.5) is None
+
+
+def test_metrics_aggregation_and_prometheus(tmp_path):
+    metrics = StatementMetrics()
+    instrumentation.register(after=metrics)
+    try:
+        for _ in range(3):
+            list(Driver.execute(FakeExecutor([1, 2]), 'SELECT * FROM t WHERE id = ?', 'a'))
+        list(Driver.execute(FakeExecutor([1]), 'SELECT * FROM u'))
+    finally:
+        instrumentation.clear()
+
+    (top, stats), _ = metrics.top(key='read_ios')
+    assert top == 'SELECT * FROM t WHERE id = ?'
+    assert stats.duration.count == 3
+    assert stats.rows == 6
+    assert stats.read_ios == 21
+
+    path = tmp_path / 'qldb.prom'
+    PrometheusExporter(metrics, str(path), interval=0).export()
+    text = path.read_text()
+    assert '# TYPE qldb_orm_statement_duration_seconds histogram' in text
+    assert 'qldb_orm_statement_duration_seconds_count{fingerprint="SELECT * FROM t WHERE id = ?"} 3' in text
+    assert 'qldb_orm_statement_duration_seconds_bucket{fingerprint="SELECT * FROM u",le="+Inf"} 1' in text
+    assert 'qldb_orm_statement_read_ios_total{fingerprint="SELECT * FROM t WHERE id = ?"} 21' in text
+
+
+def test_metrics_statsd(tmp_path):
+    path = tmp_path / 'statsd.txt'
+    exporter = StatsDExporter(str(path))
+    instrumentation.register(after=exporter)
+    try:
+        list(Driver.execute(FakeExecutor([1, 2]), 'SELECT * FROM people WHERE id = ?', 'a'))
+        list(Driver.execute(FakeExecutor(), 'INSERT INTO people ?', {'id': 'a'}))
+    finally:
+        instrumentation.clear()
+    lines = path.read_text().splitlines()
+    assert lines[0].startswith('qldb_orm.select.people.duration:') and lines[0].endswith('|ms')
+    assert 'qldb_orm.select.people.rows:2|c' in lines
+    assert 'qldb_orm.select.people.read_ios:7|c' in lines
+    assert any(line.startswith('qldb_orm.insert.people.duration:') for line in lines)
@@ -1,4 +1,7 @@
 from unittest.mock import patch
+from amazon.ion.simpleion import loads
+import copy
+import asyncio
 import pytest
 import itertools
 import os
@@ -8,7 +11,15 @@ TEST_DIR = os.path.dirname(os.path.abspath(__file__))
 APP_DIR = os.path.dirname(TEST_DIR)
 sys.path.append(APP_DIR)
 
-from qldb import Document, Strut, QLDB, Query
+from qldb import Document, Strut, Strands, QLDB, Query, Where, schema, cache
+
+
+@pytest.fixture(autouse=True)
+def clear_schema():
+    schema.invalidate()
+    yield
+    schema.invalidate()
+
 
 @pytest.mark.parametrize('kwargs,keys,values', [
     ({'a': 'b'}, ['a'], ['b']),
@@ -217,15 +228,16 @@ def test_document_snapshot_nested_deserialization_big_mother(mock_create_index,
 @patch('qldb.Driver.create_index')
 @patch('qldb.Driver.query_by_fields',
        return_value=itertools.cycle([]))
-@patch('qldb.Driver.insert',
+@patch('qldb.Driver.upsert',
        return_value=itertools.cycle([{'documentId': 'test'}]))
-def test_document_driver_save(mock_insert, mock_query, mock_create_index, mock_create_table, mock_tables, mock_driver):
+def test_document_driver_save(mock_upsert, mock_query, mock_create_index, mock_create_table, mock_tables, mock_driver):
     document = Document(table='table', ledger='ledger')
     document.test_field = 'test value'
     document.save()
-    assert mock_driver.call_count == 4
-    assert mock_query.call_count == 1
-    assert mock_insert.call_count == 1
+    assert mock_driver.call_count == 3
+    assert mock_query.call_count == 0
+    assert mock_upsert.call_count == 1
+    assert document.meta_id == 'test'
 
 
 @patch('qldb.Driver.driver')
@@ -234,14 +246,35 @@ def test_document_driver_save(mock_insert, mock_query, mock_create_index, mock_c
 @patch('qldb.Driver.create_index')
 @patch('qldb.Driver.query_by_fields',
        return_value=itertools.cycle([{'property': 'value'}]))
-@patch('qldb.Driver.update',
+@patch('qldb.Driver.upsert',
        return_value=itertools.cycle([{'documentId': 'test'}]))
-def test_document_driver_load(mock_update, mock_query, mock_create_index, mock_create_table, mock_tables, mock_driver):
+def test_document_driver_load(mock_upsert, mock_query, mock_create_index, mock_create_table, mock_tables, mock_driver):
     document = Document(table='table', ledger='ledger', id="test")
     document.save()
-    assert mock_driver.call_count == 5
-    assert mock_query.call_count == 2
+    assert mock_driver.call_count == 4
+    assert mock_query.call_count == 1
+    assert mock_upsert.call_count == 1
+
+
+@patch('qldb.Driver.driver')
+@patch('qldb.Driver.tables')
+@patch('qldb.Driver.create_table')
+@patch('qldb.Driver.create_index')
+@patch('qldb.Driver.upsert')
+@patch('qldb.Driver.insert',
+       return_value=itertools.cycle([{'documentId': 'inserted'}]))
+@patch('qldb.Driver.update',
+       return_value=itertools.cycle([{'documentId': 'updated'}]))
+def test_document_save_hints(mock_update, mock_insert, mock_upsert, mock_create_index, mock_create_table, mock_tables, mock_driver):
+    document = Document(table='table', ledger='ledger')
+    document.save(exists=False)
+    assert document.meta_id == 'inserted'
+    document.number = 1
+    document.save(exists=True)
+    assert document.meta_id == 'updated'
+    assert mock_insert.call_count == 1
     assert mock_update.call_count == 1
+    assert mock_upsert.call_count == 0
 
 @patch('qldb.Driver.driver')
 @patch('qldb.Driver.tables')
@@ -256,6 +289,31 @@ def test_document_fields(mock_create_index, mock_create_table, mock_tables, mock
   assert 'prop' in list(document.fields().values())
   assert 'prop2' in list(document.fields().values())
 
+def test_document_fields_stored_apart():
+  document = Document(table='table', ledger='ledger', fixtures=False,
+                      snapshot={'id': 'a', 'table': 'field', 'nested': {'b': 1}})
+  with pytest.raises(TypeError):
+    document.fields()['id'] = 'b'
+  assert document.table == 'table'
+  assert document.fields()['table'] == 'field'
+  assert document.missing is None
+  document.extra = 2
+  document.meta_id = 'meta'
+  assert document.fields() == {'id': 'a', 'table': 'field', 'nested': document.nested, 'extra': 2}
+  del document.extra
+  assert 'extra' not in document.fields()
+  duplicate = copy.copy(document)
+  assert duplicate.fields() == document.fields()
+  assert duplicate.meta_id == 'meta'
+  duplicate.other = 3
+  duplicate.id = 'b'
+  assert document.other is None and document.id == 'a'
+  assert ('other',) in duplicate._dirty and ('other',) not in document._dirty
+  deep = copy.deepcopy(document)
+  deep.nested.b = 2
+  assert document.nested.b == 1 and deep.table == 'table'
+  assert ('nested', 'b') in deep._dirty and ('nested', 'b') not in document._dirty
+
 def test_query_init():
   query = Query('table', 'ledger')
   assert query.table == 'table'
@@ -270,11 +328,675 @@ def test_query_init():
        return_value=iter([{'property': 'value'}, {'money': 'moolah'}]))
 def test_query_all(mock_all, mock_create_index, mock_create_table, mock_tables, mock_driver):
   query = Query('table', 'ledger').get_all()
-  assert mock_driver.call_count == 5
-  assert mock_create_index.call_count == 2
-  assert mock_create_table.call_count == 2
-  assert mock_tables.call_count == 2
+  assert mock_driver.call_count == 1
+  assert mock_create_index.call_count == 0
+  assert mock_create_table.call_count == 0
+  assert mock_tables.call_count == 0
   assert mock_all.call_count == 1
   assert len(query) == 2
   assert query[0].property == 'value'
-  assert query[1].money == 'moolah'
\ No newline at end of file
+  assert query[1].money == 'moolah'
+
+@patch('qldb.Driver.driver')
+@patch('qldb.Driver.tables', return_value=['table'])
+@patch('qldb.Driver.create_table')
+@patch('qldb.Driver.create_index')
+def test_document_schema_cache(mock_create_index, mock_create_table, mock_tables, mock_driver):
+  Document(table='table', ledger='ledger')
+  Document(table='table', ledger='ledger')
+  assert mock_tables.call_count == 1
+  assert mock_create_table.call_count == 0
+  assert mock_create_index.call_count == 0
+
+
+@patch('qldb.Driver.driver')
+@patch('qldb.Driver.tables', return_value=[])
+@patch('qldb.Driver.create_table')
+@patch('qldb.Driver.create_index')
+def test_document_schema_cache_created(mock_create_index, mock_create_table, mock_tables, mock_driver):
+  Document(table='table', ledger='ledger')
+  Document(table='table', ledger='ledger')
+  assert mock_tables.call_count == 1
+  assert mock_create_table.call_count == 1
+  assert mock_create_index.call_count == 1
+  assert schema.has_index('ledger', 'table', 'id')
+
+
+@patch('qldb.Driver.driver')
+@patch('qldb.Driver.tables')
+def test_document_skip_fixtures(mock_tables, mock_driver):
+  document = Document(table='table', ledger='ledger', snapshot={'test': 'prop'}, fixtures=False)
+  assert mock_tables.call_count == 0
+  assert mock_driver.call_count == 0
+  assert document.test == 'prop'
+
+
+class FakeStream(list):
+  closed = False
+
+  def close(self):
+    self.closed = True
+
+
+@patch('qldb.Driver.stream')
+@patch('qldb.Driver.query_all',
+       return_value=FakeStream([{'property': 'value'}, {'money': 'moolah'}]))
+def test_query_iter_all(mock_all, mock_stream):
+  results = Query('table', 'ledger').iter_all()
+  assert not isinstance(results, list)
+  assert next(results).property == 'value'
+  assert next(results).money == 'moolah'
+  assert next(results, None) is None
+  assert mock_all.return_value.closed
+  assert mock_stream.call_count == 1
+
+
+@patch('qldb.Driver.stream')
+@patch('qldb.Driver.query_by_fields',
+       return_value=FakeStream([{'property': 'value'}, {'money': 'moolah'}]))
+def test_query_iter_by_early_termination(mock_by, mock_stream):
+  for document in Query('table', 'ledger').iter_by(property='value'):
+    break
+  assert document.property == 'value'
+  assert mock_by.return_value.closed
+
+
+@patch('qldb.Driver.driver')
+@patch('qldb.Driver.tables')
+@patch('qldb.Driver.create_table')
+@patch('qldb.Driver.create_index')
+@patch('qldb.Driver.bulk_upsert', side_effect=lambda driver, documents, table, index, exists: [
+  'meta-{}'.format(document['n']) for document in documents])
+def test_query_bulk_save(mock_bulk, mock_create_index, mock_create_table, mock_tables, mock_driver):
+  documents = [Document(table='table', ledger='ledger', snapshot={'n': n}) for n in range(5)]
+  ids = Query('table', 'ledger').bulk_save(documents + [{'n': 5}], batch_size=4)
+  assert mock_bulk.call_count == 2
+  assert ids == ['meta-{}'.format(n) for n in range(6)]
+  assert all(document.meta_id == 'meta-{}'.format(n) for n, document in enumerate(documents))
+
+
+def test_document_snapshot_ion_deserialization():
+  snapshot = loads('{ id: "test", test_1: { test_2: { test_3: 45 }, test_4: [ { a: 1 } ] } }')
+  document = Document(table='table', ledger='ledger', snapshot=dict(snapshot), fixtures=False)
+  assert isinstance(document.test_1, Strut)
+  assert isinstance(document.test_1.test_2, Strut)
+  assert document.test_1.test_2.test_3 == 45
+  assert document.test_1.test_4[0]['a'] == 1
+
+
+def test_document_snapshot_deep_deserialization():
+  snapshot = value = {}
+  for _ in range(2000):
+    value['nest'] = {}
+    value = value['nest']
+  value['bottom'] = True
+  document = Document(table='table', ledger='ledger', snapshot=snapshot, fixtures=False)
+  node, depth = document, 0
+  while hasattr(node, 'nest'):
+    node, depth = node.nest, depth + 1
+  assert depth == 2000
+  assert node.bottom
+
+
+@patch('qldb.Driver.driver')
+@patch('qldb.Driver.tables')
+@patch('qldb.Driver.create_table')
+@patch('qldb.Driver.create_index')
+@patch('qldb.Driver.query_by_fields',
+       return_value=itertools.cycle([{'id': 'test', 'property': 'value'}]))
+@patch('qldb.Driver.upsert',
+       return_value=itertools.cycle([{'documentId': 'meta'}]))
+def test_document_async(mock_upsert, mock_query, mock_create_index, mock_create_table, mock_tables, mock_driver):
+  async def main():
+    document = await Document.aload(table='table', ledger='ledger', id='test')
+    document.property = 'new value'
+    await document.asave()
+    return document
+
+  document = asyncio.run(main())
+  assert document.meta_id == 'meta'
+  assert mock_query.call_count == 1
+  assert mock_upsert.call_count == 1
+
+
+@patch('qldb.Driver.driver')
+@patch('qldb.Driver.query_by_fields',
+       return_value=iter([{'property': 'value'}, {'money': 'moolah'}]))
+def test_query_async(mock_by, mock_driver):
+  results = asyncio.run(Query('table', 'ledger').afind_by(property='value'))
+  assert len(results) == 2
+  assert results[1].money == 'moolah'
+
+
+@patch('qldb.Driver.stream')
+@patch('qldb.Driver.query_all',
+       return_value=FakeStream([{'property': 'value'}, {'money': 'moolah'}]))
+def test_query_aiter_all(mock_all, mock_stream):
+  async def main():
+    return [document async for document in Query('table', 'ledger').aiter_all()]
+
+  results = asyncio.run(main())
+  assert [document.fields().get('property') for document in results] == ['value', None]
+  assert mock_all.return_value.closed
+
+
+def query_in_fields(driver, table, **fields):
+  return iter([{'id': id, 'team': team} for id in fields['id'] for team in fields.get('team', ['a'])])
+
+
+@patch('qldb.Driver.driver')
+@patch('qldb.Driver.query_in_fields', side_effect=query_in_fields)
+def test_query_get_many(mock_in, mock_driver):
+  ids = ['id-{}'.format(n) for n in range(120)]
+  ids.reverse()
+  results = Query('table', 'ledger').get_many(ids + ['id-0'], parallelism=4)
+  assert mock_in.call_count == 3
+  assert all(len(call.kwargs['id']) <= 50 for call in mock_in.call_args_list)
+  assert [document.id for document in results] == ids
+
+
+@patch('qldb.Driver.driver')
+@patch('qldb.Driver.query_in_fields', side_effect=query_in_fields)
+def test_query_find_in_fan_out(mock_in, mock_driver):
+  ids = ['id-{}'.format(n) for n in range(60)]
+  results = Query('table', 'ledger').find_in(team=['a', 'b'], id=ids)
+  assert mock_in.call_count == 2
+  assert all(call.kwargs['team'] == ['a', 'b'] for call in mock_in.call_args_list)
+  assert len(results) == 120
+
+
+@patch('qldb.Driver.driver')
+@patch('qldb.Driver.query_in_fields', side_effect=query_in_fields)
+def test_query_find_in_small(mock_in, mock_driver):
+  results = Query('table', 'ledger').find_in(id=['a', 'b'])
+  assert mock_in.call_count == 1
+  assert len(results) == 2
+
+
+@pytest.fixture
+def document_cache():
+  cache.invalidate()
+  cache.enabled = True
+  yield cache
+  cache.enabled = False
+  cache.revision_check = False
+  cache.invalidate()
+
+
+COMMITTED = {'data': {'id': 'test', 'property': 'value', 'list': [1, 2]}, 'metadata': {'id': 'meta', 'version': 2}}
+
+
+@patch('qldb.Driver.driver')
+@patch('qldb.Driver.tables', return_value=['table'])
+@patch('qldb.Driver.query_committed', side_effect=lambda *args, **kwargs: iter([COMMITTED]))
+@patch('qldb.Driver.query_by_fields')
+@patch('qldb.Driver.upsert', return_value=itertools.cycle([{'documentId': 'meta'}]))
+def test_document_cache_read_through(mock_upsert, mock_query, mock_committed, mock_tables, mock_driver, document_cache):
+  first = Document(table='table', ledger='ledger', id='test')
+  first.list.append(3)
+  second = Document(table='table', ledger='ledger', id='test')
+  assert mock_committed.call_count == 1
+  assert mock_query.call_count == 0
+  assert second.meta_id == 'meta'
+  assert second.property == 'value'
+  assert second.list == [1, 2]
+  second.property = 'changed'
+  second.save()
+  assert mock_upsert.call_args[0][4] == ('property',)
+  assert ('ledger', 'table', 'test') not in document_cache
+  Document(table='table', ledger='ledger', id='test')
+  assert mock_committed.call_count == 2
+
+
+@patch('qldb.Driver.driver')
+@patch('qldb.Driver.tables', return_value=['table'])
+@patch('qldb.Driver.query_committed', side_effect=lambda *args, **kwargs: iter([COMMITTED]))
+@patch('qldb.Driver.revision')
+def test_document_cache_revision_check(mock_revision, mock_committed, mock_tables, mock_driver, document_cache):
+  document_cache.revision_check = True
+  Document(table='table', ledger='ledger', id='test')
+  mock_revision.return_value = iter([{'meta_id': 'meta', 'version': 2}])
+  Document(table='table', ledger='ledger', id='test')
+  assert mock_committed.call_count == 1
+  mock_revision.return_value = iter([{'meta_id': 'meta', 'version': 3}])
+  Document(table='table', ledger='ledger', id='test')
+  assert mock_committed.call_count == 2
+  assert mock_revision.call_count == 2
+
+
+@pytest.fixture
+def memory_ledger():
+  from qldb_orm.static.memory import MemoryDriver
+  from qldb_orm.static.driver import Driver
+  MemoryDriver.reset()
+  driver = Driver.driver('ledger', pooled=False, backend='memory')
+  with patch('qldb.Driver.driver', lambda ledger, **config: driver):
+    Query('teams', 'ledger').bulk_save([
+      {'id': 'a', 'team': 'x', 'members': [1, 2], 'panopticon': {'nest': {'title': 'one', 'body': 'long'}}},
+      {'id': 'b', 'team': 'y', 'members': [3], 'panopticon': {'nest': {'title': 'two', 'body': 'long'}}}
+    ])
+    yield driver
+  MemoryDriver.reset()
+
+
+def test_query_only(memory_ledger):
+  results = Query('teams', 'ledger').only('team', 'panopticon.nest.title').find_by(id='a')
+  assert len(results) == 1
+  document = results[0]
+  assert document.partial
+  assert document.meta_id is not None
+  assert document.fields() == {'id': 'a', 'team': 'x', 'panopticon': document.panopticon}
+  assert document.panopticon.nest.title == 'one'
+  assert vars(document.panopticon.nest) == {'title': 'one'}
+  assert document.members is None
+  with pytest.raises(ValueError):
+    document.save()
+
+  assert document.reload()
+  assert not document.partial
+  assert document.members == [1, 2]
+  document.save()
+
+
+def test_query_only_does_not_mutate(memory_ledger):
+  query = Query('teams', 'ledger')
+  projected = query.only('team')
+  assert query.projection is None
+  assert sorted(document.id for document in projected.find_in(id=['a', 'b'])) == ['a', 'b']
+  assert all(document.members is None for document in projected.get_all())
+  assert all(document.members is not None for document in query.get_all())
+  with pytest.raises(ValueError):
+    query.only('team; DELETE FROM teams')
+
+
+def test_query_exclude(memory_ledger):
+  results = Query('teams', 'ledger').exclude('members', 'panopticon.nest.body').get_all()
+  assert len(results) == 2
+  for document in results:
+    assert document.partial
+    assert document.members is None
+    assert vars(document.panopticon.nest) == {'title': document.panopticon.nest.title}
+  with pytest.raises(ValueError):
+    Query('teams', 'ledger').bulk_save(results)
+  with pytest.raises(ValueError):
+    Query('teams', 'ledger').exclude('id')
+
+
+@pytest.fixture
+def numbers_ledger():
+  from qldb_orm.static.memory import MemoryDriver
+  from qldb_orm.static.driver import Driver
+  from qldb_orm.static.cursor import StreamingDriver
+  MemoryDriver.reset()
+  driver = Driver.driver('ledger', pooled=False, backend='memory')
+  with patch('qldb.Driver.driver', lambda ledger, **config: driver), \
+      patch('qldb.Driver.stream', lambda ledger, **config: StreamingDriver(driver)):
+    Query('numbers', 'ledger').bulk_save(
+      [{'id': 'n{:02}'.format(n), 'number': n, 'title': 'wise {}'.format(n) if n % 2 else 'fool {}'.format(n),
+        'nest': {'rank': n % 3}} for n in range(20)] + [{'id': 'none', 'title': 'wise none'}])
+    yield driver
+  MemoryDriver.reset()
+
+
+def test_query_where(numbers_ledger):
+  query = Query('numbers', 'ledger')
+  results = query.where(number__gt=14, title__like='wise%').order_by('-number').get_all()
+  assert [document.number for document in results] == [19, 17, 15]
+  results = query.where(Where(number__lt=2) | Where(number__gte=18)).where(nest__rank=0).get_all()
+  assert sorted(document.number for document in results) == [0, 18]
+  results = query.where(number__between=(3, 6)).order_by('nest.rank', '-number').find_in(id=['n03', 'n05', 'n06'])
+  assert [document.number for document in results] == [6, 3, 5]
+  assert [document.id for document in query.where(nest__rank=1).only('number').iter_by(number=4)] == ['n04']
+  assert query.where(~Where(number__ne=7)).find_by(title='wise 7')[0].id == 'n07'
+
+
+@pytest.mark.parametrize('ordering,expected', [
+  ((), ['n{:02}'.format(n) for n in range(20)] + ['none']),
+  (('-number',), ['none'] + ['n{:02}'.format(n) for n in reversed(range(20))]),
+  (('nest.rank', 'number'), ['none'] + ['n{:02}'.format(n) for rank in range(3) for n in range(rank, 20, 3)])
+])
+def test_query_page(numbers_ledger, ordering, expected):
+  query = Query('numbers', 'ledger').order_by(*ordering)
+  seen, cursor, pages = [], None, 0
+  while True:
+    documents, cursor = query.page(6, after=cursor)
+    seen.extend(document.id for document in documents)
+    pages += 1
+    if cursor is None:
+      break
+  assert seen == expected
+  assert pages == 4
+
+
+def test_query_ensure_index(numbers_ledger):
+  query = Query('numbers', 'ledger')
+  assert schema.indexes('ledger', 'numbers') == {'id'}
+  assert query.ensure_index('nest', 'title') == ['nest', 'title']
+  assert query.ensure_index('title') == []
+  schema.invalidate()
+  assert schema.indexes('ledger', 'numbers') == {'id', 'nest', 'title'}
+
+
+def test_query_index_policy(numbers_ledger):
+  query = Query('numbers', 'ledger')
+  with patch.object(schema, 'policy', 'raise'):
+    assert len(query.find_by(id='n01')) == 1
+    assert len(query.where(number__in=[1, 2]).where(id__in=['n01']).get_all()) == 1
+    with pytest.raises(ValueError):
+      query.find_by(number=1)
+    with pytest.raises(ValueError):
+      query.where(Where(id='n01') | Where(number=1)).get_all()
+    query.ensure_index('number')
+    assert len(query.find_by(number=1)) == 1
+    assert len(query.where(Where(id='n01') | Where(number=1)).get_all()) == 1
+
+
+def test_document_declared_indexes(numbers_ledger):
+  class Team(Document):
+    indexes = ('team',)
+
+  Team('teams', ledger='ledger', snapshot={'team': 'a'}).save()
+  assert schema.declared('ledger', 'teams') == {'id', 'team'}
+  schema.invalidate()
+  assert schema.indexes('ledger', 'teams') == {'id', 'team'}
+
+
+def test_strut_proxy():
+  nested = {'b': {'c': 'd'}}
+  strut = Strut(a=nested, e=[1])
+  assert strut.a.b.c == 'd'
+  strut.a.b.f = 'g'
+  assert nested == {'b': {'c': 'd', 'f': 'g'}}
+  assert vars(strut) == {'a': nested, 'e': [1]}
+  assert strut.to_json() == {'a': {'b': {'c': 'd', 'f': 'g'}}, 'e': [1]}
+  del strut.e
+  with pytest.raises(AttributeError):
+    strut.e
+  assert not hasattr(Strut(), 'missing')
+  assert not hasattr(strut, '__weakref__')
+
+
+def test_document_lazy_nested():
+  snapshot = loads('{id: "a", a: {b: {c: {d: 1}}}}')
+  document = Document('table', snapshot=snapshot, fixtures=False)
+  assert isinstance(document.a, Strut)
+  assert vars(document.a) is snapshot['a']
+  assert document.a.b.c.d == 1
+
+
+def test_document_changes(memory_ledger):
+  document = Document('teams', id='a', ledger='ledger', fixtures=False)
+  assert document.changes() == ()
+  assert document.team == 'x'
+  assert document.panopticon.nest.title == 'one'
+  assert document.members == [1, 2]
+  assert document.changes() == ()
+  document.panopticon.nest.title = 'three'
+  document.members.append(4)
+  document.team = 'z'
+  assert set(document.changes()) == {'panopticon.nest.title', 'members', 'team'}
+  document.panopticon.nest = {'title': 'four'}
+  assert set(document.changes()) == {'panopticon.nest', 'members', 'team'}
+  del document.panopticon.nest.title
+  assert set(document.changes()) == {'panopticon.nest', 'members', 'team'}
+  del document.team
+  assert document.changes() is None
+  assert Document('teams', ledger='ledger', fixtures=False).changes() is None
+
+
+def test_document_save_changes(memory_ledger):
+  from qldb_orm.static.driver import Driver
+  document = Document('teams', id='a', ledger='ledger', fixtures=False)
+  with patch('qldb.Driver.upsert', wraps=Driver.upsert) as mock_upsert:
+    document.save()
+    assert mock_upsert.call_count == 0
+    document.panopticon.nest.title = 'three'
+    document.members.append(4)
+    document.save()
+    assert set(mock_upsert.call_args[0][4]) == {'panopticon.nest.title', 'members'}
+    document.save()
+    assert mock_upsert.call_count == 1
+  loaded = Document('teams', id='a', ledger='ledger', fixtures=False)
+  assert loaded.fields() == {'id': 'a', 'team': 'x', 'members': [1, 2, 4],
+                             'panopticon': Strut(nest={'title': 'three', 'body': 'long'})}
+  assert len(Query('teams', 'ledger').history(loaded.meta_id)) == 2
+
+
+def test_document_save_after_fields(memory_ledger):
+  from qldb_orm.static.driver import Driver
+  document = Document('teams', id='a', ledger='ledger', fixtures=False)
+  with patch('qldb.Driver.upsert', wraps=Driver.upsert) as mock_upsert:
+    assert dict(document.fields())['team'] == 'x'
+    document.save()
+    assert mock_upsert.call_count == 0
+    document.team = 'z'
+    assert 'members' in document.fields()
+    document.save()
+    assert tuple(mock_upsert.call_args[0][4]) == ('team',)
+  Query('teams', 'ledger').bulk_save([document])
+  assert document.changes() == ()
+
+
+def test_query_history_window(memory_ledger):
+  import datetime
+  document = Document('teams', id='a', ledger='ledger', fixtures=False)
+  middle = datetime.datetime.now(datetime.timezone.utc)
+  document.team = 'z'
+  document.save()
+  query = Query('teams', 'ledger')
+  assert len(query.history()) == 3
+  assert [revision.data.team for revision in query.history(start=middle)] == ['z']
+  assert len(query.history(end=middle)) == 2
+  assert [revision.metadata.version for revision in query.history(document.meta_id, version=0)] == [1]
+  assert [revision.metadata.version for revision in query.iter_history(document.meta_id, start=middle)] == [1]
+  with pytest.raises(ValueError):
+    query.history(version=0)
+
+
+def test_query_history_since(memory_ledger, tmp_path):
+  from qldb_orm.static.checkpoint import Checkpoint
+  path = str(tmp_path / 'teams.json')
+  query = Query('teams', 'ledger')
+  assert sorted(revision.data.id for revision in query.history_since(path)) == ['a', 'b']
+  assert list(query.history_since(path)) == []
+  document = Document('teams', id='a', ledger='ledger', fixtures=False)
+  document.team = 'z'
+  document.save()
+  Query('teams', 'ledger').bulk_save([{'id': 'c', 'team': 'w'}])
+  revisions = query.history_since(path)
+  assert next(revisions).data.team == 'z'
+  revisions.close()
+  assert [revision.data.team for revision in itertools.islice(query.history_since(path), 2)] == ['z', 'w']
+  assert (document.meta_id, 1) in Checkpoint(path).revisions
+  assert [revision.data.id for revision in query.history_since(path)] == ['c']
+  assert list(query.history_since(Checkpoint(path))) == []
+
+
+def test_query_history_since_out_of_order():
+  import datetime
+  from qldb_orm.static.checkpoint import Checkpoint
+
+  def records(*revisions):
+    for meta_id, version, second in revisions:
+      yield {'data': {'id': meta_id}, 'metadata': {
+        'id': meta_id, 'version': version, 'txTime': datetime.datetime(2022, 1, 1, 0, 0, second)}}
+
+  query, checkpoint = Query('teams', 'ledger'), Checkpoint()
+  tail = query._tail(records(('a', 0, 5), ('b', 0, 3), ('a', 1, 7)), checkpoint)
+  assert [(revision.metadata.id, revision.metadata.version) for revision in tail] == [('a', 0), ('b', 0), ('a', 1)]
+  assert checkpoint.time == datetime.datetime(2022, 1, 1, 0, 0, 7, tzinfo=datetime.timezone.utc)
+  tail = query._tail(records(('a', 1, 7), ('c', 0, 9), ('b', 1, 8)), checkpoint)
+  assert next(tail).metadata.id == 'c'
+  assert next(tail).metadata.id == 'b'
+  tail.close()
+  assert checkpoint.time.second == 7
+  tail = query._tail(records(('a', 1, 7), ('c', 0, 9), ('b', 1, 8)), checkpoint)
+  assert [revision.metadata.id for revision in tail] == ['b']
+  assert checkpoint.time.second == 9 and checkpoint.revisions == {('c', 0)}
+
+
+def test_query_history_revision_store(memory_ledger):
+  import datetime
+  from qldb_orm.static.driver import Driver
+  from qldb_orm.static.revisions import RevisionStore
+  store = RevisionStore(':memory:')
+  document = Document('teams', id='a', ledger='ledger', fixtures=False)
+  with patch('qldb.revisions', store), \
+       patch('qldb.Driver.history', wraps=Driver.history) as mock_history, \
+       patch('qldb.Driver.history_full', wraps=Driver.history_full) as mock_history_full:
+    assert [revision.data.team for revision in Query('teams', 'ledger').history(document.meta_id)] == ['x']
+    before = datetime.datetime.now(datetime.timezone.utc)
+    document.team = 'z'
+    document.save()
+    stranded = Document('teams', id='a', ledger='ledger', fixtures=False, stranded=True)
+    assert [strand.team for strand in stranded.strands] == ['x', 'z']
+    assert mock_history.call_args_list[-1][1]['version'] == 0
+    assert len(Query('teams', 'ledger').history()) == 3
+    assert mock_history_full.call_args_list[-1][1]['start'] is None
+    assert len(Query('teams', 'ledger').history(start=before)) == 1
+    assert mock_history_full.call_args_list[-1][1]['start'] is not None
+    assert document.as_of(before).team == 'x'
+    assert document.as_of(datetime.datetime.now(datetime.timezone.utc)).team == 'z'
+    assert document.as_of(datetime.datetime(2000, 1, 1)) is None
+    assert sorted(team.team for team in Query('teams', 'ledger').as_of(before)) == ['x', 'y']
+  with pytest.raises(ValueError):
+    document.as_of(before)
+
+
+def test_query_history_revision_store_window(memory_ledger):
+  import datetime
+  from qldb_orm.static.driver import Driver
+  from qldb_orm.static.revisions import RevisionStore
+  store = RevisionStore(':memory:')
+  before = datetime.datetime.now(datetime.timezone.utc)
+  document = Document('teams', id='a', ledger='ledger', fixtures=False)
+  document.team = 'z'
+  document.save()
+  with patch('qldb.revisions', store), \
+       patch('qldb.Driver.history_full', wraps=Driver.history_full) as mock_history_full:
+    assert [revision.data.team for revision in Query('teams', 'ledger').history(start=before)] == ['z']
+    assert mock_history_full.call_args[1]['start'] == before
+    assert store.watermark('ledger', 'teams') is None
+    assert len(Query('teams', 'ledger').history(end=before)) == 2
+    assert mock_history_full.call_args[1]['start'] is None and mock_history_full.call_args[1]['end'] == before
+    watermark = store.watermark('ledger', 'teams')
+    assert watermark <= before
+    assert Query('teams', 'ledger').history(end=datetime.datetime(2000, 1, 1, tzinfo=datetime.timezone.utc)) == []
+    assert mock_history_full.call_count == 2
+    assert len(Query('teams', 'ledger').history()) == 3
+    assert mock_history_full.call_args[1]['start'] == watermark
+    assert store.watermark('ledger', 'teams') > before
+
+def test_query_bulk_save_duplicates(memory_ledger):
+  ids = Query('teams', 'ledger').bulk_save([{'id': 'dup', 'x': 1}, {'id': 'dup', 'x': 2}])
+  assert ids[0] == ids[1]
+  assert [document.x for document in Query('teams', 'ledger').find_by(id='dup')] == [2]
+  ids = Query('teams', 'ledger').bulk_save([{'id': 'dup', 'x': 3}, {'id': 'dup', 'x': 4}])
+  assert [document.x for document in Query('teams', 'ledger').find_by(id='dup')] == [4]
+
+def test_query_bulk_save_bookkeeping(memory_ledger):
+  document = Document('teams', id='a', ledger='ledger', fixtures=False, stranded=True)
+  assert len(document.strands) == 1
+  document.team = 'z'
+  Query('teams', 'ledger').bulk_save([document])
+  assert len(document.strands) == 2 and document.strands[-1].team == 'z'
+  assert document.changes() == ()
+  other = Document('others', id='c', ledger='ledger', snapshot={'id': 'c'})
+  with pytest.raises(ValueError):
+    Query('teams', 'ledger').bulk_save([other])
+  assert Query('teams', 'ledger').find_by(id='c') == []
+
+def test_document_strands_lazy(memory_ledger):
+  from qldb_orm.static.driver import Driver
+  document = Document('teams', id='a', ledger='ledger', fixtures=False)
+  for number in range(1, 7):
+    document.number = number
+    document.save()
+  with patch('qldb.Driver.history', wraps=Driver.history) as mock_history:
+    stranded = Document('teams', id='a', ledger='ledger', fixtures=False, stranded=True)
+    assert isinstance(stranded.strands, Strands)
+    assert mock_history.call_count == 0
+    strands = Strands('teams', 'a', stranded.meta_id, ledger='ledger', page_size=3)
+    assert len(strands) == 7
+    assert strands[-1].number == 6
+    assert mock_history.call_args[1]['version'] == 5 and mock_history.call_args[1]['until'] == 6
+    assert [strand.number for strand in itertools.islice(reversed(strands), 2)] == [6, 5]
+    assert mock_history.call_count == 2
+    assert [strand.number for strand in strands[:3]] == [None, 1, 2]
+    assert strands[0].team == 'x'
+    assert mock_history.call_count == 3
+    with pytest.raises(IndexError):
+      strands[7]
+
+
+def test_document_strands_saved(memory_ledger):
+  from qldb_orm.static.driver import Driver
+  document = Document('teams', id='a', ledger='ledger', fixtures=False, stranded=True)
+  assert [strand.team for strand in document.strands] == ['x']
+  with patch('qldb.Driver.history', wraps=Driver.history) as mock_history, \
+       patch('qldb.Driver.revision', wraps=Driver.revision) as mock_revision:
+    document.team = 'z'
+    document.save()
+    document.save()
+    assert len(document.strands) == 2
+    assert mock_history.call_count == 0 and mock_revision.call_count == 0
+    assert document.strands[-1].team == 'z'
+    assert mock_history.call_args[1]['version'] == 0
+  Query('teams', 'ledger').bulk_save([{'id': 'a', 'team': 'w'}], exists=True)
+  document.strands.refresh()
+  assert [strand.team for strand in document.strands] == ['x', 'z', 'w']
+
+
+def test_document_strands_diff(memory_ledger):
+  from qldb_orm.static.delta import Change
+  document = Document('teams', id='a', ledger='ledger', fixtures=False)
+  for number in range(1, 5):
+    document.number = number
+    document.panopticon.nest = {'size': number}
+    document.save()
+  strands = Strands('teams', 'a', document.meta_id, ledger='ledger', page_size=2)
+  assert [strand.number for strand in strands] == [None, 1, 2, 3, 4]
+  assert sorted(strands._snapshots._snapshots) == [0, 2, 4]
+  assert strands.diff(1, 2) == [Change('change', ('panopticon', 'nest', 'size'), 1, 2), Change('change', ('number',), 1, 2)]
+  assert strands.diff(-1, -1) == []
+  assert strands.diff(0, 1)[0] == Change('add', ('number',), new=1)
+  strands[3].panopticon.nest.size = 10
+  assert strands._snapshot(3)['panopticon']['nest']['size'] == 3
+  assert strands[1].diff(document) == strands.diff(1, -1)
+  assert sorted(change.path for change in document.diff({}) if change.kind == 'remove') == [('id',), ('members',), ('number',), ('panopticon',), ('team',)]
+  with pytest.raises(IndexError):
+    strands.diff(0, 5)
+
+
+def test_query_export(numbers_ledger, tmp_path):
+  import json
+  path = str(tmp_path / 'numbers.jsonl')
+  query = Query('numbers', 'ledger')
+  assert query.export(path, chunk_size=4).rows == 21
+  with open(path) as infile:
+    exported = [json.loads(line) for line in infile]
+  assert sorted(record['id'] for record in exported) == sorted(document.id for document in query.get_all())
+  assert query.where(number__gte=18).only('number').export(path).rows == 2
+  with open(path) as infile:
+    assert sorted(json.loads(line)['number'] for line in infile) == [18, 19]
+  with pytest.raises(ValueError):
+    query.order_by('number').export(path)
+
+
+def test_query_export_history(numbers_ledger, tmp_path):
+  import json
+  from qldb_orm.static.driver import Driver
+  path = str(tmp_path / 'history.jsonl.gz')
+  query = Query('numbers', 'ledger')
+  assert query.export_history(path).rows == 21
+  document = Document('numbers', id='n01', ledger='ledger', fixtures=False)
+  document.number = 100
+  document.save()
+  with patch('qldb.Driver.history_full', wraps=Driver.history_full) as mock_history_full:
+    assert query.export_history(path, resume=True).rows == 1
+    assert mock_history_full.call_args[1]['start'] is not None
+  import gzip
+  with gzip.open(path, 'rt') as infile:
+    exported = [json.loads(line) for line in infile]
+  assert len(exported) == 22
+  assert exported[-1]['data']['number'] == 100 and exported[-1]['metadata']['version'] == 1
@@ -0,0 +1,98 @@
+import datetime
+import os
+import sys
+import pytest
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_DIR = os.path.dirname(TEST_DIR)
+sys.path.append(APP_DIR)
+
+from static.revisions import RevisionStore
+
+TIMES = [datetime.datetime(2022, 1, day, tzinfo=datetime.timezone.utc) for day in range(1, 5)]
+
+
+def revision(meta_id, version, time, data):
+    record = {'blockAddress': {'strandId': 'strand', 'sequenceNo': version},
+              'metadata': {'id': meta_id, 'version': version, 'txTime': time, 'txId': 'tx'}}
+    if data is not None:
+        record['data'] = data
+    return record
+
+
+def store():
+    revisions = RevisionStore(':memory:')
+    revisions.append('ledger', 'table', [
+        revision('a', 0, TIMES[0], {'id': '1', 'n': 0}),
+        revision('b', 0, TIMES[1], {'id': '2', 'n': 0}),
+        revision('a', 1, TIMES[2], {'id': '1', 'n': 1}),
+        revision('b', 1, TIMES[3], None)
+    ])
+    return revisions
+
+
+def test_revisions_disabled():
+    assert not RevisionStore('').enabled
+    assert RevisionStore(':memory:').enabled
+
+
+def test_revisions_append():
+    revisions = store()
+    latest = revisions.append('ledger', 'table', [revision('a', 1, TIMES[2], {'id': '1', 'n': 'changed'})])
+    assert latest == TIMES[2]
+    assert revisions.append('ledger', 'table', []) is None
+    assert revisions.version('ledger', 'table', 'a') == 1
+    assert revisions.version('ledger', 'table', 'c') is None
+    records = revisions.document('ledger', 'table', 'a')
+    assert [record['data']['n'] for record in records] == [0, 1]
+    assert records[0]['metadata']['version'] == 0
+    assert revisions.document('ledger', 'other', 'a') == []
+
+
+def test_revisions_append_rollback():
+    revisions = store()
+    with pytest.raises(OverflowError):
+        revisions.append('ledger', 'table', [revision('c', 0, TIMES[0], {'id': '3'}),
+                                             revision('c', 1 << 64, TIMES[1], {'id': '3'})])
+    assert not revisions._connect().in_transaction
+    assert revisions.version('ledger', 'table', 'c') is None
+    revisions.append('ledger', 'table', [revision('c', 0, TIMES[0], {'id': '3'})])
+    assert revisions.version('ledger', 'table', 'c') == 0
+
+
+def test_revisions_bounds():
+    revisions = store()
+    assert [record['metadata']['id'] for record in revisions.table('ledger', 'table')] == ['a', 'b', 'a', 'b']
+    assert len(revisions.table('ledger', 'table', start=TIMES[1], end=TIMES[2])) == 2
+    assert [record['data']['n'] for record in revisions.document('ledger', 'table', 'a', version=0)] == [1]
+    assert revisions.document('ledger', 'table', 'a', end=TIMES[1])[0]['data']['n'] == 0
+
+
+def test_revisions_as_of():
+    revisions = store()
+    assert revisions.as_of('ledger', 'table', 'a', TIMES[0] - datetime.timedelta(seconds=1)) is None
+    assert revisions.as_of('ledger', 'table', 'a', TIMES[1])['data']['n'] == 0
+    assert revisions.as_of('ledger', 'table', 'a', TIMES[3])['data']['n'] == 1
+    assert 'data' not in revisions.as_of('ledger', 'table', 'b', TIMES[3])
+    assert [record['metadata']['version'] for record in revisions.snapshot('ledger', 'table', TIMES[2])] == [1, 0]
+
+
+def test_revisions_watermark_clear():
+    revisions = store()
+    assert revisions.watermark('ledger', 'table') is None
+    revisions.advance('ledger', 'table', TIMES[2])
+    revisions.advance('ledger', 'table', TIMES[1])
+    assert revisions.watermark('ledger', 'table') == TIMES[2]
+    revisions.clear('ledger', 'other')
+    assert revisions.version('ledger', 'table', 'a') == 1
+    revisions.clear('ledger')
+    assert revisions.version('ledger', 'table', 'a') is None
+    assert revisions.watermark('ledger', 'table') is None
+
+
+def test_revisions_file(tmp_path):
+    path = str(tmp_path / 'revisions.db')
+    revisions = RevisionStore(path)
+    revisions.append('ledger', 'table', [revision('a', 0, TIMES[0], {'id': '1'})])
+    revisions.close()
+    assert RevisionStore(path).version('ledger', 'table', 'a') == 0
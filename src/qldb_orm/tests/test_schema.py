@@ -0,0 +1,102 @@
+from unittest.mock import patch
+import pytest
+import os
+import sys
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_DIR = os.path.dirname(TEST_DIR)
+sys.path.append(APP_DIR)
+
+from static.schema import SchemaCache
+
+
+@patch('static.schema.Driver.tables', return_value=['a', 'b'])
+def test_schema_cache_hit(mock_tables):
+    cache = SchemaCache(ttl=300)
+    assert cache.has_table('ledger', 'a')
+    assert cache.has_table('ledger', 'b')
+    assert not cache.has_table('ledger', 'c')
+    assert mock_tables.call_count == 1
+
+
+@patch('static.schema.Driver.tables', return_value=['a'])
+def test_schema_cache_ttl(mock_tables):
+    cache = SchemaCache(ttl=0)
+    cache.has_table('ledger', 'a')
+    cache.has_table('ledger', 'a')
+    assert mock_tables.call_count == 2
+
+
+@patch('static.schema.Driver.tables', return_value=['a'])
+def test_schema_cache_per_ledger(mock_tables):
+    cache = SchemaCache(ttl=300)
+    cache.has_table('ledger', 'a')
+    cache.has_table('another ledger', 'a')
+    assert mock_tables.call_count == 2
+
+
+@patch('static.schema.Driver.indexes', return_value={})
+@patch('static.schema.Driver.tables', return_value=['a'])
+def test_schema_cache_add(mock_tables, mock_indexes):
+    cache = SchemaCache(ttl=300)
+    assert not cache.has_table('ledger', 'b')
+    cache.add_table('ledger', 'b')
+    cache.add_index('ledger', 'b', 'id')
+    assert cache.has_table('ledger', 'b')
+    assert cache.has_index('ledger', 'b', 'id')
+    assert not cache.has_index('ledger', 'a', 'id')
+    assert mock_tables.call_count == 1
+
+
+@patch('static.schema.Driver.tables', return_value=['a'])
+def test_schema_cache_invalidate(mock_tables):
+    cache = SchemaCache(ttl=300)
+    cache.has_table('ledger', 'a')
+    cache.invalidate('ledger')
+    cache.has_table('ledger', 'a')
+    cache.invalidate()
+    cache.has_table('ledger', 'a')
+    assert mock_tables.call_count == 3
+
+
+@patch('static.schema.Driver.indexes', return_value={'a': {'id', 'team'}, 'gone': {'id'}})
+@patch('static.schema.Driver.tables', return_value=['a', 'b'])
+def test_schema_cache_indexes(mock_tables, mock_indexes):
+    cache = SchemaCache(ttl=300)
+    assert cache.indexes('ledger', 'a') == {'id', 'team'}
+    assert cache.has_index('ledger', 'a', 'team')
+    assert not cache.has_index('ledger', 'b', 'id')
+    assert cache.indexes('ledger', 'gone') == set()
+    assert mock_indexes.call_count == 1
+
+
+@patch('static.schema.Driver.create_index')
+@patch('static.schema.Driver.create_table')
+@patch('static.schema.Driver.driver')
+@patch('static.schema.Driver.indexes', return_value={'a': {'id'}})
+@patch('static.schema.Driver.tables', return_value=['a'])
+def test_schema_cache_create_missing(mock_tables, mock_indexes, mock_driver, mock_create_table, mock_create_index):
+    cache = SchemaCache(ttl=300)
+    cache.declare('ledger', 'a', 'id', 'team', 'number')
+    cache.declare('ledger', 'b', 'id')
+    created = cache.create_missing('ledger')
+    assert sorted(created) == [('ledger', 'a', 'number'), ('ledger', 'a', 'team'), ('ledger', 'b', 'id')]
+    assert mock_create_table.call_count == 1
+    assert mock_create_index.call_count == 3
+    assert cache.has_index('ledger', 'b', 'id')
+    assert cache.create_missing() == []
+    assert mock_indexes.call_count == 1
+
+
+@patch('static.schema.Driver.indexes', return_value={'a': {'id', 'team'}})
+@patch('static.schema.Driver.tables', return_value=['a'])
+def test_schema_cache_check(mock_tables, mock_indexes):
+    assert SchemaCache(policy='ignore').check('ledger', 'a', ['number'])
+    cache = SchemaCache(policy='warn')
+    assert cache.check('ledger', 'a', ['team', 'number'])
+    with patch('static.schema.log') as mock_log:
+        assert not cache.check('ledger', 'a', ['number'])
+        assert not cache.check('ledger', 'a', ['number'])
+        assert mock_log.warning.call_count == 1
+    with pytest.raises(ValueError):
+        SchemaCache(policy='raise').check('ledger', 'a', [])
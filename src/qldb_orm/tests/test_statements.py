@@ -0,0 +1,112 @@
+import datetime
+import pytest
+import os
+import sys
+from unittest.mock import patch
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_DIR = os.path.dirname(TEST_DIR)
+sys.path.append(APP_DIR)
+
+from static.driver import Driver
+from qldb_orm.static import statements
+
+
+class FakeExecutor():
+    def __init__(self):
+        self.statements = []
+
+    def execute_statement(self, statement, *params):
+        self.statements.append((statement, params))
+        return iter([])
+
+
+class FakeDriver():
+    def __init__(self):
+        self.executor = FakeExecutor()
+
+    def execute_lambda(self, query_lambda):
+        return query_lambda(self.executor)
+
+
+@pytest.mark.parametrize('n,expected', [(0, 1), (1, 1), (2, 2), (3, 4), (4, 4), (5, 8), (33, 64)])
+def test_statements_bucket(n, expected):
+    assert statements.bucket(n) == expected
+
+
+def test_statements_pad():
+    assert statements.pad([]) == []
+    assert statements.pad(['a', 'b', 'c']) == ['a', 'b', 'c', 'c']
+    assert statements.pad(range(5)) == [0, 1, 2, 3, 4, 4, 4, 4]
+
+
+def test_statements_select():
+    assert statements.select('people') == 'SELECT * FROM people BY meta_id'
+    assert statements.select('people', equals=('name', 'address.city')) == \
+        'SELECT * FROM people BY meta_id WHERE name = ? AND address.city = ?'
+    assert statements.select('people', equals=('name',), within=(('age', 3),)) == \
+        'SELECT * FROM people BY meta_id WHERE name = ? AND age IN (?,?,?,?)'
+    assert statements.select('people', fields=('id', ('metadata.version', 'version')), by=None,
+                             source='committed') == \
+        'SELECT id, metadata.version AS version FROM _ql_committed_people'
+    assert statements.select('people', equals=('metadata.id',), by=None, source='history') == \
+        'SELECT * FROM history(people) WHERE metadata.id = ?'
+
+
+def test_statements_write():
+    assert statements.insert('people') == 'INSERT INTO people ?'
+    assert statements.insert('people', 3) == 'INSERT INTO people << ?, ?, ? >>'
+    assert statements.update('people', 'id') == 'UPDATE people as p SET p = ? WHERE id = ?'
+    assert statements.update('people', 'id', ('name', 'address.city')) == \
+        'UPDATE people as p SET p.name = ? , p.address.city = ? WHERE id = ?'
+
+
+@pytest.mark.parametrize('table,column', [
+    ('people; DELETE FROM people', 'id'),
+    ('people', 'id = id OR 1'),
+    ('people', 'id)'),
+    ('history(people)', 'id'),
+    ('people', '')
+])
+def test_statements_invalid_identifiers(table, column):
+    with pytest.raises(ValueError):
+        statements.select(table, equals=(column,))
+
+
+def test_statements_cached_by_bucket():
+    statements.cache_clear()
+    first = statements.select('people', within=(('id', 5),))
+    second = statements.select('people', within=(('id', 7),))
+    assert first is second
+    assert first == 'SELECT * FROM people BY meta_id WHERE id IN (?,?,?,?,?,?,?,?)'
+    info = statements.cache_info()['select']
+    assert info.hits == 1 and info.misses == 1
+
+
+def test_statements_skip_sanitize():
+    with patch.object(Driver, 'sanitize', wraps=Driver.sanitize) as sanitize:
+        Driver.execute(FakeExecutor(), statements.select('people'))
+        sanitize.assert_not_called()
+        Driver.execute(FakeExecutor(), 'SELECT * FROM people')
+        sanitize.assert_called_once()
+
+
+def test_statements_query_in_fields_padded():
+    driver = FakeDriver()
+    Driver.query_in_fields(driver, 'people', id=['a', 'b', 'c'], name='d')
+    statement, params = driver.executor.statements[0]
+    assert statement == 'SELECT * FROM people BY meta_id WHERE id IN (?,?,?,?) AND name IN (?)'
+    assert params == ('a', 'b', 'c', 'c', 'd')
+
+
+def test_statements_history():
+    start = datetime.datetime(2022, 1, 1, tzinfo=datetime.timezone.utc)
+    end = datetime.datetime(2022, 1, 2, 5, tzinfo=datetime.timezone(datetime.timedelta(hours=5)))
+    assert statements.history('people') == 'SELECT * FROM history(people)'
+    assert statements.history('people', start, end, equals=('metadata.id',)) == \
+        'SELECT * FROM history(people, `2022-01-01T00:00:00.000000Z`, `2022-01-02T00:00:00.000000Z`) ' \
+        'WHERE metadata.id = ?'
+    assert statements.history('people', end=end) == \
+        'SELECT * FROM history(people, `1970-01-01T00:00:00.000000Z`, `2022-01-02T00:00:00.000000Z`)'
+    with pytest.raises(ValueError):
+        statements.history('people', start='2022-01-01')